@@ -0,0 +1,459 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from conflicts import ScheduleConflict
+from connection import DATABASE_NAME, POOL_SIZE, is_busy_error, open_connection
+from database import create_schema
+import services
+from timestamps import TIME_FORMAT, week_bounds
+from validation import parse_id
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# JSON API
+# ============================================
+# An asyncio HTTP server (aiohttp) for kiosks and the mobile app. It calls
+# the same functions in services.py as the Streamlit forms. The event loop only
+# parses and answers requests; every database call runs on a bounded pool of
+# worker threads, each holding one open connection, so a slow query never
+# stalls the loop and the number of connections stays fixed. When more
+# requests are waiting than API_MAX_PENDING, new ones get 503 with Retry-After.
+#
+#   GET   /health
+#   GET   /members/{member_id}
+#   POST  /members                 registration fields as in the form
+#   POST  /payments                member_id, amount, method[, payment_date]
+#   POST  /memberships             member_id, membership_type_id, start_date, end_date[, is_active]
+#   GET   /sessions[?start=&end=]  YYYY-MM-DD, defaults to this week
+#   POST  /sessions                class_id, start_time, end_time, capacity[, room, trainer_id]
+#   PATCH /sessions/{session_id}   start_time, end_time[, capacity, room]
+
+API_HOST: str = os.environ.get("GYM_API_HOST", "127.0.0.1")
+API_PORT: int = int(os.environ.get("GYM_API_PORT", 8080))
+# Worker threads (and connections) running database calls
+API_WORKERS: int = int(os.environ.get("GYM_API_WORKERS", POOL_SIZE))
+# Requests allowed to queue for a worker before new ones are turned away
+API_MAX_PENDING: int = int(os.environ.get("GYM_API_MAX_PENDING", 256))
+
+
+def _web():
+    try:
+        from aiohttp import web
+    except ImportError as e:
+        raise RuntimeError("The JSON API requires the 'aiohttp' package.") from e
+    return web
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Database:
+    """
+    Bounded thread pool for blocking database calls. Each worker opens its
+    own connection to `path` when it starts and keeps it until close().
+    """
+
+    def __init__(self, path: str = DATABASE_NAME, workers: int = API_WORKERS,
+                 max_pending: int = API_MAX_PENDING):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="api-db", initializer=self._open)
+        self._slots = asyncio.Semaphore(workers + max_pending)
+
+    def _open(self) -> None:
+        conn = open_connection(self.path)
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+
+    def _call(self, fn: Callable, args: tuple):
+        return fn(self._local.conn, *args)
+
+    async def run(self, fn: Callable, *args):
+        """
+        Run fn(conn, *args) on a worker. Raises Overloaded instead of queueing
+        without limit.
+        """
+        if self._slots.locked():
+            raise Overloaded()
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, fn, args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+# ============================================
+# Request Parsing
+# ============================================
+# Parse failures raise ValueError (400); KeyError would read as "not found".
+
+def _field(payload: Mapping, name: str):
+    value = payload.get(name)
+    if value is None:
+        raise ValueError(f"{name} is required")
+    return value
+
+
+def _int(payload: Mapping, name: str) -> int:
+    # int(True) is 1 and int(1.7) is 1: a bool or fractional id is another id
+    return parse_id(_field(payload, name), name)
+
+
+def _number(payload: Mapping, name: str) -> float:
+    # Only a JSON number: float(True) is 1.0 and float("100") would accept a string
+    value = _field(payload, name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} is required and must be a number")
+    return float(value)
+
+
+def _bool(payload: Mapping, name: str, default: bool) -> bool:
+    # Only a JSON boolean or 0/1: bool("false") would be True
+    value = payload.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError(f"{name} must be true, false, 0 or 1")
+
+
+def _optional_str(payload: Mapping, name: str) -> Optional[str]:
+    value = payload.get(name)
+    return None if value is None else str(value)
+
+
+def _date(value, name: str) -> date:
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"{name} must look like YYYY-MM-DD")
+
+
+def _time(value, name: str) -> datetime:
+    try:
+        return datetime.strptime(str(value), TIME_FORMAT)
+    except ValueError:
+        raise ValueError(f"{name} must look like {datetime(2025, 1, 31, 7, 5).strftime(TIME_FORMAT)}")
+
+
+def make_app(db: Database):
+    web = _web()
+    routes = web.RouteTableDef()
+
+    @web.middleware
+    async def errors(request, handler):
+        try:
+            return await handler(request)
+        except web.HTTPException:
+            raise
+        except Overloaded:
+            return web.json_response({"error": "server busy"}, status=503, headers={"Retry-After": "1"})
+        except sqlite3.OperationalError as e:
+            # Only 'database is locked' after the busy timeout clears by retrying;
+            # 'no such table' and the like are server faults
+            if is_busy_error(e):
+                return web.json_response({"error": str(e)}, status=503, headers={"Retry-After": "1"})
+            logger.exception("%s %s failed", request.method, request.path)
+            return web.json_response({"error": "internal server error"}, status=500)
+        except sqlite3.IntegrityError as e:
+            return web.json_response({"error": str(e)}, status=409)
+        except ScheduleConflict as e:
+            return web.json_response({"error": str(e), "conflicts": [
+                {"kind": c.kind, "resource": c.resource, "class_session_id": c.session_id,
+                 "start_time": c.start.strftime(TIME_FORMAT), "end_time": c.end.strftime(TIME_FORMAT)}
+                for c in e.conflicts]}, status=409)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        except OverflowError:
+            # An id beyond SQLite's 64-bit integers, raised when it is bound
+            return web.json_response({"error": "a number in the request is out of range"}, status=400)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+
+    async def _payload(request) -> Dict:
+        payload = await request.json()
+        if not isinstance(payload, dict):
+            raise ValueError("expected a JSON object")
+        return payload
+
+    @routes.get("/health")
+    async def health(request):
+        return web.json_response({"status": "ok"})
+
+    @routes.get("/members/{member_id}")
+    async def get_member(request):
+        member_id = _int(request.match_info, "member_id")
+        return web.json_response(await db.run(services.get_member, member_id))
+
+    @routes.post("/members")
+    async def register_member(request):
+        payload = await _payload(request)
+        record = {name: str(value) for name, value in payload.items() if value is not None}
+        member_id = await db.run(services.register_member, record)
+        return web.json_response({"member_id": member_id}, status=201)
+
+    @routes.post("/payments")
+    async def record_payment(request):
+        payload = await _payload(request)
+        amount = _number(payload, "amount")
+        paid_on = _date(payload["payment_date"], "payment_date") if payload.get("payment_date") else date.today()
+        payment_id = await db.run(services.record_payment, _int(payload, "member_id"), amount,
+                                  str(_field(payload, "method")), paid_on)
+        return web.json_response({"payment_id": payment_id}, status=201)
+
+    @routes.post("/memberships")
+    async def assign_membership(request):
+        payload = await _payload(request)
+        membership_id = await db.run(services.assign_membership, _int(payload, "member_id"),
+                                     _int(payload, "membership_type_id"),
+                                     _date(_field(payload, "start_date"), "start_date"),
+                                     _date(_field(payload, "end_date"), "end_date"),
+                                     _bool(payload, "is_active", True))
+        return web.json_response({"membership_id": membership_id}, status=201)
+
+    @routes.get("/sessions")
+    async def list_sessions(request):
+        start, end = week_bounds()
+        if request.query.get("start"):
+            start = datetime.combine(_date(request.query["start"], "start"), datetime.min.time())
+        if request.query.get("end"):
+            end = datetime.combine(_date(request.query["end"], "end"), datetime.min.time())
+        return web.json_response(await db.run(services.list_sessions, start, end))
+
+    @routes.post("/sessions")
+    async def schedule_session(request):
+        payload = await _payload(request)
+        trainer_id = _int(payload, "trainer_id") if payload.get("trainer_id") is not None else None
+        session_id = await db.run(services.schedule_session, _int(payload, "class_id"),
+                                  _time(_field(payload, "start_time"), "start_time"),
+                                  _time(_field(payload, "end_time"), "end_time"), _int(payload, "capacity"),
+                                  _optional_str(payload, "room"), trainer_id)
+        return web.json_response({"class_session_id": session_id}, status=201)
+
+    @routes.patch("/sessions/{session_id}")
+    async def reschedule_session(request):
+        session_id = _int(request.match_info, "session_id")
+        payload = await _payload(request)
+        capacity = _int(payload, "capacity") if payload.get("capacity") is not None else None
+        await db.run(services.reschedule_session, session_id, _time(_field(payload, "start_time"), "start_time"),
+                     _time(_field(payload, "end_time"), "end_time"), capacity, _optional_str(payload, "room"))
+        return web.json_response({"class_session_id": session_id})
+
+    async def on_startup(app):
+        await db.run(create_schema)
+
+    async def on_cleanup(app):
+        db.close()
+
+    app = web.Application(middlewares=[errors])
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def serve(host: str, port: int, path: str, workers: int, max_pending: int) -> None:
+    web = _web()
+
+    async def build():
+        # The semaphore must be created inside the server's event loop
+        return make_app(Database(path, workers, max_pending))
+
+    print(f"Serving the gym API on http://{host}:{port} ({workers} database workers)")
+    web.run_app(build(), host=host, port=port, print=None, access_log=None)
+
+
+# ============================================
+# Load Test
+# ============================================
+# Runs one operation mix twice: as direct services calls from a thread pool
+# (what the Streamlit forms do, minus rendering) and as HTTP requests
+# against the API, and reports requests per second and latency for both.
+
+BENCH_MIXES: List[str] = ["read", "write"]
+
+# (direct call, (HTTP method, path, JSON body))
+Operation = Tuple[Tuple[Callable, tuple], Tuple[str, str, Optional[Dict]]]
+
+
+def _operation(mix: str, rng: random.Random, member_ids: List[int]) -> Operation:
+    member_id = rng.choice(member_ids)
+    if mix == "write":
+        # Writes real payments: benchmark against a scratch database
+        today = date.today()
+        return ((services.record_payment, (member_id, 100.0, "Cash", today)),
+                ("POST", "/payments", {"member_id": member_id, "amount": 100.0, "method": "Cash",
+                                       "payment_date": today.isoformat()}))
+    if rng.random() < 0.5:
+        return (services.get_member, (member_id,)), ("GET", f"/members/{member_id}", None)
+    return (services.list_sessions, week_bounds()), ("GET", "/sessions", None)
+
+
+def _summary(mode: str, latencies: List[float], errors: int, elapsed: float) -> Dict:
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000 if ordered else 0.0
+
+    return {"mode": mode, "requests": len(ordered), "errors": errors,
+            "rps": len(ordered) / elapsed if elapsed else 0.0, "p50_ms": pick(0.50), "p99_ms": pick(0.99)}
+
+
+def bench_direct(path: str, mix: str, seconds: float, workers: int, member_ids: List[int]) -> Dict:
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed: int) -> None:
+        conn = open_connection(path)
+        rng = random.Random(seed)
+        try:
+            while time.perf_counter() < deadline:
+                (fn, args), _ = _operation(mix, rng, member_ids)
+                started = time.perf_counter()
+                try:
+                    fn(conn, *args)
+                    ok = True
+                except (sqlite3.Error, ValueError, LookupError):
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return _summary("direct", latencies, errors[0], time.perf_counter() - started)
+
+
+async def bench_http(url: str, mix: str, seconds: float, concurrency: int, member_ids: List[int]) -> Dict:
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise RuntimeError("The API load test requires the 'aiohttp' package.") from e
+
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(session, seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            _, (method, route, body) = _operation(mix, rng, member_ids)
+            started = time.perf_counter()
+            try:
+                async with session.request(method, url + route, json=body) as response:
+                    await response.read()
+                    ok = response.status < 400
+            except aiohttp.ClientError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session, n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return _summary("http", latencies, errors, elapsed)
+
+
+async def _wait_until_up(url: str, timeout: float = 15.0) -> None:
+    import aiohttp
+    deadline = time.perf_counter() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url + "/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"API at {url} did not come up within {timeout:g}s")
+            await asyncio.sleep(0.2)
+
+
+def run_benchmark(path: str, url: Optional[str], mix: str, seconds: float, concurrency: int,
+                  workers: int, port: int) -> List[Dict]:
+    """
+    Benchmark direct calls and the HTTP API on `path`. Without `url` a
+    server for `path` is started in a separate process for the run.
+    """
+    conn = open_connection(path)
+    member_ids = [row[0] for row in conn.execute("SELECT member_id FROM Member")]
+    conn.close()
+    if not member_ids:
+        raise SystemExit("No members in the database; seed or generate data first.")
+
+    results = [bench_direct(path, mix, seconds, workers, member_ids)]
+    server = None
+    if url is None:
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--database", path,
+                                   "--port", str(port), "--workers", str(workers)])
+    try:
+        asyncio.run(_wait_until_up(url))
+        results.append(asyncio.run(bench_http(url, mix, seconds, concurrency, member_ids)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JSON API for kiosks and the mobile app.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="database worker threads")
+    parser.add_argument("--max-pending", type=int, default=API_MAX_PENDING)
+    parser.add_argument("--benchmark", action="store_true", help="load-test direct calls and the API, then exit")
+    parser.add_argument("--url", help="benchmark an already running API instead of starting one")
+    parser.add_argument("--mix", choices=BENCH_MIXES, default="read")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each benchmark run")
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous HTTP clients")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(f"{'mode':<8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for row in run_benchmark(args.database, args.url, args.mix, args.seconds, args.concurrency,
+                                 args.workers, args.port):
+            print(f"{row['mode']:<8}{row['requests']:>10,}{row['errors']:>8,}{row['rps']:>10,.0f}"
+                  f"{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+    else:
+        serve(args.host, args.port, args.database, args.workers, args.max_pending)
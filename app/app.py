@@ -1,35 +1,24 @@
+import os
+from contextlib import nullcontext
 import streamlit as st
-import sqlite3
 import pandas as pd
-from database import DATABASE_NAME, create_tables
-from insert_data import insert_sample_data
-from queries import get_custom_query
+from archive import ARCHIVE_RULES, attach_archive
+from bootstrap import ensure_initialized
+from export import DOWNLOAD_LIMIT_BYTES, EXPORT_DIR, EXPORT_FORMATS, export_file_name, export_to_file
+from pagination import DEFAULT_PAGE_SIZE, PAGE_SIZE_OPTIONS, estimate_row_count, fetch_page
 from insertion import render_insert_page
 from update import render_update_page
 from delete import render_delete_page
+from calendar_view import render_calendar_page
+from profile_view import render_profile_page
+from diagnostics import render_diagnostics_page
+from replica import REFRESH_SECONDS, describe_staleness, refresh_replica, replica_connection
+from revenue import render_revenue_page
+from tracing import trace_scope
 
-conn = sqlite3.connect(DATABASE_NAME)
-cur = conn.cursor()
-
-# Create a flag table to track initialization status
-cur.execute('''CREATE TABLE IF NOT EXISTS Init_Flags (
-    key TEXT PRIMARY KEY,
-    value TEXT
-)''')
-
-# Check if sample data has already been inserted
-cur.execute("SELECT value FROM Init_Flags WHERE key = 'sample_data'")
-result = cur.fetchone()
-
-# If no sample data exists, create tables and insert sample data
-if result is None:
-    create_tables()
-    insert_sample_data()
-    # Mark that sample data has been inserted
-    cur.execute("INSERT INTO Init_Flags (key, value) VALUES (?, ?)", ('sample_data', 'true'))
-    conn.commit()
-
-conn.close()
+# Schema creation, migrations and seeding run once per server process
+with trace_scope("Startup"):
+    ensure_initialized()
 
 # ============================================
 # Streamlit UI Configuration
@@ -47,7 +36,7 @@ st.title(MAIN_PAGE_TITLE)
 st.sidebar.header(SIDEBAR_HEADER)
 menu: str = st.sidebar.radio(
     "Select Action",
-    ["Home", "View Tables", "Insertion", "Update", "Delete"]
+    ["Home", "View Tables", "Insertion", "Update", "Delete", "Member Profile", "Calendar", "Revenue", "Diagnostics"]
 )
 
 # ============================================
@@ -71,19 +60,70 @@ elif menu == "View Tables":
     ]
 
     selected_table: str = st.sidebar.selectbox("Choose table:", table_names)
-
-    conn: sqlite3.Connection = sqlite3.connect(DATABASE_NAME)
-    try:
-        query = get_custom_query(selected_table)
-        df = pd.read_sql_query(query, conn)
-
-        st.markdown(f"### Data for: **{selected_table}**")
-        st.dataframe(df, use_container_width=True)
-
-    except Exception as e:
-        st.error(f"Error reading from table {selected_table}: {e}")
-    finally:
-        conn.close()
+    page_size: int = st.sidebar.selectbox("Rows per page:", PAGE_SIZE_OPTIONS,
+                                          index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE))
+    include_archive: bool = selected_table in ARCHIVE_RULES and st.sidebar.checkbox(
+        "Include archive", help="Also show rows moved to the archive database (slower).")
+
+    # Start key of every page visited so far; reset when the table, page size or archive toggle changes
+    if st.session_state.get("view_table") != (selected_table, page_size, include_archive):
+        st.session_state.view_table = (selected_table, page_size, include_archive)
+        st.session_state.view_keys = [None]
+
+    def go_previous_page():
+        st.session_state.view_keys.pop()
+
+    def go_next_page(key):
+        st.session_state.view_keys.append(key)
+
+    if REFRESH_SECONDS > 0 and st.sidebar.button("Refresh Snapshot Now"):
+        refresh_replica()
+
+    # Reads go to the periodically refreshed replica so they never compete with writes
+    # Archived rows come from the live archive file, so right after an archiving
+    # run a row can show up twice until the snapshot is refreshed
+    with replica_connection() as conn, attach_archive(conn) if include_archive else nullcontext(), \
+            trace_scope(f"View Tables / {selected_table}"):
+        try:
+            page_number = len(st.session_state.view_keys)
+            columns, rows, next_key = fetch_page(conn, selected_table, st.session_state.view_keys[-1], page_size,
+                                                 include_archive)
+            total_estimate = estimate_row_count(conn, selected_table, include_archive)
+
+            st.markdown(f"### Data for: **{selected_table}**")
+            st.caption(f"Page {page_number} · approx. {total_estimate:,} rows in total · {describe_staleness()}")
+            st.dataframe(pd.DataFrame(rows, columns=columns), use_container_width=True)
+
+            col_prev, col_next = st.columns(2)
+            col_prev.button("⬅️ Previous", disabled=page_number == 1, on_click=go_previous_page)
+            col_next.button("Next ➡️", disabled=next_key is None, on_click=go_next_page, args=(next_key,))
+
+        except Exception as e:
+            st.error(f"Error reading from table {selected_table}: {e}")
+
+        # Export streams the whole table to a file in chunks instead of loading it here
+        with st.expander(f"Export {selected_table}"):
+            col_format, col_raw = st.columns(2)
+            export_format = col_format.radio("Format", EXPORT_FORMATS, horizontal=True)
+            export_raw = col_raw.checkbox("Raw table columns (no joins)")
+
+            if st.button("Export"):
+                os.makedirs(EXPORT_DIR, exist_ok=True)
+                export_path = os.path.join(EXPORT_DIR, export_file_name(selected_table, export_format, export_raw))
+                progress = st.empty()
+                try:
+                    with trace_scope(f"Export / {selected_table}"):
+                        exported = export_to_file(conn, selected_table, export_format, export_path, export_raw,
+                                                  progress=lambda n: progress.caption(f"{n:,} rows written..."),
+                                                  include_archive=include_archive)
+                    progress.success(f"{exported:,} rows written to {export_path}")
+                    if os.path.getsize(export_path) <= DOWNLOAD_LIMIT_BYTES:
+                        with open(export_path, "rb") as f:
+                            st.download_button("Download", f, file_name=os.path.basename(export_path))
+                    else:
+                        st.info("The file is too large for a browser download; copy it from the server.")
+                except Exception as e:
+                    progress.error(f"Export failed: {e}")
 
 elif menu == "Insertion":
     render_insert_page()
@@ -93,3 +133,15 @@ elif menu == "Update":
 
 elif menu == "Delete":
     render_delete_page()
+
+elif menu == "Member Profile":
+    render_profile_page()
+
+elif menu == "Calendar":
+    render_calendar_page()
+
+elif menu == "Revenue":
+    render_revenue_page()
+
+elif menu == "Diagnostics":
+    render_diagnostics_page()
@@ -0,0 +1,249 @@
+import argparse
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from connection import DATABASE_NAME, open_connection
+from database import connection, subtract_from_rollups
+from timestamps import to_epoch
+
+# ============================================
+# Cold-Storage Archive
+# ============================================
+# Check-ins and payments older than a cutoff are moved into a separate
+# database file (gym_archive.db) so the hot tables, and every index and scan
+# over them, stay the size of recent history. The archive is ATTACHed only
+# while it is needed: by the archiving job and by views that ask for it, which
+# read main and archive rows together through a UNION ALL.
+#
+# Rows are moved in batches, each in its own IMMEDIATE transaction holding a
+# row in Archive_Guard, so the Payment delete trigger leaves the revenue
+# rollups alone: archived payments still count as revenue.
+#
+# Foreign keys cannot reach the archive, so ON DELETE CASCADE stops at the hot
+# tables. Deleting a member or a class session therefore calls
+# purge_archived() in the same transaction to remove the archived rows that
+# belonged to it, and takes its archived payments out of the rollups.
+
+ARCHIVE_PATH: str = os.environ.get("GYM_ARCHIVE_PATH", "gym_archive.db")
+# Default age at which rows are archived
+ARCHIVE_AFTER_DAYS: int = int(os.environ.get("GYM_ARCHIVE_AFTER_DAYS", 365))
+# Rows moved per transaction; writers get the lock back between batches
+ARCHIVE_BATCH_SIZE: int = 10000
+ARCHIVE_SCHEMA: str = "archive"
+
+# Table -> (key column, "older than the cutoff" condition, cutoff day -> parameter)
+ARCHIVE_RULES: Dict[str, Tuple[str, str, Callable[[date], object]]] = {
+    "Check_in": ("checkin_id", "checkin_ts < ?", lambda day: to_epoch(datetime(day.year, day.month, day.day))),
+    "Payment": ("payment_id", "payment_date < ?", date.isoformat),
+}
+
+ARCHIVE_INDEXES: List[Tuple[str, str, str]] = [
+    ("idx_archive_check_in_ts", "Check_in", "checkin_ts"),
+    ("idx_archive_check_in_member_time", "Check_in", "member_id, checkin_time"),
+    # Keyset order of the Check_in page (queries.PAGE_KEYS); Payment pages by payment_id
+    ("idx_archive_check_in_time", "Check_in", "checkin_time, checkin_id"),
+    ("idx_archive_payment_member", "Payment", "member_id"),
+    ("idx_archive_payment_date", "Payment", "payment_date"),
+]
+
+# Parent key -> archived tables whose rows are deleted along with that parent
+ARCHIVE_CHILDREN: Dict[str, List[str]] = {
+    "member_id": ["Payment", "Check_in"],
+    "class_session_id": ["Check_in"],
+}
+
+Progress = Callable[[str, int], None]
+
+
+def is_attached(conn: sqlite3.Connection) -> bool:
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list"))
+
+
+def _ensure_archive_tables(conn: sqlite3.Connection) -> None:
+    """
+    Give every archived table a twin in the archive with the same columns in
+    the same order (so SELECT * of both can be UNIONed), without foreign keys,
+    which cannot point across database files.
+    """
+    for table in ARCHIVE_RULES:
+        columns = conn.execute(f"PRAGMA main.table_info({table})").fetchall()
+        existing = {row[1] for row in conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.table_info({table})")}
+        if not existing:
+            definitions = ", ".join(f"{name} {col_type}" for _, name, col_type, _, _, _ in columns)
+            keys = ", ".join(name for _, name, _, _, _, pk in sorted(columns, key=lambda c: c[5]) if pk)
+            conn.execute(f"CREATE TABLE {ARCHIVE_SCHEMA}.{table} ({definitions}, PRIMARY KEY ({keys}))")
+        else:
+            # Columns added to the main table by later migrations
+            for _, name, col_type, _, _, _ in columns:
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN {name} {col_type}")
+
+    for index, table, columns in ARCHIVE_INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.{index} ON {table}({columns})")
+
+
+@contextmanager
+def attach_archive(conn: sqlite3.Connection, path: str = ARCHIVE_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Make the archive available as `archive.<table>` for the duration of the
+    block, creating the file and its tables on first use. Nested blocks on
+    the same connection share one attachment.
+    """
+    if is_attached(conn):
+        yield conn
+        return
+
+    conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+    try:
+        _ensure_archive_tables(conn)
+        yield conn
+    finally:
+        # DETACH is refused inside a transaction; one left open here has failed
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+
+
+@contextmanager
+def archive_if_present(conn: sqlite3.Connection, path: Optional[str] = ARCHIVE_PATH) -> Iterator[bool]:
+    """
+    Attach the archive for the block if it is already attached or its file
+    exists (without creating it otherwise). Yields whether it is attached.
+    """
+    if is_attached(conn) or (path and os.path.exists(path)):
+        with attach_archive(conn, path):
+            yield True
+    else:
+        yield False
+
+
+def _archived_where(column: str, ids: Sequence[int]) -> str:
+    return f"{column} IN ({', '.join('?' * len(ids))})"
+
+
+def count_archived(conn: sqlite3.Connection, column: str, ids: Sequence[int]) -> Dict[str, int]:
+    """
+    Archived rows per table that deleting the parents `ids` (keyed by
+    `column`, e.g. member_id) would remove. Zero when the archive is not attached.
+    """
+    tables = ARCHIVE_CHILDREN[column]
+    if not ids or not is_attached(conn):
+        return dict.fromkeys(tables, 0)
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.{table} WHERE {_archived_where(column, ids)}",
+                                ids).fetchone()[0]
+            for table in tables}
+
+
+def purge_archived(cur: sqlite3.Cursor, column: str, ids: Sequence[int]) -> Dict[str, int]:
+    """
+    Delete the archived rows of the parents `ids` inside the caller's
+    transaction, taking archived payments out of the revenue rollups first.
+    Does nothing when the archive is not attached. Returns the rows removed per table.
+    """
+    tables = ARCHIVE_CHILDREN[column]
+    if not ids or not is_attached(cur.connection):
+        return dict.fromkeys(tables, 0)
+    removed = {}
+    for table in tables:
+        where = _archived_where(column, ids)
+        if table == "Payment":
+            subtract_from_rollups(cur, f"SELECT * FROM {ARCHIVE_SCHEMA}.Payment WHERE {where}", ids)
+        cur.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.{table} WHERE {where}", ids)
+        removed[table] = cur.rowcount
+    return removed
+
+
+def default_cutoff(today: Optional[date] = None) -> date:
+    return (today or date.today()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+
+def _move_batch(cur: sqlite3.Cursor, table: str, parameter, batch_size: int) -> int:
+    key, condition, _ = ARCHIVE_RULES[table]
+    cur.execute(f"SELECT MAX({key}) FROM (SELECT {key} FROM main.{table} WHERE {condition} ORDER BY {key} LIMIT ?)",
+                (parameter, batch_size))
+    last = cur.fetchone()[0]
+    if last is None:
+        return 0
+
+    columns = ", ".join(row[1] for row in cur.execute(f"PRAGMA main.table_info({table})").fetchall())
+    cur.execute("INSERT INTO Archive_Guard (active) VALUES (1)")
+    # REPLACE: with a WAL main database a crash can commit the archive side
+    # only, and the retry must be able to copy the same rows again
+    cur.execute(f'''INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table} ({columns})
+                    SELECT {columns} FROM main.{table} WHERE {condition} AND {key} <= ?''', (parameter, last))
+    cur.execute(f"DELETE FROM main.{table} WHERE {condition} AND {key} <= ?", (parameter, last))
+    moved = cur.rowcount
+    cur.execute("DELETE FROM Archive_Guard")
+    return moved
+
+
+def archive_before(conn: sqlite3.Connection, cutoff: date, batch_size: int = ARCHIVE_BATCH_SIZE,
+                   path: str = ARCHIVE_PATH, progress: Optional[Progress] = None) -> Dict[str, int]:
+    """
+    Move check-ins and payments dated before `cutoff` into the archive and
+    log the run. Returns the rows moved per table.
+    """
+    started = time.perf_counter()
+    moved = dict.fromkeys(ARCHIVE_RULES, 0)
+    with attach_archive(conn, path):
+        cur = conn.cursor()
+        for table, (_, _, to_parameter) in ARCHIVE_RULES.items():
+            parameter = to_parameter(cutoff)
+            while True:
+                cur.execute("BEGIN IMMEDIATE")
+                try:
+                    count = _move_batch(cur, table, parameter, batch_size)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                if not count:
+                    break
+                moved[table] += count
+                if progress:
+                    progress(table, moved[table])
+
+        cur.execute('''INSERT INTO Archive_Run (run_at, cutoff_date, checkins, payments, duration_ms)
+                       VALUES (?, ?, ?, ?, ?)''',
+                    (datetime.now().isoformat(timespec="seconds"), cutoff.isoformat(), moved["Check_in"],
+                     moved["Payment"], round((time.perf_counter() - started) * 1000, 3)))
+        conn.commit()
+    return moved
+
+
+def run_archive(cutoff: Optional[date] = None, progress: Optional[Progress] = None) -> Dict[str, int]:
+    with connection() as conn:
+        return archive_before(conn, cutoff or default_cutoff(), progress=progress)
+
+
+def recent_archive_runs(limit: int = 20) -> List[Dict]:
+    with connection() as conn:
+        cur = conn.execute('''SELECT run_at, cutoff_date, checkins, payments, duration_ms FROM Archive_Run
+                              ORDER BY run_id DESC LIMIT ?''', (limit,))
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old check-ins and payments into the archive database.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--before", type=date.fromisoformat, help="archive rows dated before YYYY-MM-DD")
+    group.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="archive rows older than this many days")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    archive_conn = open_connection(args.database)
+    try:
+        archive_cutoff = args.before or date.today() - timedelta(days=args.days)
+        begun = time.perf_counter()
+        result = archive_before(archive_conn, archive_cutoff, args.batch_size, args.archive,
+                                progress=lambda table, n: print(f"{table:<10}{n:>12,} rows archived"))
+        print(f"Archived {result} dated before {archive_cutoff} into {args.archive} "
+              f"in {time.perf_counter() - begun:.2f}s")
+    finally:
+        archive_conn.close()
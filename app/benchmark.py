@@ -0,0 +1,323 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from bulk_delete import DELETE_CHUNK_SIZE, delete_chunk
+from conflicts import find_conflicts, scan_conflicts
+from connection import open_connection
+from database import create_schema
+from generate_data import DEFAULT_ANCHOR, FIRST_NAMES, ROOMS, Scale, build_database
+from member_profile import CACHE_SIZE as PROFILE_CACHE_SIZE, get_profile, load_profile
+from pagination import DEFAULT_PAGE_SIZE, fetch_page
+from queries import PAGE_KEYS, get_custom_query
+from reports import MONTHLY_SQL, NO_MEMBERSHIP_LABEL
+from search import SEARCH_LIMIT, build_match_query
+from statements import sql
+from sweeper import SWEEP_SQL
+from timestamps import checkins_between, count_checkins_between, sessions_this_week, to_epoch, week_bounds
+from timetable import sessions_in_view
+
+# ============================================
+# Query Benchmark Suite
+# ============================================
+# Builds synthetic databases at several sizes (by Check_in row count) and
+# times every View Tables query, the cascade deletes from delete.py and the
+# option/lookup queries behind the forms. Results are written as JSON so two
+# runs can be compared with --compare before a deploy.
+
+DEFAULT_SCALES: List[int] = [10000, 100000, 1000000]
+DEFAULT_WORKDIR: str = "bench_data"
+
+# Per-case time budget: stop after this many seconds once MIN_RUNS are done
+CASE_BUDGET_SECONDS: float = 2.0
+MIN_RUNS: int = 5
+MAX_RUNS: int = 200
+
+# A case is a regression when p50 grows by more than this fraction (and 1 ms)
+REGRESSION_THRESHOLD: float = 0.20
+
+Case = Callable[[sqlite3.Connection, random.Random], int]
+
+
+def _fetch(sql: str, params: Optional[Callable[[sqlite3.Connection, random.Random], tuple]] = None) -> Case:
+    def run(conn: sqlite3.Connection, rng: random.Random) -> int:
+        return len(conn.execute(sql, params(conn, rng) if params else ()).fetchall())
+    return run
+
+
+def _random_id(table: str, column: str) -> Callable[[sqlite3.Connection, random.Random], tuple]:
+    def pick(conn: sqlite3.Connection, rng: random.Random) -> tuple:
+        high = conn.execute(f"SELECT MAX({column}) FROM {table}").fetchone()[0] or 1
+        return (rng.randint(1, high),)
+    return pick
+
+
+def _cascade(statements: List[str], table: str, column: str) -> Case:
+    """
+    Run a cascade delete, then roll it back so every run
+    deletes a fresh, fully populated record.
+    """
+    pick = _random_id(table, column)
+
+    def run(conn: sqlite3.Connection, rng: random.Random) -> int:
+        params = pick(conn, rng)
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            return sum(cur.execute(sql, params).rowcount for sql in statements)
+        finally:
+            conn.rollback()
+    return run
+
+
+def _rollback(sql: str, params: tuple) -> Case:
+    def run(conn: sqlite3.Connection, rng: random.Random) -> int:
+        cur = conn.cursor()
+        cur.execute("BEGIN")
+        try:
+            return cur.execute(sql, params).rowcount
+        finally:
+            conn.rollback()
+    return run
+
+
+def _bulk_delete(conn: sqlite3.Connection, rng: random.Random) -> int:
+    # 500 random members (one DELETE chunk) with their history, rolled back afterwards
+    high = conn.execute("SELECT MAX(member_id) FROM Member").fetchone()[0] or 1
+    ids = rng.sample(range(1, high + 1), min(high, DELETE_CHUNK_SIZE))
+    cur = conn.cursor()
+    cur.execute("BEGIN")
+    try:
+        return sum(delete_chunk(cur, ids).values())
+    finally:
+        conn.rollback()
+
+
+def _first_page(table: str) -> Case:
+    def run(conn: sqlite3.Connection, rng: random.Random) -> int:
+        return len(fetch_page(conn, table, None, DEFAULT_PAGE_SIZE)[1])
+    return run
+
+
+def _member_search(conn: sqlite3.Connection, rng: random.Random) -> int:
+    prefix = rng.choice(FIRST_NAMES)[:rng.randint(2, 4)]
+    return len(conn.execute(sql("member_search"), (build_match_query(prefix), SEARCH_LIMIT)).fetchall())
+
+
+def _conflict_check(conn: sqlite3.Connection, rng: random.Random) -> int:
+    # An hour-long session for a random trainer and room in the month around the anchor
+    trainer_id = rng.randint(1, conn.execute("SELECT MAX(trainer_id) FROM Trainer").fetchone()[0] or 1)
+    start = datetime(DEFAULT_ANCHOR.year, DEFAULT_ANCHOR.month, DEFAULT_ANCHOR.day) + timedelta(
+        minutes=15 * rng.randrange(-96 * 15, 96 * 15))
+    return len(find_conflicts(conn, start, start + timedelta(hours=1), rng.choice(ROOMS), [trainer_id]))
+
+
+def _calendar_week(rng: random.Random) -> date:
+    # One of the nine weeks around the anchor, as paged through on the Calendar page
+    return DEFAULT_ANCHOR + timedelta(weeks=rng.randint(-4, 4))
+
+
+def _calendar_query(conn: sqlite3.Connection, rng: random.Random) -> int:
+    start, end = week_bounds(_calendar_week(rng))
+    return len(conn.execute(sql("calendar_sessions"), (to_epoch(start), to_epoch(end))).fetchall())
+
+
+def _calendar_cached(conn: sqlite3.Connection, rng: random.Random) -> int:
+    return len(sessions_in_view(conn, "Week", _calendar_week(rng), prefetch_adjacent=False)[0])
+
+
+def _profile_query(conn: sqlite3.Connection, rng: random.Random) -> int:
+    return 0 if load_profile(conn, *_random_id("Member", "member_id")(conn, rng)) is None else 1
+
+
+def _profile_cached(conn: sqlite3.Connection, rng: random.Random) -> int:
+    # A front desk's worth of members, all of which fit in the cache
+    return 0 if get_profile(conn, rng.randint(1, PROFILE_CACHE_SIZE // 2), None)[0] is None else 1
+
+
+def build_cases() -> List[Tuple[str, Case]]:
+    cases: List[Tuple[str, Case]] = []
+
+    # View Tables: the old full-table load and the paginated first page
+    for table in PAGE_KEYS:
+        cases.append((f"view:{table}", _fetch(get_custom_query(table))))
+        cases.append((f"page:{table}", _first_page(table)))
+
+    # Cascade deletes (same statements as delete.py; children go via ON DELETE CASCADE)
+    cases.append(("delete:member", _cascade([sql("delete_member")], "Member", "member_id")))
+    cases.append(("delete:trainer", _cascade([sql("delete_trainer")], "Trainer", "trainer_id")))
+    cases.append(("delete:session", _cascade([sql("delete_class_session")], "Class_Session", "class_session_id")))
+    cases.append(("delete:bulk_members", _bulk_delete))
+
+    # Dropdown options and single-record lookups behind the forms (statements.py)
+    cases.append(("options:sessions", _fetch(sql("session_options"))))
+    cases.append(("options:memberships", _fetch(sql("membership_options"))))
+    cases.append(("options:classes", _fetch(sql("class_options"))))
+    cases.append(("search:members", _member_search))
+    cases.append(("lookup:member", _fetch(sql("member_address"), _random_id("Member", "member_id"))))
+    cases.append(("lookup:trainer", _fetch(sql("trainer_profile"), _random_id("Trainer", "trainer_id"))))
+    cases.append(("lookup:session", _fetch(sql("session_schedule"),
+                                           _random_id("Class_Session", "class_session_id"))))
+    cases.append(("lookup:membership", _fetch(sql("membership_validity"),
+                                              _random_id("Membership", "membership_id"))))
+
+    # Revenue dashboard: rollups versus summing Payment directly
+    cases.append(("revenue:monthly_rollup", _fetch(MONTHLY_SQL, lambda conn, rng: (NO_MEMBERSHIP_LABEL, "0000", "9999"))))
+    cases.append(("revenue:monthly_scan", _fetch("""
+        SELECT strftime('%Y-%m', payment_date), method, membership_type_id, SUM(amount), COUNT(*)
+        FROM Payment
+        GROUP BY 1, 2, 3
+    """)))
+
+    # Time ranges on the indexed epoch columns, at the data's anchor date
+    anchor = datetime(DEFAULT_ANCHOR.year, DEFAULT_ANCHOR.month, DEFAULT_ANCHOR.day)
+    cases.append(("range:sessions_week", lambda conn, rng: len(sessions_this_week(conn, DEFAULT_ANCHOR))))
+    cases.append(("range:checkins_day",
+                  lambda conn, rng: len(checkins_between(conn, anchor - timedelta(days=1), anchor))))
+    cases.append(("range:checkins_month_count",
+                  lambda conn, rng: count_checkins_between(conn, anchor - timedelta(days=30), anchor)))
+
+    # Calendar page: a week's range query, and the same weeks served from the LRU range cache
+    cases.append(("calendar:week_query", _calendar_query))
+    cases.append(("calendar:week_cached", _calendar_cached))
+
+    # Member profile: the aggregated query, and the revision-checked cache
+    cases.append(("profile:member_query", _profile_query))
+    cases.append(("profile:member_cached", _profile_cached))
+
+    # Trainer/room double-booking: one new session against the cached
+    # interval index, and the whole-timetable scan
+    cases.append(("conflicts:check", _conflict_check))
+    cases.append(("conflicts:scan", lambda conn, rng: len(scan_conflicts(conn))))
+
+    # Membership expiry sweep a month after the data's anchor date (rolled back
+    # so every run has the same work to do)
+    cases.append(("sweep:expired", _rollback(SWEEP_SQL, ((DEFAULT_ANCHOR + timedelta(days=31)).isoformat(),))))
+
+    return cases
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    # Nearest-rank percentile on an already sorted list
+    index = max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(case: Case, conn: sqlite3.Connection, rng: random.Random) -> Dict[str, float]:
+    timings: List[float] = []
+    rows = 0
+    started = time.perf_counter()
+    while len(timings) < MAX_RUNS and (len(timings) < MIN_RUNS
+                                       or time.perf_counter() - started < CASE_BUDGET_SECONDS):
+        t0 = time.perf_counter()
+        rows = case(conn, rng)
+        timings.append(time.perf_counter() - t0)
+
+    # Separate run for memory: tracemalloc itself slows execution down
+    tracemalloc.start()
+    case(conn, rng)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "rows": rows,
+        "p50_ms": round(_percentile(timings, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(timings, 0.99) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(scales: List[int], workdir: str, seed: int = 42, rebuild: bool = False,
+                   only: str = "") -> Dict:
+    os.makedirs(workdir, exist_ok=True)
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "seed": seed,
+        },
+        "scales": {},
+    }
+
+    cases = [(name, case) for name, case in build_cases() if only in name]
+    for scale in scales:
+        path = os.path.join(workdir, f"bench_{scale}_{seed}.db")
+        build_seconds = None
+        if rebuild or not os.path.exists(path):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            print(f"Building {path} ...", flush=True)
+            started = time.perf_counter()
+            build_database(path, Scale.proportional(scale), seed, log=lambda *_: None)
+            build_seconds = round(time.perf_counter() - started, 2)
+
+        conn = open_connection(path)
+        # A database kept from an earlier run may predate the latest migrations
+        create_schema(conn)
+        rng = random.Random(seed)
+        scale_result = {"database": path, "build_seconds": build_seconds, "cases": {}}
+        try:
+            for name, case in cases:
+                stats = measure(case, conn, rng)
+                scale_result["cases"][name] = stats
+                print(f"[{scale:>9,}] {name:<32} p50 {stats['p50_ms']:>10.3f} ms  "
+                      f"p99 {stats['p99_ms']:>10.3f} ms  peak {stats['peak_kib']:>10.1f} KiB", flush=True)
+        finally:
+            conn.close()
+        results["scales"][str(scale)] = scale_result
+
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Return a human-readable line for every case whose p50 regressed.
+    """
+    regressions = []
+    for scale, result in current["scales"].items():
+        old_cases = baseline.get("scales", {}).get(scale, {}).get("cases", {})
+        for name, stats in result["cases"].items():
+            old = old_cases.get(name)
+            if not old:
+                continue
+            if stats["p50_ms"] > old["p50_ms"] * (1 + threshold) and stats["p50_ms"] - old["p50_ms"] > 1.0:
+                regressions.append(f"[{scale}] {name}: p50 {old['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark gym queries at several data scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="database sizes, in Check_in rows")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="where benchmark databases are kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rebuild", action="store_true", help="regenerate databases even if they exist")
+    parser.add_argument("--only", default="", help="run only cases whose name contains this text")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="previous results JSON; exit 1 on p50 regressions")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.workdir, args.seed, args.rebuild, args.only)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
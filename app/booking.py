@@ -0,0 +1,168 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+from connection import open_connection
+from database import connection, create_schema
+
+# ============================================
+# Class Booking
+# ============================================
+# A booking is a row in Attends. Class_Session.booked_count is kept equal to
+# the number of those rows by triggers, and a seat is only taken by an INSERT
+# whose WHERE clause re-checks booked_count < capacity inside an IMMEDIATE
+# transaction. Two members racing for the last seat are serialized by the
+# write lock, so the second one sees the updated count and gets FULL.
+
+BOOKED: str = "booked"
+ALREADY_BOOKED: str = "already_booked"
+FULL: str = "full"
+NOT_FOUND: str = "not_found"
+CANCELLED: str = "cancelled"
+NOT_BOOKED: str = "not_booked"
+
+BOOKING_MESSAGES = {
+    BOOKED: "Seat reserved.",
+    ALREADY_BOOKED: "This member is already booked on that session.",
+    FULL: "This session is fully booked.",
+    NOT_FOUND: "Member or session does not exist.",
+    CANCELLED: "Booking cancelled.",
+    NOT_BOOKED: "This member has no booking on that session.",
+}
+
+# NULL capacity means the session is not limited
+RESERVE_SQL: str = '''
+    INSERT INTO Attends (member_id, class_session_id)
+    SELECT ?, cs.class_session_id
+    FROM Class_Session cs
+    WHERE cs.class_session_id = ?
+      AND (cs.capacity IS NULL OR cs.booked_count < cs.capacity)
+      AND EXISTS (SELECT 1 FROM Member WHERE member_id = ?)
+'''
+
+
+def _book(conn: sqlite3.Connection, member_id: int, session_id: int) -> str:
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("SELECT 1 FROM Attends WHERE member_id = ? AND class_session_id = ?", (member_id, session_id))
+        if cur.fetchone() is not None:
+            conn.rollback()
+            return ALREADY_BOOKED
+
+        cur.execute(RESERVE_SQL, (member_id, session_id, member_id))
+        if cur.rowcount == 1:
+            conn.commit()
+            return BOOKED
+
+        # Nothing inserted: find out why
+        cur.execute('''SELECT (SELECT COUNT(*) FROM Member WHERE member_id = ?),
+                              (SELECT COUNT(*) FROM Class_Session WHERE class_session_id = ?)''',
+                    (member_id, session_id))
+        member_exists, session_exists = cur.fetchone()
+        conn.rollback()
+        return FULL if member_exists and session_exists else NOT_FOUND
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def book_session(member_id: int, session_id: int) -> str:
+    """
+    Reserve a seat for a member. Returns BOOKED, ALREADY_BOOKED, FULL or NOT_FOUND.
+    """
+    with connection() as conn:
+        return _book(conn, member_id, session_id)
+
+
+def cancel_booking(member_id: int, session_id: int) -> str:
+    """
+    Release a member's seat. Returns CANCELLED or NOT_BOOKED.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            cur.execute("DELETE FROM Attends WHERE member_id = ? AND class_session_id = ?", (member_id, session_id))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return CANCELLED if cur.rowcount == 1 else NOT_BOOKED
+
+
+# ============================================
+# Concurrency Stress Test
+# ============================================
+
+def stress_test(members: int = 60, capacity: int = 20, rounds: int = 5, path: Optional[str] = None) -> bool:
+    """
+    Let `members` threads, each with its own connection, book the same
+    session at the same instant and check that exactly `capacity` seats
+    were taken. Runs on a throw-away database, or on a new database at
+    `path` that is kept for inspection; returns True when every round passed.
+    """
+    passed = True
+    with tempfile.TemporaryDirectory() as workdir:
+        path = path or os.path.join(workdir, "booking_stress.db")
+        setup = open_connection(path)
+        create_schema(setup)
+        setup.execute("INSERT INTO Class (class_name) VALUES ('Stress Test')")
+        setup.executemany("INSERT INTO Member (member_status) VALUES ('active')", [()] * members)
+        setup.commit()
+
+        for number in range(1, rounds + 1):
+            session_id = setup.execute(
+                "INSERT INTO Class_Session (class_id, start_time, capacity) VALUES (1, '2025-01-01 09:00', ?)",
+                (capacity,)).lastrowid
+            setup.commit()
+
+            start = threading.Barrier(members)
+            outcomes: List[str] = []
+            outcomes_lock = threading.Lock()
+
+            def attempt(member_id: int) -> None:
+                conn = open_connection(path)
+                try:
+                    start.wait()
+                    result = _book(conn, member_id, session_id)
+                except sqlite3.OperationalError as e:
+                    result = f"error: {e}"
+                finally:
+                    conn.close()
+                with outcomes_lock:
+                    outcomes.append(result)
+
+            threads = [threading.Thread(target=attempt, args=(m,)) for m in range(1, members + 1)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+            attends, booked = setup.execute('''
+                SELECT (SELECT COUNT(*) FROM Attends WHERE class_session_id = ?), booked_count
+                FROM Class_Session WHERE class_session_id = ?
+            ''', (session_id, session_id)).fetchone()
+            counts = Counter(outcomes)
+            ok = attends == booked == counts[BOOKED] == capacity and counts[FULL] == members - capacity
+            passed = passed and ok
+            print(f"round {number}: {dict(counts)} attends={attends} booked_count={booked} "
+                  f"in {elapsed * 1000:.0f} ms -> {'OK' if ok else 'FAILED'}")
+        setup.close()
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that concurrent bookings never overbook a session.")
+    parser.add_argument("--members", type=int, default=60, help="members booking at the same time")
+    parser.add_argument("--capacity", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    raise SystemExit(0 if stress_test(args.members, args.capacity, args.rounds) else 1)
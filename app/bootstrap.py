@@ -0,0 +1,83 @@
+import argparse
+import os
+import threading
+from database import connection, create_schema
+from insert_data import insert_sample_rows
+from replica import start_background_refresher
+from sweeper import start_background_sweeper
+
+# ============================================
+# One-Time Bootstrap
+# ============================================
+# Runs once per server process instead of on every Streamlit rerun.
+# The thread lock serializes sessions inside this process; the IMMEDIATE
+# transaction around seeding serializes separate processes sharing gym.db.
+
+SEED_SAMPLE_DATA: bool = os.environ.get("GYM_SEED_SAMPLE_DATA", "1") == "1"
+SAMPLE_DATA_FLAG: str = "sample_data"
+
+_lock = threading.Lock()
+_initialized: bool = False
+
+
+def initialize_schema() -> None:
+    """
+    Create missing tables and apply pending migrations (idempotent).
+    """
+    with connection() as conn:
+        create_schema(conn)
+
+
+def seed_sample_data() -> bool:
+    """
+    Insert the sample data unless it is already there. Returns True if this
+    call seeded the database. The flag check, the flag write and the data go
+    into one IMMEDIATE transaction, so two processes can never both seed.
+    """
+    with connection() as conn:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            cur.execute("SELECT value FROM Init_Flags WHERE key = ?", (SAMPLE_DATA_FLAG,))
+            if cur.fetchone() is not None:
+                conn.rollback()
+                return False
+
+            insert_sample_rows(conn)
+            cur.execute("INSERT INTO Init_Flags (key, value) VALUES (?, ?)", (SAMPLE_DATA_FLAG, 'true'))
+            conn.commit()
+            return True
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def ensure_initialized() -> None:
+    """
+    Prepare the database and start the background workers (membership expiry
+    sweeper, replica refresher) once per process; later calls return immediately.
+    """
+    global _initialized
+    if _initialized:
+        return
+
+    with _lock:
+        if _initialized:
+            return
+        initialize_schema()
+        if SEED_SAMPLE_DATA:
+            seed_sample_data()
+        start_background_sweeper()
+        start_background_refresher()
+        _initialized = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare gym.db: create/migrate the schema, optionally seed it.")
+    parser.add_argument("--seed", action="store_true", help="also insert the sample data (once)")
+    args = parser.parse_args()
+
+    initialize_schema()
+    print("Schema is up to date.")
+    if args.seed:
+        print("Sample data inserted." if seed_sample_data() else "Sample data already present.")
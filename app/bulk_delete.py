@@ -0,0 +1,157 @@
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from archive import ARCHIVE_PATH, archive_if_present, count_archived, purge_archived
+from connection import DATABASE_NAME, open_connection
+from statements import PERSON_NAME
+
+# ============================================
+# Bulk Member Delete
+# ============================================
+# Purges a filtered selection of members in one transaction. Each chunk
+# deletes the child rows (memberships, payments, check-ins, bookings) with one
+# set-based DELETE ... WHERE member_id IN (...) per table and then the members
+# themselves. The schema's ON DELETE CASCADE would remove them too, but it
+# works parent by parent and is several times slower for large chunks; it
+# stays as the safety net for single deletes. Payment and Attends triggers keep
+# the revenue rollups and session seat counts right as rows disappear. When
+# gym_archive.db exists it is attached, and the members' archived payments
+# and check-ins are purged in the same transaction (archive.purge_archived).
+
+DELETE_CHUNK_SIZE: int = 500
+# Largest selection the UI will list and delete in one go
+BULK_DELETE_LIMIT: int = 10000
+
+# Child tables keyed by member_id, in the order they are emptied and reported
+CASCADE_TABLES: List[str] = ["Membership", "Payment", "Check_in", "Attends"]
+
+
+@dataclass
+class MemberFilter:
+    statuses: List[str] = field(default_factory=lambda: ["inactive"])
+    # No check-in and no membership running on or after this day
+    inactive_since: Optional[date] = None
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+def _chunks(ids: Sequence[int], size: int) -> List[Sequence[int]]:
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+
+def find_members(conn: sqlite3.Connection, selection: MemberFilter,
+                 limit: int = BULK_DELETE_LIMIT) -> List[Tuple[int, str, str, Optional[str]]]:
+    """
+    (member_id, name, status, last check-in) for every member matching the filter.
+    """
+    conditions = []
+    params: List = []
+    if selection.statuses:
+        conditions.append(f"m.member_status IN ({_placeholders(len(selection.statuses))})")
+        params.extend(selection.statuses)
+    if selection.inactive_since:
+        cutoff = selection.inactive_since.isoformat()
+        conditions.append("NOT EXISTS (SELECT 1 FROM Check_in ci WHERE ci.member_id = m.member_id "
+                          "AND ci.checkin_time >= ?)")
+        conditions.append("NOT EXISTS (SELECT 1 FROM Membership ms WHERE ms.member_id = m.member_id "
+                          "AND ms.end_date >= ?)")
+        params.extend([cutoff, cutoff])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(f'''
+        SELECT m.member_id, {PERSON_NAME}, m.member_status,
+               (SELECT MAX(ci.checkin_time) FROM Check_in ci WHERE ci.member_id = m.member_id)
+        FROM Member m
+        LEFT JOIN Person p ON m.person_id = p.id
+        {where}
+        ORDER BY m.member_id
+        LIMIT ?
+    ''', params + [limit]).fetchall()
+
+
+def count_dependents(conn: sqlite3.Connection, member_ids: Sequence[int],
+                     archive_path: Optional[str] = ARCHIVE_PATH) -> Dict[str, int]:
+    """
+    How many rows of each child table deleting these members would remove,
+    archived rows included.
+    """
+    counts = dict.fromkeys(CASCADE_TABLES, 0)
+    with archive_if_present(conn, archive_path):
+        for chunk in _chunks(member_ids, DELETE_CHUNK_SIZE):
+            for table in CASCADE_TABLES:
+                counts[table] += conn.execute(
+                    f"SELECT COUNT(*) FROM {table} WHERE member_id IN ({_placeholders(len(chunk))})",
+                    chunk).fetchone()[0]
+            for table, count in count_archived(conn, "member_id", chunk).items():
+                counts[table] += count
+    return counts
+
+
+def delete_chunk(cur: sqlite3.Cursor, member_ids: Sequence[int]) -> Dict[str, int]:
+    """
+    Delete up to DELETE_CHUNK_SIZE members and their child rows inside the
+    caller's transaction. Returns the rows removed per table.
+    """
+    placeholders = _placeholders(len(member_ids))
+    removed = {}
+    for table in CASCADE_TABLES + ["Member"]:
+        cur.execute(f"DELETE FROM {table} WHERE member_id IN ({placeholders})", member_ids)
+        removed[table] = cur.rowcount
+    for table, count in purge_archived(cur, "member_id", member_ids).items():
+        removed[table] += count
+    return removed
+
+
+def delete_members(conn: sqlite3.Connection, member_ids: Sequence[int],
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   archive_path: Optional[str] = ARCHIVE_PATH) -> Dict[str, int]:
+    """
+    Delete the members and all their history, archived rows included, in one
+    IMMEDIATE transaction. Returns the rows removed per table. Nothing is
+    deleted if any chunk fails. `progress(done, total)` is called after each chunk.
+    """
+    removed = dict.fromkeys(["Member"] + CASCADE_TABLES, 0)
+    with archive_if_present(conn, archive_path):
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            done = 0
+            for chunk in _chunks(member_ids, DELETE_CHUNK_SIZE):
+                for table, count in delete_chunk(cur, chunk).items():
+                    removed[table] += count
+                done += len(chunk)
+                if progress:
+                    progress(done, len(member_ids))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete members (and their history) matching a filter.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help="archive database, purged too if it exists")
+    parser.add_argument("--status", nargs="*", default=["inactive"], help="member_status values to match")
+    parser.add_argument("--inactive-since", type=date.fromisoformat, help="no check-in or membership since YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=BULK_DELETE_LIMIT)
+    parser.add_argument("--yes", action="store_true", help="delete without asking")
+    args = parser.parse_args()
+
+    delete_conn = open_connection(args.database)
+    try:
+        matches = find_members(delete_conn, MemberFilter(args.status, args.inactive_since), args.limit)
+        ids = [row[0] for row in matches]
+        print(f"{len(ids):,} members match; their history: {count_dependents(delete_conn, ids, args.archive)}")
+        if ids and (args.yes or input("Delete them? [y/N] ").strip().lower() == "y"):
+            started = time.perf_counter()
+            result = delete_members(delete_conn, ids, archive_path=args.archive)
+            print(f"Deleted {result} in {time.perf_counter() - started:.2f}s")
+    finally:
+        delete_conn.close()
@@ -0,0 +1,188 @@
+import argparse
+import csv
+import io
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from database import connection
+from validation import MEMBER_STATUS_OPTIONS, validate_member
+
+# ============================================
+# Bulk Member Import
+# ============================================
+# Streams a CSV/XLSX file, validates every row with the registration form
+# rules and inserts Person + Member + Contact in chunked transactions.
+
+MEMBER_IMPORT_COLUMNS: List[str] = [
+    "first_name", "last_name", "email", "birth_date", "phone", "city", "street", "zip",
+    "member_status", "contact_name", "relationship", "contact_phone",
+]
+
+DEFAULT_CHUNK_SIZE: int = 5000
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+def _normalize(row: Dict) -> Dict[str, str]:
+    # Header names are matched case-insensitively; cells are stripped strings
+    clean = {str(k).strip().lower(): ("" if v is None else str(v).strip()) for k, v in row.items() if k}
+    clean["member_status"] = clean.get("member_status") or MEMBER_STATUS_OPTIONS[0]
+    # Spreadsheet dates arrive as 'YYYY-MM-DD 00:00:00'
+    clean["birth_date"] = clean.get("birth_date", "")[:10]
+    return clean
+
+
+def read_csv(stream: IO[str]) -> Iterator[Dict[str, str]]:
+    for row in csv.DictReader(stream):
+        yield _normalize(row)
+
+
+def read_xlsx(stream) -> Iterator[Dict[str, str]]:
+    """
+    Stream the first worksheet row by row (openpyxl read-only mode).
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise RuntimeError("Excel import requires the 'openpyxl' package.") from e
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        for values in rows:
+            if any(v is not None for v in values):
+                yield _normalize(dict(zip(header, values)))
+    finally:
+        workbook.close()
+
+
+def read_rows(name: str, stream) -> Iterator[Dict[str, str]]:
+    """
+    Pick a reader from the file extension. `stream` is a binary file object.
+    """
+    if name.lower().endswith((".xlsx", ".xlsm")):
+        return read_xlsx(stream)
+    return read_csv(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+
+
+def _insert_chunk(conn: sqlite3.Connection, records: List[Dict[str, str]]) -> None:
+    """
+    Insert one validated chunk in a single IMMEDIATE transaction.
+    Person ids are assigned up front (we hold the write lock), so Member and
+    Contact rows can be written with executemany instead of one-by-one.
+    """
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'Person'), 0),
+                       COALESCE((SELECT MAX(id) FROM Person), 0))
+        """)
+        first_id = cur.fetchone()[0] + 1
+        ids = range(first_id, first_id + len(records))
+
+        cur.executemany('''INSERT INTO Person (id, first_name, last_name, birth_date, email, phone, city, street, zip)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                        [(pid, r["first_name"], r["last_name"], r["birth_date"], r["email"], r["phone"],
+                          r["city"], r["street"], r["zip"]) for pid, r in zip(ids, records)])
+        cur.executemany("INSERT INTO Member (person_id, member_status) VALUES (?, ?)",
+                        [(pid, r["member_status"]) for pid, r in zip(ids, records)])
+        cur.executemany('''INSERT INTO Contact (person_id, contact_name, relationship, phone)
+                           VALUES (?, ?, ?, ?)''',
+                        [(pid, r["contact_name"], r["relationship"], r["contact_phone"])
+                         for pid, r in zip(ids, records)])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def import_members(rows: Iterable[Dict[str, str]], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   progress: Optional[Callable[[ImportReport], None]] = None) -> ImportReport:
+    """
+    Validate and insert member rows chunk by chunk.
+    Row numbers in the report are 1-based data rows (the header is not counted).
+    A chunk that breaks a constraint is retried row by row so the error can be
+    attributed to the offending rows while the rest of the chunk still lands.
+    Any other database error (e.g. still locked after the busy timeout) stops
+    the import with RuntimeError; the chunks before it stay committed.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    chunk: List[Tuple[int, Dict[str, str]]] = []
+
+    def _stop(row_number: int, error: sqlite3.Error) -> None:
+        # Locked after the busy timeout, or a fault no row gets past (no such
+        # table, disk full): the rows are fine, so stop instead of blaming each one
+        raise RuntimeError(f"Import stopped at row {row_number:,} after {report.imported:,} rows "
+                           f"were imported: {error}") from error
+
+    def flush(conn: sqlite3.Connection) -> None:
+        if not chunk:
+            return
+        try:
+            _insert_chunk(conn, [record for _, record in chunk])
+            report.imported += len(chunk)
+        except sqlite3.IntegrityError:
+            for row_number, record in chunk:
+                try:
+                    _insert_chunk(conn, [record])
+                    report.imported += 1
+                except sqlite3.IntegrityError as e:
+                    report.errors.append((row_number, f"Database Error: {e}"))
+                except sqlite3.Error as e:
+                    _stop(row_number, e)
+        except sqlite3.Error as e:
+            _stop(chunk[0][0], e)
+        chunk.clear()
+        report.seconds = time.perf_counter() - started
+        if progress:
+            progress(report)
+
+    with connection() as conn:
+        for row_number, record in enumerate(rows, start=1):
+            report.total += 1
+            errors = validate_member(record)
+            if errors:
+                report.errors.append((row_number, "; ".join(errors)))
+                continue
+
+            chunk.append((row_number, record))
+            if len(chunk) >= chunk_size:
+                flush(conn)
+        flush(conn)
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import members from a CSV or XLSX file.")
+    parser.add_argument("path", help=f"file with columns: {', '.join(MEMBER_IMPORT_COLUMNS)}")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        result = import_members(
+            read_rows(args.path, f), args.chunk_size,
+            progress=lambda r: print(f"\r{r.imported:,} imported, {len(r.errors):,} rejected", end="", flush=True),
+        )
+
+    print(f"\nImported {result.imported:,} of {result.total:,} rows in {result.seconds:.2f}s "
+          f"({result.rows_per_second:,.0f} rows/s)")
+    for row_number, message in result.errors[:50]:
+        print(f"  row {row_number}: {message}")
+    if len(result.errors) > 50:
+        print(f"  ... and {len(result.errors) - 50:,} more errors")
@@ -0,0 +1,90 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+import streamlit as st
+from database import connection
+from timestamps import from_epoch
+from timetable import VIEWS, cache_stats, sessions_in_view, shift, view_bounds
+from tracing import trace_scope
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+# Sessions listed per day in a month cell before "+n more"
+MONTH_CELL_SESSIONS: int = 3
+
+
+def _move(view: str, steps: int) -> None:
+    day = st.session_state.calendar_day
+    st.session_state.calendar_day = shift(view, day, steps) if steps else date.today()
+
+
+def _describe(row) -> str:
+    start, end = from_epoch(row.start_ts), from_epoch(row.end_ts)
+    details = " · ".join(part for part in (row.room, row.trainers) if part)
+    return (f"**{start:%H:%M}–{end:%H:%M}** {row.class_name}  \n"
+            f"{details or 'No room or trainer'} · {row.capacity} places")
+
+
+def _render_week(first_day: date, by_day) -> None:
+    for offset, column in enumerate(st.columns(7)):
+        day = first_day + timedelta(days=offset)
+        column.markdown(f"**{WEEKDAYS[offset]} {day:%d.%m}**")
+        for row in by_day.get(day, ()):
+            column.info(_describe(row))
+
+
+def _render_month(day: date, by_day) -> None:
+    header = st.columns(7)
+    for column, name in zip(header, WEEKDAYS):
+        column.markdown(f"**{name}**")
+    for week in calendar.Calendar().monthdatescalendar(day.year, day.month):
+        for column, cell in zip(st.columns(7), week):
+            sessions = by_day.get(cell, [])
+            label = f"**{cell.day}**" if cell.month == day.month else f"{cell.day}"
+            lines = [f"{from_epoch(row.start_ts):%H:%M} {row.class_name}" for row in sessions[:MONTH_CELL_SESSIONS]]
+            if len(sessions) > MONTH_CELL_SESSIONS:
+                lines.append(f"+{len(sessions) - MONTH_CELL_SESSIONS} more")
+            column.markdown("  \n".join([label] + lines))
+
+
+# ============================================
+# Calendar
+# ============================================
+
+@st.fragment
+def _render_calendar() -> None:
+    # Paging reruns this fragment only, not the rest of the page
+    view = st.radio("View", VIEWS, horizontal=True, key="calendar_view")
+    col_prev, col_today, col_next = st.columns(3)
+    col_prev.button("⬅️ Previous", on_click=_move, args=(view, -1), use_container_width=True)
+    col_today.button("Today", on_click=_move, args=(view, 0), use_container_width=True)
+    col_next.button("Next ➡️", on_click=_move, args=(view, 1), use_container_width=True)
+
+    day = st.session_state.calendar_day
+    with connection() as conn, trace_scope(f"Calendar / {view}"):
+        rows, cached = sessions_in_view(conn, view, day)
+        stats = cache_stats(conn)
+
+    start, end = view_bounds(view, day)
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[from_epoch(row.start_ts).date()].append(row)
+
+    if view == "Week":
+        st.subheader(f"Week of {start:%d %B %Y}")
+        _render_week(start.date(), by_day)
+    else:
+        st.subheader(f"{day:%B %Y}")
+        _render_month(day, by_day)
+
+    st.caption(f"{len(rows)} sessions from {start:%Y-%m-%d} to {end:%Y-%m-%d}, "
+               f"{'served from the cache' if cached else 'read from the database'} "
+               f"({stats['ranges']}/{stats['size']} ranges cached, {stats['hits']} hits, {stats['misses']} misses).")
+
+
+def render_calendar_page():
+    """
+    Week and month calendar of class sessions.
+    """
+    st.header("📅 Calendar")
+    st.session_state.setdefault("calendar_day", date.today())
+    _render_calendar()
@@ -0,0 +1,258 @@
+import argparse
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from connection import DATABASE_NAME, database_file, open_connection
+from statements import fetch_all, fetch_one
+from timestamps import from_epoch, to_epoch
+
+# ============================================
+# Timetable Conflicts
+# ============================================
+# A trainer cannot teach, and a room cannot host, two sessions that overlap.
+# Every trainer and every room gets an interval index: its sessions sorted by
+# start, with the running maximum of their end times. Checking a new or moved
+# session is two binary searches on those arrays.
+#
+# The indexes are built from one ordered scan of Class_Session and cached per
+# database file together with Timetable_Revision, which triggers bump on
+# every change to the timetable. Reading the revision inside the caller's
+# write transaction makes the check and the write see the same timetable.
+#
+# services.py schedules and moves sessions without invalidating the cache:
+# after the commit, apply_change() rebuilds only the indexes of the trainers
+# and room the session left or joined, O(sessions of those resources), and
+# moves the cached revision on. Any other change to Class_Session or Teaches
+# (the Update and Delete pages, another process) still moves the revision
+# past the cached one, and the next check pays the full O(n) scan again.
+
+# Conflict kinds
+TRAINER: str = "trainer"
+ROOM: str = "room"
+
+
+@dataclass(frozen=True)
+class Conflict:
+    kind: str
+    # trainer_id or room name
+    resource: object
+    session_id: int
+    start: datetime
+    end: datetime
+
+    def describe(self) -> str:
+        who = f"Trainer {self.resource}" if self.kind == TRAINER else f"Room '{self.resource}'"
+        return (f"{who} is already booked for session {self.session_id} "
+                f"({self.start:%Y-%m-%d %H:%M} - {self.end:%H:%M})")
+
+
+class ScheduleConflict(ValueError):
+    """
+    Raised by services.py when a session would double-book a trainer or room.
+    """
+    def __init__(self, conflicts: List[Conflict]):
+        super().__init__("; ".join(c.describe() for c in conflicts))
+        self.conflicts = conflicts
+
+
+class IntervalIndex:
+    """
+    The sessions of one trainer or room, sorted by start time.
+    """
+    __slots__ = ("starts", "ends", "max_ends", "session_ids")
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        # max_ends[i] = max(ends[:i + 1]); never decreases, so it can be bisected
+        self.max_ends: List[int] = []
+        self.session_ids: List[int] = []
+
+    def append(self, start: int, end: int, session_id: int) -> None:
+        # Callers add sessions in start order
+        self.starts.append(start)
+        self.ends.append(end)
+        self.max_ends.append(max(end, self.max_ends[-1]) if self.max_ends else end)
+        self.session_ids.append(session_id)
+
+    def overlapping(self, start: int, end: int, exclude: Optional[int] = None) -> List[int]:
+        """
+        Positions of the sessions that overlap [start, end): only those that
+        start before `end` and, by the running maximum, may end after `start`
+        are looked at.
+        """
+        high = bisect_left(self.starts, end)
+        low = bisect_right(self.max_ends, start, 0, high)
+        return [i for i in range(low, high) if self.ends[i] > start and self.session_ids[i] != exclude]
+
+
+@dataclass
+class Timetable:
+    revision: int
+    # (TRAINER, trainer_id) or (ROOM, room) -> its sessions
+    indexes: Dict[Tuple[str, object], IntervalIndex]
+
+    def conflicts(self, start: datetime, end: datetime, room: Optional[str] = None,
+                  trainer_ids: Iterable[int] = (), exclude_session_id: Optional[int] = None) -> List[Conflict]:
+        """
+        Sessions that would overlap [start, end) in the same room or with one
+        of the same trainers. Back-to-back sessions do not overlap.
+        """
+        keys = [(TRAINER, trainer_id) for trainer_id in trainer_ids]
+        if room:
+            keys.append((ROOM, room))
+
+        found = []
+        for kind, resource in keys:
+            index = self.indexes.get((kind, resource))
+            if index is None:
+                continue
+            for i in index.overlapping(to_epoch(start), to_epoch(end), exclude_session_id):
+                found.append(Conflict(kind, resource, index.session_ids[i], from_epoch(index.starts[i]),
+                                      from_epoch(index.ends[i])))
+        return found
+
+
+_cache: Dict[str, Timetable] = {}
+_lock = threading.Lock()
+
+
+def load_timetable(conn: sqlite3.Connection) -> Timetable:
+    revision = fetch_one(conn, "timetable_revision").revision
+    indexes: Dict[Tuple[str, object], IntervalIndex] = {}
+    for row in fetch_all(conn, "timetable"):
+        index = indexes.get((row.kind, row.resource))
+        if index is None:
+            index = indexes[(row.kind, row.resource)] = IntervalIndex()
+        index.append(row.start_ts, row.end_ts, row.class_session_id)
+    return Timetable(revision, indexes)
+
+
+def get_timetable(conn: sqlite3.Connection) -> Timetable:
+    """
+    The interval indexes of the database `conn` is connected to, rebuilt
+    only when Timetable_Revision has moved since they were built.
+    """
+    path = database_file(conn)
+    revision = fetch_one(conn, "timetable_revision").revision
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached.revision == revision:
+            return cached
+
+    timetable = load_timetable(conn)
+    with _lock:
+        _cache[path] = timetable
+    return timetable
+
+
+@dataclass
+class TimetableChange:
+    """
+    A session scheduled or moved by one write transaction, to be applied to
+    the cached indexes once it has committed.
+    """
+    path: str
+    # Timetable_Revision the conflict check read, and the one after the write
+    before: int
+    after: int
+    session_id: int
+    # Indexes the session was in before the write (empty for a new session)
+    old_keys: List[Tuple[str, object]]
+    # (kind, resource, start_ts, end_ts) of every index it is in now
+    new_rows: List[Tuple[str, object, int, int]]
+
+
+def read_change(conn: sqlite3.Connection, before: int, session_id: int,
+                old_keys: Iterable[Tuple[str, object]] = ()) -> TimetableChange:
+    """
+    Call inside the write transaction, after the write.
+    """
+    return TimetableChange(database_file(conn), before, fetch_one(conn, "timetable_revision").revision, session_id,
+                           list(old_keys), [(row.kind, row.resource, row.start_ts, row.end_ts)
+                                            for row in fetch_all(conn, "timetable_session", (session_id,))])
+
+
+def apply_change(change: TimetableChange) -> None:
+    """
+    Bring the cached indexes up to date with a committed change. If the
+    cache has moved on from the revision the change was checked against,
+    leave it alone: the next check sees the newer revision and rebuilds.
+    """
+    with _lock:
+        cached = _cache.get(change.path)
+        if cached is None or cached.revision != change.before:
+            return
+        # A new Timetable rather than edits in place: checks running in other
+        # threads keep reading the one they already hold
+        indexes = dict(cached.indexes)
+        for key in set(change.old_keys) | {(kind, resource) for kind, resource, _, _ in change.new_rows}:
+            entries = []
+            old = indexes.get(key)
+            if old is not None:
+                entries = [(start, session_id, end) for start, end, session_id
+                           in zip(old.starts, old.ends, old.session_ids) if session_id != change.session_id]
+            entries += [(start, change.session_id, end) for kind, resource, start, end in change.new_rows
+                        if (kind, resource) == key]
+            if not entries:
+                indexes.pop(key, None)
+                continue
+            # Same order as the "timetable" scan: start, then session id
+            entries.sort()
+            index = indexes[key] = IntervalIndex()
+            for start, session_id, end in entries:
+                index.append(start, end, session_id)
+        _cache[change.path] = Timetable(change.after, indexes)
+
+
+def find_conflicts(conn: sqlite3.Connection, start: datetime, end: datetime, room: Optional[str] = None,
+                   trainer_ids: Sequence[int] = (), exclude_session_id: Optional[int] = None) -> List[Conflict]:
+    return get_timetable(conn).conflicts(start, end, room, trainer_ids, exclude_session_id)
+
+
+# ============================================
+# Whole-Timetable Scan
+# ============================================
+
+def scan_conflicts(conn: sqlite3.Connection) -> List[Tuple[Conflict, Conflict]]:
+    """
+    Every pair of overlapping sessions that share a trainer or a room, found
+    in one pass over the timetable in start order. Each trainer and room
+    keeps only the sessions still running at the current start time.
+    """
+    # (kind, resource) -> (end_ts, start_ts, session_id) of its running sessions
+    running: Dict[Tuple[str, object], List[Tuple[int, int, int]]] = {}
+    pairs = []
+    for row in fetch_all(conn, "timetable"):
+        key = (row.kind, row.resource)
+        active = [session for session in running.get(key, ()) if session[0] > row.start_ts]
+        for end_ts, start_ts, session_id in active:
+            pairs.append((Conflict(row.kind, row.resource, session_id, from_epoch(start_ts), from_epoch(end_ts)),
+                          Conflict(row.kind, row.resource, row.class_session_id, from_epoch(row.start_ts),
+                                   from_epoch(row.end_ts))))
+        active.append((row.end_ts, row.start_ts, row.class_session_id))
+        running[key] = active
+    return pairs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List trainers and rooms booked for overlapping sessions.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--limit", type=int, default=50, help="conflicting pairs to print")
+    args = parser.parse_args()
+
+    scan_conn = open_connection(args.database)
+    try:
+        begun = time.perf_counter()
+        found_pairs = scan_conflicts(scan_conn)
+        scan_seconds = time.perf_counter() - begun
+        for first, second in found_pairs[:args.limit]:
+            print(f"{first.describe()}, which overlaps session {second.session_id} "
+                  f"({second.start:%Y-%m-%d %H:%M} - {second.end:%H:%M})")
+        print(f"{len(found_pairs):,} conflicting pairs found in {scan_seconds * 1000:.1f} ms")
+    finally:
+        scan_conn.close()
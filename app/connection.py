@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+from tracing import TracedConnection
+
+# ============================================
+# Connection Settings
+# ============================================
+
+DATABASE_NAME: str = "gym.db"
+
+# Memory-mapped I/O window in bytes (0 disables mmap)
+MMAP_SIZE: int = int(os.environ.get("GYM_DB_MMAP_SIZE", 256 * 1024 * 1024))
+# Page cache per connection; negative values are KiB, positive values are pages
+CACHE_SIZE: int = int(os.environ.get("GYM_DB_CACHE_SIZE", -64 * 1024))
+# How long a writer waits for a lock before raising 'database is locked'
+BUSY_TIMEOUT_SECONDS: float = float(os.environ.get("GYM_DB_BUSY_TIMEOUT", 5.0))
+# Prepared statements kept per connection; statements.py registers a few dozen
+STATEMENT_CACHE_SIZE: int = int(os.environ.get("GYM_DB_STATEMENT_CACHE", 512))
+# Maximum number of idle connections kept in the pool
+POOL_SIZE: int = int(os.environ.get("GYM_DB_POOL_SIZE", 8))
+
+_pool: List[sqlite3.Connection] = []
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def open_connection(path: str = DATABASE_NAME) -> sqlite3.Connection:
+    """
+    Open a new connection and apply the tuned pragmas once.
+    WAL lets readers keep working while a single writer commits.
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False,
+                           factory=TracedConnection, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE:d};")
+    conn.execute(f"PRAGMA cache_size = {CACHE_SIZE:d};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def database_file(conn: sqlite3.Connection) -> str:
+    """
+    Path of the main database `conn` is connected to ("" for :memory:), for
+    caches kept per database file.
+    """
+    return next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+
+
+def is_busy_error(error: sqlite3.Error) -> bool:
+    """
+    True for 'database is locked' / busy errors, the only ones worth retrying.
+    Python < 3.11 has no sqlite_errorcode, so fall back to the message.
+    """
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended codes such as SQLITE_BUSY_SNAPSHOT keep the primary code in the low byte
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _acquire() -> sqlite3.Connection:
+    with _pool_lock:
+        if _pool:
+            return _pool.pop()
+    return open_connection()
+
+
+def _release(conn: sqlite3.Connection) -> None:
+    # Never hand out a connection with a half-finished transaction
+    if conn.in_transaction:
+        conn.rollback()
+
+    with _pool_lock:
+        if len(_pool) < POOL_SIZE:
+            _pool.append(conn)
+            return
+    conn.close()
+
+
+@contextmanager
+def connection() -> Iterator[sqlite3.Connection]:
+    """
+    Lease a pooled connection for the current thread.
+    Nested calls in the same thread reuse the same connection, so helpers
+    can open their own block without fighting the page that called them.
+    """
+    leased = getattr(_local, "conn", None)
+    if leased is not None:
+        _local.depth += 1
+        try:
+            yield leased
+        finally:
+            _local.depth -= 1
+        return
+
+    conn = _acquire()
+    _local.conn = conn
+    _local.depth = 1
+    try:
+        yield conn
+    finally:
+        _local.conn = None
+        _local.depth = 0
+        _release(conn)
+
+
+def close_all() -> None:
+    """
+    Close every idle pooled connection (used on shutdown and in scripts).
+    """
+    with _pool_lock:
+        while _pool:
+            _pool.pop().close()
@@ -1,12 +1,25 @@
+import re
 import sqlite3
-
-DATABASE_NAME: str = "gym.db"
+from datetime import datetime
+from typing import Callable, List, Sequence, Tuple
+from connection import DATABASE_NAME, connection
 
 def create_tables() -> None:
-    conn: sqlite3.Connection = sqlite3.connect(DATABASE_NAME)
-    cur: sqlite3.Cursor = conn.cursor()
+    with connection() as conn:
+        create_schema(conn)
+
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the base tables and bring them to the latest schema version.
+    Takes an explicit connection so scripts can build databases other than gym.db.
+    """
+    _create_tables(conn)
+    run_migrations(conn)
 
-    cur.execute('PRAGMA foreign_keys = ON;')
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    cur: sqlite3.Cursor = conn.cursor()
 
     # Flag Table (To prevent duplicate sample data)
     cur.execute('''
@@ -177,4 +190,517 @@ def create_tables() -> None:
     ''')
 
     conn.commit()
-    conn.close()
\ No newline at end of file
+
+
+# ============================================
+# Schema Migrations
+# ============================================
+# Every change to an existing database goes through a numbered migration.
+# Released migrations must never be edited; append a new one instead.
+
+def _migration_001_foreign_key_indexes(cur: sqlite3.Cursor) -> None:
+    # Child side of every foreign key, so JOINs and cascade deletes can seek
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_contact_person ON Contact(person_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_class_session_class ON Class_Session(class_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_membership_type ON Membership(membership_type_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payment_member ON Payment(member_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_check_in_session ON Check_in(class_session_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attends_session ON Attends(class_session_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_teaches_session ON Teaches(class_session_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_trainer_spec_spec ON Trainer_Specialization(specialization_id)")
+
+    # Composite indexes also cover the plain member_id lookups
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_check_in_member_time ON Check_in(member_id, checkin_time)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_membership_member_end ON Membership(member_id, end_date)")
+
+    # Latest-first check-in listing in queries.get_custom_query
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_check_in_time ON Check_in(checkin_time)")
+
+
+def _migration_002_person_search(cur: sqlite3.Cursor) -> None:
+    # External-content FTS5 index over Person, used by the typeahead pickers
+    cur.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS Person_fts USING fts5(
+            first_name, last_name, email, phone,
+            content='Person', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+
+    # Keep the index in sync with every write to Person
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS person_fts_insert AFTER INSERT ON Person BEGIN
+            INSERT INTO Person_fts (rowid, first_name, last_name, email, phone)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.phone);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS person_fts_delete AFTER DELETE ON Person BEGIN
+            INSERT INTO Person_fts (Person_fts, rowid, first_name, last_name, email, phone)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS person_fts_update
+        AFTER UPDATE OF first_name, last_name, email, phone ON Person BEGIN
+            INSERT INTO Person_fts (Person_fts, rowid, first_name, last_name, email, phone)
+            VALUES ('delete', old.id, old.first_name, old.last_name, old.email, old.phone);
+            INSERT INTO Person_fts (rowid, first_name, last_name, email, phone)
+            VALUES (new.id, new.first_name, new.last_name, new.email, new.phone);
+        END
+    ''')
+
+    # Index the people that already exist
+    cur.execute("INSERT INTO Person_fts (Person_fts) VALUES ('rebuild')")
+
+
+# Type of the membership the member held on the payment date, newest first
+_PAYMENT_TYPE_LOOKUP: str = '''COALESCE((
+    SELECT ms.membership_type_id FROM Membership ms
+    WHERE ms.member_id = {row}.member_id AND ms.start_date <= {row}.payment_date
+    ORDER BY ms.start_date DESC LIMIT 1
+), 0)'''
+
+# Rollup table, bucket column and bucket expression. Key parts are never NULL,
+# otherwise ON CONFLICT would not match and rows would be counted twice.
+_ROLLUP_BUCKETS: List[Tuple[str, str, str]] = [
+    ("Revenue_Daily", "day", "COALESCE(date({row}.payment_date), '')"),
+    ("Revenue_Monthly", "month", "COALESCE(strftime('%Y-%m', {row}.payment_date), '')"),
+]
+
+
+def _rollup_add(row: str, condition: str = "1") -> str:
+    return "\n".join(f'''
+        INSERT INTO {table} ({bucket}, method, membership_type_id, amount, payments)
+        SELECT {key.format(row=row)}, COALESCE({row}.method, ''), {row}.membership_type_id, COALESCE({row}.amount, 0), 1
+        WHERE {condition}
+        ON CONFLICT ({bucket}, method, membership_type_id) DO UPDATE
+        SET amount = amount + excluded.amount, payments = payments + 1;''' for table, bucket, key in _ROLLUP_BUCKETS)
+
+
+def _rollup_subtract(row: str, condition: str = "1") -> str:
+    statements = []
+    for table, bucket, key in _ROLLUP_BUCKETS:
+        match = (f"{bucket} = {key.format(row=row)} AND method = COALESCE({row}.method, '') "
+                 f"AND membership_type_id = {row}.membership_type_id AND {condition}")
+        statements.append(f'''
+        UPDATE {table} SET amount = amount - COALESCE({row}.amount, 0), payments = payments - 1 WHERE {match};
+        DELETE FROM {table} WHERE {match} AND payments <= 0;''')
+    return "\n".join(statements)
+
+
+def subtract_from_rollups(cur: sqlite3.Cursor, payments_sql: str, params: Sequence = ()) -> None:
+    """
+    Take the payments selected by `payments_sql` out of the revenue rollups,
+    as payment_rollup_delete does for a row deleted from Payment. For payments
+    deleted where no trigger sees them: the archive database.
+    """
+    for table, bucket, key in _ROLLUP_BUCKETS:
+        groups = cur.execute(f'''
+            SELECT {key.format(row='p')}, COALESCE(p.method, ''), p.membership_type_id,
+                   COALESCE(SUM(p.amount), 0), COUNT(*)
+            FROM ({payments_sql}) p
+            WHERE p.membership_type_id IS NOT NULL
+            GROUP BY 1, 2, 3
+        ''', params).fetchall()
+        match = f"{bucket} = ?1 AND method = ?2 AND membership_type_id = ?3"
+        cur.executemany(f"UPDATE {table} SET amount = amount - ?4, payments = payments - ?5 WHERE {match}", groups)
+        cur.executemany(f"DELETE FROM {table} WHERE {match} AND payments <= 0", [group[:3] for group in groups])
+
+
+def _migration_003_revenue_rollups(cur: sqlite3.Cursor) -> None:
+    # Membership type a payment is counted under (0 = no membership at that date).
+    # Stored on the row so a later delete/update reverses exactly what was added.
+    cur.execute("ALTER TABLE Payment ADD COLUMN membership_type_id INTEGER")
+    cur.execute(f"UPDATE Payment SET membership_type_id = {_PAYMENT_TYPE_LOOKUP.format(row='Payment')}")
+
+    for table, bucket, _ in _ROLLUP_BUCKETS:
+        cur.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {bucket} TEXT NOT NULL,
+                method TEXT NOT NULL,
+                membership_type_id INTEGER NOT NULL,
+                amount REAL NOT NULL DEFAULT 0,
+                payments INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({bucket}, method, membership_type_id)
+            ) WITHOUT ROWID
+        ''')
+
+    # Attribute new payments that were inserted without a membership type
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS payment_attribute AFTER INSERT ON Payment
+        WHEN new.membership_type_id IS NULL BEGIN
+            UPDATE Payment SET membership_type_id = {_PAYMENT_TYPE_LOOKUP.format(row='new')}
+            WHERE payment_id = new.payment_id;
+        END
+    ''')
+
+    # Rows with a NULL type are only counted once payment_attribute has set it
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS payment_rollup_insert AFTER INSERT ON Payment
+        WHEN new.membership_type_id IS NOT NULL BEGIN
+            {_rollup_add('new')}
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS payment_rollup_delete AFTER DELETE ON Payment
+        WHEN old.membership_type_id IS NOT NULL BEGIN
+            {_rollup_subtract('old')}
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS payment_rollup_update
+        AFTER UPDATE OF payment_date, method, amount, membership_type_id ON Payment BEGIN
+            {_rollup_subtract('old', "old.membership_type_id IS NOT NULL")}
+            {_rollup_add('new', "new.membership_type_id IS NOT NULL")}
+        END
+    ''')
+
+    # Backfill from the payments that already exist
+    for table, _, key in _ROLLUP_BUCKETS:
+        cur.execute(f'''
+            INSERT INTO {table}
+            SELECT {key.format(row='Payment')}, COALESCE(method, ''), membership_type_id, COALESCE(SUM(amount), 0), COUNT(*)
+            FROM Payment
+            GROUP BY 1, 2, 3
+        ''')
+
+
+def _migration_004_session_booked_count(cur: sqlite3.Cursor) -> None:
+    # Seats taken per session, so booking checks capacity without counting Attends
+    cur.execute("ALTER TABLE Class_Session ADD COLUMN booked_count INTEGER NOT NULL DEFAULT 0")
+    cur.execute('''
+        UPDATE Class_Session SET booked_count = (
+            SELECT COUNT(*) FROM Attends a WHERE a.class_session_id = Class_Session.class_session_id
+        )
+    ''')
+
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS attends_booked_insert AFTER INSERT ON Attends BEGIN
+            UPDATE Class_Session SET booked_count = booked_count + 1
+            WHERE class_session_id = new.class_session_id;
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS attends_booked_delete AFTER DELETE ON Attends BEGIN
+            UPDATE Class_Session SET booked_count = booked_count - 1
+            WHERE class_session_id = old.class_session_id;
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS attends_booked_update AFTER UPDATE OF class_session_id ON Attends
+        WHEN old.class_session_id IS NOT new.class_session_id BEGIN
+            UPDATE Class_Session SET booked_count = booked_count - 1
+            WHERE class_session_id = old.class_session_id;
+            UPDATE Class_Session SET booked_count = booked_count + 1
+            WHERE class_session_id = new.class_session_id;
+        END
+    ''')
+
+
+def _migration_005_membership_sweeper(cur: sqlite3.Cursor) -> None:
+    # Only active memberships are indexed, so the expiry sweep reads just the
+    # rows it is about to change however much history accumulates
+    cur.execute('''
+        CREATE INDEX IF NOT EXISTS idx_membership_active_end
+        ON Membership(end_date) WHERE is_active = 1
+    ''')
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS Membership_Sweep (
+            sweep_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_at TEXT,
+            cutoff_date TEXT,
+            deactivated INTEGER,
+            duration_ms REAL
+        )
+    ''')
+
+
+# Seconds since 1970-01-01 of a 'YYYY-MM-DD HH:MM[:SS]' wall-clock time
+# (no time zone conversion); NULL when the text is not a valid timestamp
+_EPOCH: str = "CAST(strftime('%s', {value}) AS INTEGER)"
+
+_SESSION_START_TS: str = _EPOCH.format(value="{row}.start_time")
+_SESSION_END_TS: str = ("COALESCE(" + _EPOCH.format(value="{row}.end_time")
+                        + ", " + _SESSION_START_TS + " + {row}.duration * 60)")
+
+
+def _migration_006_epoch_timestamps(cur: sqlite3.Cursor) -> None:
+    # Integer copies of the TEXT times, maintained by triggers. Writers that
+    # already know the epoch values may insert them directly; the triggers
+    # only fill in what is missing.
+    cur.execute("ALTER TABLE Class_Session ADD COLUMN start_ts INTEGER")
+    cur.execute("ALTER TABLE Class_Session ADD COLUMN end_ts INTEGER")
+    cur.execute("ALTER TABLE Check_in ADD COLUMN checkin_ts INTEGER")
+    cur.execute("ALTER TABLE Check_in ADD COLUMN checkout_ts INTEGER")
+
+    # Sessions scheduled through the old form stored a placeholder instead of an end time
+    cur.execute('''
+        UPDATE Class_Session
+        SET end_time = strftime('%Y-%m-%d %H:%M', start_time, '+' || duration || ' minutes')
+        WHERE strftime('%s', end_time) IS NULL AND strftime('%s', start_time) IS NOT NULL
+          AND duration IS NOT NULL
+    ''')
+    cur.execute(f"UPDATE Class_Session SET start_ts = {_SESSION_START_TS.format(row='Class_Session')}, "
+                f"end_ts = {_SESSION_END_TS.format(row='Class_Session')}")
+    cur.execute(f"UPDATE Check_in SET checkin_ts = {_EPOCH.format(value='checkin_time')}, "
+                f"checkout_ts = {_EPOCH.format(value='checkout_time')}")
+
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS class_session_ts_insert AFTER INSERT ON Class_Session
+        WHEN new.start_ts IS NULL OR new.end_ts IS NULL BEGIN
+            UPDATE Class_Session
+            SET start_ts = COALESCE(new.start_ts, {_SESSION_START_TS.format(row='new')}),
+                end_ts = COALESCE(new.end_ts, {_SESSION_END_TS.format(row='new')})
+            WHERE class_session_id = new.class_session_id;
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS class_session_ts_update
+        AFTER UPDATE OF start_time, end_time, duration ON Class_Session BEGIN
+            UPDATE Class_Session
+            SET start_ts = {_SESSION_START_TS.format(row='new')}, end_ts = {_SESSION_END_TS.format(row='new')}
+            WHERE class_session_id = new.class_session_id;
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS check_in_ts_insert AFTER INSERT ON Check_in
+        WHEN new.checkin_ts IS NULL OR (new.checkout_ts IS NULL AND new.checkout_time IS NOT NULL) BEGIN
+            UPDATE Check_in
+            SET checkin_ts = COALESCE(new.checkin_ts, {_EPOCH.format(value='new.checkin_time')}),
+                checkout_ts = COALESCE(new.checkout_ts, {_EPOCH.format(value='new.checkout_time')})
+            WHERE checkin_id = new.checkin_id;
+        END
+    ''')
+    cur.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS check_in_ts_update AFTER UPDATE OF checkin_time, checkout_time ON Check_in BEGIN
+            UPDATE Check_in
+            SET checkin_ts = {_EPOCH.format(value='new.checkin_time')},
+                checkout_ts = {_EPOCH.format(value='new.checkout_time')}
+            WHERE checkin_id = new.checkin_id;
+        END
+    ''')
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_class_session_start_ts ON Class_Session(start_ts)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_check_in_ts ON Check_in(checkin_ts)")
+
+
+def _rebuild_table(cur: sqlite3.Cursor, table: str, rewrite: Callable[[str], str]) -> None:
+    """
+    Recreate `table` from its current CREATE statement passed through
+    `rewrite`, keeping its rows, AUTOINCREMENT counter, indexes and triggers.
+    Used for changes ALTER TABLE cannot make (e.g. foreign key actions).
+    Only safe for tables that no other table references.
+    """
+    create_sql = cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                             (table,)).fetchone()[0]
+    dependents = [row[0] for row in cur.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,))]
+    sequence = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    columns = ", ".join(row[1] for row in cur.execute(f"PRAGMA table_info({table})"))
+
+    staging = f"{table}_rebuild"
+    new_sql = rewrite(create_sql)
+    cur.execute(re.sub(rf"^CREATE TABLE \"?{table}\"?", f"CREATE TABLE {staging}", new_sql))
+    cur.execute(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table}")
+    # DROP TABLE does not fire triggers, so rollups and counters are untouched
+    cur.execute(f"DROP TABLE {table}")
+    # Legacy rename leaves other tables' triggers that mention `table` alone;
+    # they resolve to the new table once it has the old name
+    cur.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        cur.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+    finally:
+        cur.execute("PRAGMA legacy_alter_table = OFF")
+
+    for sql in dependents:
+        cur.execute(sql)
+    if sequence is not None:
+        cur.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+
+
+# Child table -> parents whose deletion should remove its rows
+_CASCADE_PARENTS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("Membership", ("Member",)),
+    ("Payment", ("Member",)),
+    ("Check_in", ("Member", "Class_Session")),
+    ("Attends", ("Member", "Class_Session")),
+    ("Teaches", ("Trainer", "Class_Session")),
+    ("Trainer_Specialization", ("Trainer",)),
+]
+
+
+def _migration_007_on_delete_cascade(cur: sqlite3.Cursor) -> None:
+    # Deleting a member, trainer or session removes its history in the same
+    # statement, so deletes no longer need one statement per child table
+    for table, parents in _CASCADE_PARENTS:
+        pattern = rf"(REFERENCES\s+({'|'.join(parents)})\s*\(\s*\w+\s*\))(?!\s+ON DELETE)"
+        _rebuild_table(cur, table, lambda sql: re.sub(pattern, r"\1 ON DELETE CASCADE", sql))
+
+
+def _migration_008_archive_guard(cur: sqlite3.Cursor) -> None:
+    # archive.py holds a row here while it moves payments out to the archive
+    # database, so the rollups keep counting them
+    cur.execute("CREATE TABLE IF NOT EXISTS Archive_Guard (active INTEGER NOT NULL)")
+    cur.execute("DROP TRIGGER IF EXISTS payment_rollup_delete")
+    cur.execute(f'''
+        CREATE TRIGGER payment_rollup_delete AFTER DELETE ON Payment
+        WHEN old.membership_type_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM Archive_Guard) BEGIN
+            {_rollup_subtract('old')}
+        END
+    ''')
+
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS Archive_Run (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_at TEXT NOT NULL,
+            cutoff_date TEXT NOT NULL,
+            checkins INTEGER NOT NULL,
+            payments INTEGER NOT NULL,
+            duration_ms REAL NOT NULL
+        )
+    ''')
+    # Archiving selects payments by date
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payment_date ON Payment(payment_date)")
+
+
+def _migration_009_session_rooms(cur: sqlite3.Cursor) -> None:
+    cur.execute("ALTER TABLE Class_Session ADD COLUMN room TEXT")
+
+    # Bumped by every change to when, where or by whom a session is taught,
+    # so conflicts.py knows when its cached interval index is out of date
+    cur.execute("CREATE TABLE IF NOT EXISTS Timetable_Revision (revision INTEGER NOT NULL)")
+    cur.execute("INSERT INTO Timetable_Revision (revision) VALUES (0)")
+    for name, event in [("timetable_session_insert", "INSERT ON Class_Session"),
+                        ("timetable_session_update", "UPDATE OF start_ts, end_ts, room ON Class_Session"),
+                        ("timetable_session_delete", "DELETE ON Class_Session"),
+                        ("timetable_teaches_insert", "INSERT ON Teaches"),
+                        ("timetable_teaches_update", "UPDATE ON Teaches"),
+                        ("timetable_teaches_delete", "DELETE ON Teaches")]:
+        cur.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} BEGIN
+                UPDATE Timetable_Revision SET revision = revision + 1;
+            END
+        ''')
+
+
+def _bump_member(member_id: str) -> str:
+    # One statement of a trigger body: the member's revision + 1 (first bump: 1)
+    return f'''
+        INSERT INTO Member_Revision (member_id, revision) VALUES ({member_id}, 1)
+        ON CONFLICT(member_id) DO UPDATE SET revision = revision + 1;
+    '''
+
+
+def _migration_010_member_revisions(cur: sqlite3.Cursor) -> None:
+    # Bumped by every change to a member's own rows, so member_profile.py
+    # knows when one cached profile is out of date; no row means revision 0
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS Member_Revision (
+            member_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL
+        )
+    ''')
+    for table in ["Member", "Membership", "Payment", "Check_in", "Attends"]:
+        prefix = f"member_revision_{table.lower()}"
+        if table != "Member":
+            cur.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {prefix}_insert AFTER INSERT ON {table} BEGIN
+                    {_bump_member('new.member_id')}
+                END
+            ''')
+        # Rows moved to another member change both profiles
+        cur.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {prefix}_update AFTER UPDATE ON {table} BEGIN
+                {_bump_member('old.member_id')}
+                {_bump_member('new.member_id')}
+            END
+        ''')
+        cur.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {prefix}_delete AFTER DELETE ON {table} BEGIN
+                {_bump_member('old.member_id')}
+            END
+        ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS member_revision_person_update
+        AFTER UPDATE OF first_name, last_name, email, phone, city ON Person BEGIN
+            INSERT INTO Member_Revision (member_id, revision)
+            SELECT member_id, 1 FROM Member WHERE person_id = new.id
+            ON CONFLICT(member_id) DO UPDATE SET revision = revision + 1;
+        END
+    ''')
+
+    # Lifetime spend and recent payments of one member straight from the
+    # index; it also serves every lookup idx_payment_member did
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_payment_member_date ON Payment(member_id, payment_date, amount)")
+    cur.execute("DROP INDEX IF EXISTS idx_payment_member")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "Foreign-key and composite lookup indexes", _migration_001_foreign_key_indexes),
+    (2, "FTS5 search index over Person", _migration_002_person_search),
+    (3, "Daily and monthly revenue rollups maintained by Payment triggers", _migration_003_revenue_rollups),
+    (4, "Class_Session.booked_count maintained by Attends triggers", _migration_004_session_booked_count),
+    (5, "Partial index on active memberships and the expiry sweep log", _migration_005_membership_sweeper),
+    (6, "Integer epoch timestamps for sessions and check-ins", _migration_006_epoch_timestamps),
+    (7, "ON DELETE CASCADE from members, trainers and sessions to their history", _migration_007_on_delete_cascade),
+    (8, "Archive run log and a guard that keeps archived payments in the rollups", _migration_008_archive_guard),
+    (9, "Class_Session.room and a timetable revision counter for conflict checks", _migration_009_session_rooms),
+    (10, "Per-member revision counters for profile caching and a covering payment index",
+     _migration_010_member_revisions),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Return the highest applied migration version (0 for a fresh database).
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS Schema_Version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM Schema_Version").fetchone()
+    return row[0] or 0
+
+
+def run_migrations(conn: sqlite3.Connection) -> int:
+    """
+    Apply every pending migration in order and return the resulting version.
+    Each step runs in its own IMMEDIATE transaction, so two processes
+    upgrading the same gym.db cannot apply a migration twice.
+    """
+    version = get_schema_version(conn)
+    pending = [m for m in MIGRATIONS if m[0] > version]
+    cur = conn.cursor()
+
+    for number, description, apply in pending:
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we were waiting for the lock
+            cur.execute("SELECT 1 FROM Schema_Version WHERE version = ?", (number,))
+            if cur.fetchone() is None:
+                apply(cur)
+                cur.execute("INSERT INTO Schema_Version (version, description, applied_at) VALUES (?, ?, ?)",
+                            (number, description, datetime.now().isoformat(timespec="seconds")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+
+    if pending:
+        # Refresh planner statistics for the new indexes
+        cur.execute("PRAGMA optimize;")
+    return version
+
+
+if __name__ == "__main__":
+    # Upgrade an existing gym.db in place: python database.py
+    create_tables()
+    with connection() as conn:
+        print(f"{DATABASE_NAME} is at schema version {get_schema_version(conn)}")
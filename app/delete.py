@@ -1,23 +1,179 @@
 import streamlit as st
-import sqlite3
-from database import DATABASE_NAME
+import pandas as pd
+from archive import archive_if_present, purge_archived
+from bulk_delete import BULK_DELETE_LIMIT, MemberFilter, count_dependents, delete_members, find_members
+from fragments import form_fragment
+from datetime import date
+from options import get_options
+from pickers import member_picker, trainer_picker
+from statements import execute, sql
+from validation import MEMBER_STATUS_OPTIONS
+
+
+# ==========================================
+# DELETE MEMBER
+# ==========================================
+@form_fragment("Delete / Delete Member")
+def delete_member(cur, conn):
+    st.subheader("Delete Member & All History")
+
+    member = member_picker("Select Member", key="delete_member")
+
+    if member:
+        selected_member, member_id = member
+
+        st.error(f"Deleting **{selected_member}** will also delete their Payments, Check-ins, and Memberships.")
+
+        if st.button("Confirm Force Delete"):
+            try:
+                with archive_if_present(conn):
+                    cur.execute("BEGIN IMMEDIATE")
+                    # Check-ins, bookings, payments and memberships follow via ON DELETE CASCADE;
+                    # archived check-ins and payments are outside its reach
+                    purge_archived(cur, "member_id", [member_id])
+                    execute(cur, "delete_member", (member_id,))
+                    conn.commit()
+                st.success(f"Member and all related data deleted successfully!")
+                st.rerun(scope="fragment")
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Error during deletion: {e}")
+
+
+# ==========================================
+# DELETE TRAINER
+# ==========================================
+@form_fragment("Delete / Delete Trainer")
+def delete_trainer(cur, conn):
+    st.subheader("Delete Trainer")
+
+    trainer = trainer_picker("Select Trainer", key="delete_trainer")
+
+    if trainer:
+        selected_trainer, trainer_id = trainer
+
+        st.error(f"Deleting **{selected_trainer}** will unassign them from all classes.")
+
+        if st.button("Confirm Force Delete"):
+            try:
+                # Teaching assignments and specializations follow via ON DELETE CASCADE
+                execute(cur, "delete_trainer", (trainer_id,))
+                conn.commit()
+                st.success("Trainer deleted successfully!")
+                st.rerun(scope="fragment")
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Error: {e}")
+
+
+# ==========================================
+# CANCEL CLASS SESSION
+# ==========================================
+@form_fragment("Delete / Cancel Class Session")
+def cancel_class_session(cur, conn):
+    st.subheader("Cancel Session")
+
+    session_map = get_options(sql("session_options"))
+
+    if not session_map:
+        st.info("No sessions found.")
+    else:
+        selected_session = st.selectbox("Select Session", list(session_map.keys()))
+        session_id = session_map[selected_session]
+
+        st.error(f"This will cancel the session **{selected_session}** and remove all attendance records.")
+
+        if st.button("Confirm Cancel"):
+            try:
+                with archive_if_present(conn):
+                    cur.execute("BEGIN IMMEDIATE")
+                    # Check-ins, bookings and teaching assignments follow via ON DELETE CASCADE;
+                    # archived check-ins are outside its reach
+                    purge_archived(cur, "class_session_id", [session_id])
+                    execute(cur, "delete_class_session", (session_id,))
+                    conn.commit()
+                st.success("Session cancelled and removed from calendar.")
+                st.rerun(scope="fragment")
+            except Exception as e:
+                conn.rollback()
+                st.error(f"Error: {e}")
+
+
+# ==========================================
+# REMOVE MEMBERSHIP
+# ==========================================
+@form_fragment("Delete / Remove Membership Package")
+def remove_membership_package(cur, conn):
+    st.subheader("Delete Membership Record")
+
+    mship_map = get_options(sql("membership_options"))
+
+    if not mship_map:
+        st.info("No memberships found.")
+    else:
+        sel_mship = st.selectbox("Select Membership", list(mship_map.keys()))
+        ms_id = mship_map[sel_mship]
+
+        if st.button("Delete"):
+            try:
+                execute(cur, "delete_membership", (ms_id,))
+                conn.commit()
+                st.success("Membership record deleted.")
+                st.rerun(scope="fragment")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+
+# ==========================================
+# BULK DELETE MEMBERS
+# ==========================================
+@form_fragment("Delete / Bulk Delete Members")
+def bulk_delete_members(cur, conn):
+    st.subheader("Bulk Delete Members & All History")
+
+    col1, col2 = st.columns(2)
+    statuses = col1.multiselect("Member Status", MEMBER_STATUS_OPTIONS, default=["inactive"])
+    use_cutoff = col2.checkbox("Only members inactive since a date", value=True)
+    inactive_since = col2.date_input("No check-in or membership since", value=date(date.today().year - 2, 1, 1),
+                                     disabled=not use_cutoff)
+
+    matches = find_members(conn, MemberFilter(statuses, inactive_since if use_cutoff else None))
+    if not matches:
+        st.info("No members match this filter.")
+        return
+
+    if len(matches) == BULK_DELETE_LIMIT:
+        st.warning(f"Showing the first {BULK_DELETE_LIMIT:,} matches; run the purge again for the rest.")
+
+    # Untick anyone who should be kept
+    selection = st.data_editor(
+        pd.DataFrame(matches, columns=["member_id", "name", "status", "last_check_in"]).assign(delete=True),
+        disabled=["member_id", "name", "status", "last_check_in"],
+        hide_index=True, use_container_width=True,
+        key=f"bulk_delete_{'_'.join(statuses)}_{inactive_since if use_cutoff else ''}",
+    )
+    member_ids = [int(i) for i in selection.loc[selection["delete"], "member_id"]]
+
+    dependents = count_dependents(conn, member_ids)
+    st.error(f"Deleting **{len(member_ids):,}** members will also delete "
+             + ", ".join(f"{count:,} {table}" for table, count in dependents.items()) + " rows.")
+
+    if member_ids and st.button("Confirm Bulk Delete"):
+        bar = st.progress(0.0, text="Deleting...")
+        try:
+            removed = delete_members(conn, member_ids,
+                                     progress=lambda done, total: bar.progress(done / total,
+                                                                               text=f"{done:,} / {total:,} members"))
+            st.success("Deleted " + ", ".join(f"{count:,} {table}" for table, count in removed.items()) + " rows.")
+        except Exception as e:
+            st.error(f"Error during deletion, nothing was deleted: {e}")
 
-def get_options(query):
-    """
-    Helper function to fetch dropdown options.
-    """
-    conn = sqlite3.connect(DATABASE_NAME)
-    cur = conn.cursor()
-    cur.execute(query)
-    data = cur.fetchall()
-    conn.close()
-    return {row[0]: row[1] for row in data} if data else {}
 
 def render_delete_page():
     """
     Page for deleting records.
-    Implements 'Cascade Deletion' logic: it automatically removes related
-    dependencies (child records) before deleting the main record to prevent errors.
+    Related history (child records) is removed by the schema's ON DELETE CASCADE
+    foreign keys in the same statement as the main record.
     """
     st.header("Delete Records (Force Delete)")
     st.warning("WARNING: These actions will permanently remove the record AND all its related history (Payments, Attendance, etc.). This cannot be undone.")
@@ -26,153 +182,20 @@ def render_delete_page():
         "Delete Member",
         "Delete Trainer",
         "Cancel Class Session",
-        "Remove Membership Package"
+        "Remove Membership Package",
+        "Bulk Delete Members"
     ]
 
     choice = st.selectbox("Select Deletion Type", menu_options)
 
-    conn = sqlite3.connect(DATABASE_NAME)
-    cur = conn.cursor()
-    
-    # ==========================================
-    # DELETE MEMBER
-    # ==========================================
+    # Each form is a fragment with its own connection; see fragments.py
     if choice == "Delete Member":
-        st.subheader("Delete Member & All History")
-
-        member_map = get_options("""
-            SELECT p.first_name || ' ' || p.last_name || ' (ID: ' || m.member_id || ')', m.member_id
-            FROM Member m JOIN Person p ON m.person_id = p.id
-        """)
-
-        if not member_map:
-            st.info("No members found.")
-        else:
-            selected_member = st.selectbox("Select Member", list(member_map.keys()))
-            member_id = member_map[selected_member]
-
-            st.error(f"Deleting **{selected_member}** will also delete their Payments, Check-ins, and Memberships.")
-
-            if st.button("Confirm Force Delete"):
-                try:
-                    # Delete Dependencies (Children)
-                    cur.execute("DELETE FROM Check_in WHERE member_id = ?", (member_id,))
-                    cur.execute("DELETE FROM Attends WHERE member_id = ?", (member_id,))
-                    cur.execute("DELETE FROM Payment WHERE member_id = ?", (member_id,))
-                    cur.execute("DELETE FROM Membership WHERE member_id = ?", (member_id,))
-                    
-                    # Delete Member (Parent)
-                    cur.execute("DELETE FROM Member WHERE member_id = ?", (member_id,))
-                    
-
-                    conn.commit()
-                    st.success(f"Member and all related data deleted successfully!")
-                    st.rerun()
-                except Exception as e:
-                    conn.rollback()
-                    st.error(f"Error during deletion: {e}")
-
-    # ==========================================
-    # DELETE TRAINER
-    # ==========================================
+        delete_member()
     elif choice == "Delete Trainer":
-        st.subheader("Delete Trainer")
-
-        trainer_map = get_options("""
-            SELECT p.first_name || ' ' || p.last_name, t.trainer_id
-            FROM Trainer t JOIN Person p ON t.person_id = p.id
-        """)
-
-        if not trainer_map:
-            st.info("No trainers found.")
-        else:
-            selected_trainer = st.selectbox("Select Trainer", list(trainer_map.keys()))
-            trainer_id = trainer_map[selected_trainer]
-
-            st.error(f"Deleting **{selected_trainer}** will unassign them from all classes.")
-
-            if st.button("Confirm Force Delete"):
-                try:
-                    # Delete Dependencies
-                    cur.execute("DELETE FROM Teaches WHERE trainer_id = ?", (trainer_id,))
-                    cur.execute("DELETE FROM Trainer_Specialization WHERE trainer_id = ?", (trainer_id,))
-                    
-                    # Delete Trainer
-                    cur.execute("DELETE FROM Trainer WHERE trainer_id = ?", (trainer_id,))
-                    
-                    conn.commit()
-                    st.success("Trainer deleted successfully!")
-                    st.rerun()
-                except Exception as e:
-                    conn.rollback()
-                    st.error(f"Error: {e}")
-
-    # ==========================================
-    # CANCEL CLASS SESSION
-    # ==========================================
+        delete_trainer()
     elif choice == "Cancel Class Session":
-        st.subheader("Cancel Session")
-
-        session_map = get_options("""
-            SELECT c.class_name || ' (' || cs.start_time || ')', cs.class_session_id
-            FROM Class_Session cs
-            JOIN Class c ON cs.class_id = c.class_id
-            ORDER BY cs.start_time DESC
-        """)
-
-        if not session_map:
-            st.info("No sessions found.")
-        else:
-            selected_session = st.selectbox("Select Session", list(session_map.keys()))
-            session_id = session_map[selected_session]
-
-            st.error(f"This will cancel the session **{selected_session}** and remove all attendance records.")
-
-            if st.button("Confirm Cancel"):
-                try:
-                    # Delete Dependencies
-                    cur.execute("DELETE FROM Check_in WHERE class_session_id = ?", (session_id,))
-                    cur.execute("DELETE FROM Attends WHERE class_session_id = ?", (session_id,))
-                    cur.execute("DELETE FROM Teaches WHERE class_session_id = ?", (session_id,))
-                    
-                    # Delete Session
-                    cur.execute("DELETE FROM Class_Session WHERE class_session_id = ?", (session_id,))
-                    
-                    conn.commit()
-                    st.success("Session cancelled and removed from calendar.")
-                    st.rerun()
-                except Exception as e:
-                    conn.rollback()
-                    st.error(f"Error: {e}")
-
-    # ==========================================
-    # REMOVE MEMBERSHIP
-    # ==========================================
+        cancel_class_session()
     elif choice == "Remove Membership Package":
-        st.subheader("Delete Membership Record")
-
-        mship_map = get_options("""
-            SELECT (p.first_name || ' ' || p.last_name || ' - ' || mt.name || 
-                    ' (End: ' || ms.end_date || ')'), ms.membership_id
-            FROM Membership ms
-            JOIN Member m ON ms.member_id = m.member_id
-            JOIN Person p ON m.person_id = p.id
-            JOIN Membership_Type mt ON ms.membership_type_id = mt.membership_type_id
-        """)
-
-        if not mship_map:
-            st.info("No memberships found.")
-        else:
-            sel_mship = st.selectbox("Select Membership", list(mship_map.keys()))
-            ms_id = mship_map[sel_mship]
-
-            if st.button("Delete"):
-                try:
-                    cur.execute("DELETE FROM Membership WHERE membership_id = ?", (ms_id,))
-                    conn.commit()
-                    st.success("Membership record deleted.")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error: {e}")
-
-    conn.close()
\ No newline at end of file
+        remove_membership_package()
+    elif choice == "Bulk Delete Members":
+        bulk_delete_members()
@@ -0,0 +1,124 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import tracing
+from archive import ARCHIVE_AFTER_DAYS, ARCHIVE_PATH, default_cutoff, recent_archive_runs, run_archive
+from conflicts import scan_conflicts
+from database import connection
+from sweeper import SWEEP_INTERVAL_SECONDS, recent_sweeps, run_sweep
+
+
+def _highlight_slow(threshold_ms):
+    def style(row):
+        slow = row["duration_ms"] >= threshold_ms
+        return ["background-color: #ffcccc" if slow else "" for _ in row]
+    return style
+
+
+def render_diagnostics_page():
+    """
+    Page for inspecting SQL traces and per-page latency.
+    Tracing is process-wide and off by default (enable it here or with GYM_SQL_TRACE=1).
+    """
+    st.header("🩺 Diagnostics")
+
+    enabled = st.toggle("Record SQL statements", value=tracing.is_enabled())
+    if enabled != tracing.is_enabled():
+        tracing.set_enabled(enabled)
+
+    col1, col2 = st.columns(2)
+    threshold = col1.number_input("Slow query threshold (ms)", min_value=1.0, value=tracing.SLOW_QUERY_MS, step=10.0)
+    only_slow = col2.checkbox("Show only slow queries")
+
+    if st.button("Clear Recorded Data"):
+        tracing.clear()
+
+    # ==========================================
+    # PER-PAGE LATENCY
+    # ==========================================
+    st.subheader("Page Latency")
+    pages = pd.DataFrame(tracing.page_timings())
+
+    if pages.empty:
+        st.info("No page timings recorded yet. Enable tracing and use the app.")
+    else:
+        summary = pages.groupby("scope").agg(
+            renders=("duration_ms", "size"),
+            p50_ms=("duration_ms", "median"),
+            max_ms=("duration_ms", "max"),
+            p50_cpu_ms=("cpu_ms", "median"),
+            avg_sql_ms=("sql_ms", "mean"),
+            avg_statements=("statements", "mean"),
+        ).sort_values("p50_ms", ascending=False)
+        st.dataframe(summary.round(2), use_container_width=True)
+
+    # ==========================================
+    # MEMBERSHIP EXPIRY SWEEPS
+    # ==========================================
+    st.subheader("Membership Expiry Sweeps")
+    st.caption(f"Expired memberships are deactivated every {SWEEP_INTERVAL_SECONDS:g} s "
+               "(GYM_SWEEP_INTERVAL, 0 = off).")
+    if st.button("Run Sweep Now"):
+        st.success(f"{run_sweep():,} memberships deactivated.")
+    st.dataframe(pd.DataFrame(recent_sweeps()), use_container_width=True)
+
+    # ==========================================
+    # ARCHIVING
+    # ==========================================
+    st.subheader("Check-in and Payment Archive")
+    st.caption(f"Moves check-ins and payments dated before the cutoff into {ARCHIVE_PATH}. "
+               f"The default cutoff is {ARCHIVE_AFTER_DAYS} days ago (GYM_ARCHIVE_AFTER_DAYS).")
+    cutoff = st.date_input("Archive rows dated before", value=default_cutoff())
+    if st.button("Archive Now"):
+        progress = st.empty()
+        with tracing.trace_scope("Diagnostics / Archive"):
+            moved = run_archive(cutoff, progress=lambda table, n: progress.caption(f"{table}: {n:,} rows moved..."))
+        progress.success(f"{moved['Check_in']:,} check-ins and {moved['Payment']:,} payments archived.")
+    st.dataframe(pd.DataFrame(recent_archive_runs()), use_container_width=True)
+
+    # ==========================================
+    # TIMETABLE CONFLICTS
+    # ==========================================
+    st.subheader("Timetable Conflicts")
+    st.caption("Trainers and rooms booked for overlapping sessions. New and moved sessions are checked "
+               "when they are saved; this scans the whole timetable, e.g. after an import.")
+    if st.button("Scan Timetable"):
+        with connection() as conn, tracing.trace_scope("Diagnostics / Timetable Scan"):
+            pairs = scan_conflicts(conn)
+        if pairs:
+            st.error(f"{len(pairs):,} overlapping pairs found.")
+            st.dataframe(pd.DataFrame([{
+                "kind": first.kind, "trainer / room": str(first.resource),
+                "session": first.session_id, "start": first.start, "end": first.end,
+                "overlaps session": second.session_id, "its start": second.start, "its end": second.end,
+            } for first, second in pairs]), use_container_width=True)
+        else:
+            st.success("No trainer or room is double-booked.")
+
+    # ==========================================
+    # SQL STATEMENTS
+    # ==========================================
+    st.subheader("SQL Statements")
+    statements = pd.DataFrame(tracing.statements())
+
+    if statements.empty:
+        st.info("No statements recorded yet.")
+        return
+
+    statements["started_at"] = pd.to_datetime(statements["started_at"], unit="s")
+    statements = statements.sort_values("started_at", ascending=False)
+    if only_slow:
+        statements = statements[statements["duration_ms"] >= threshold]
+
+    slow_count = int((statements["duration_ms"] >= threshold).sum())
+    st.caption(f"{len(statements):,} statements shown, {slow_count:,} at or above {threshold:g} ms")
+    st.dataframe(statements.style.apply(_highlight_slow(threshold), axis=1).format({"duration_ms": "{:.3f}"}),
+                 use_container_width=True)
+
+    # Export what is currently shown
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    exp1, exp2 = st.columns(2)
+    exp1.download_button("Export CSV", statements.to_csv(index=False), file_name=f"sql_trace_{stamp}.csv",
+                         mime="text/csv")
+    exp2.download_button("Export JSON", statements.to_json(orient="records", date_format="iso"),
+                         file_name=f"sql_trace_{stamp}.json", mime="application/json")
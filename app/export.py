@@ -0,0 +1,192 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+from typing import Callable, IO, Iterator, List, Optional, Sequence, Tuple
+from connection import DATABASE_NAME, open_connection
+from archive import ARCHIVE_RULES, attach_archive
+from queries import PAGE_KEYS, archive_source, get_custom_query
+
+# ============================================
+# Streaming Export
+# ============================================
+# Rows are pulled from the cursor FETCH_SIZE at a time and written straight
+# to the output, so memory use depends on the chunk size, not on the table.
+# Views are the joined queries shown on View Tables; raw tables are exported
+# column for column.
+
+EXPORT_FORMATS: List[str] = ["csv", "jsonl", "parquet"]
+FETCH_SIZE: int = 5000
+VIEW_NAMES: List[str] = list(PAGE_KEYS)
+EXPORT_DIR: str = "exports"
+# Files up to this size are offered as a browser download; larger ones stay in EXPORT_DIR
+DOWNLOAD_LIMIT_BYTES: int = 100 * 1024 * 1024
+
+Progress = Callable[[int], None]
+
+
+def list_raw_tables(conn: sqlite3.Connection) -> List[str]:
+    """
+    Every ordinary table, without SQLite internals and full-text index shadows.
+    """
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name").fetchall()
+    virtual = [name for name, sql in rows if sql and sql.upper().startswith("CREATE VIRTUAL")]
+    return [name for name, _ in rows
+            if not name.startswith("sqlite_") and name not in virtual
+            and not any(name.startswith(v + "_") for v in virtual)]
+
+
+def export_sql(conn: sqlite3.Connection, name: str, raw: bool = False, include_archive: bool = False) -> str:
+    """
+    The SELECT behind an export. Names are checked against the schema
+    because they end up in the SQL text. include_archive needs the archive attached.
+    """
+    if raw:
+        if name not in list_raw_tables(conn):
+            raise ValueError(f"Unknown table: {name}")
+        if include_archive and name in ARCHIVE_RULES:
+            return f"SELECT * FROM {archive_source(name)}"
+        return f'SELECT * FROM "{name}"'
+    if name not in VIEW_NAMES:
+        raise ValueError(f"Unknown view: {name}")
+    return get_custom_query(name, include_archive)
+
+
+def _chunks(cur: sqlite3.Cursor) -> Iterator[List[Tuple]]:
+    while True:
+        rows = cur.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def _write_csv(cur: sqlite3.Cursor, columns: List[str], out: IO[bytes], progress: Optional[Progress]) -> int:
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(columns)
+    count = 0
+    try:
+        for rows in _chunks(cur):
+            writer.writerows(rows)
+            count += len(rows)
+            if progress:
+                progress(count)
+    finally:
+        # Hand the underlying stream back to the caller open
+        text.detach()
+    return count
+
+
+def _write_jsonl(cur: sqlite3.Cursor, columns: List[str], out: IO[bytes], progress: Optional[Progress]) -> int:
+    count = 0
+    for rows in _chunks(cur):
+        out.write("".join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+                          for row in rows).encode("utf-8"))
+        count += len(rows)
+        if progress:
+            progress(count)
+    return count
+
+
+def _write_parquet(cur: sqlite3.Cursor, columns: List[str], out: IO[bytes], progress: Optional[Progress]) -> int:
+    """
+    One row group per fetched chunk. The schema comes from the first chunk;
+    columns that are entirely NULL there are written as strings.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package.") from e
+
+    writer = None
+    schema = None
+    count = 0
+    try:
+        for rows in _chunks(cur):
+            data = {name: [row[i] for row in rows] for i, name in enumerate(columns)}
+            if schema is None:
+                inferred = pa.Table.from_pydict(data).schema
+                schema = pa.schema([pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type)
+                                    for f in inferred])
+                writer = pq.ParquetWriter(out, schema)
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            count += len(rows)
+            if progress:
+                progress(count)
+        if writer is None:
+            # Empty result: still produce a valid file with the column names
+            schema = pa.schema([pa.field(name, pa.string()) for name in columns])
+            writer = pq.ParquetWriter(out, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+_WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_query(conn: sqlite3.Connection, sql: str, fmt: str, out: IO[bytes],
+                 params: Sequence = (), progress: Optional[Progress] = None) -> int:
+    """
+    Stream the result of `sql` to the binary stream `out`. Returns the row count.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported format: {fmt} (choose from {', '.join(EXPORT_FORMATS)})")
+    cur = conn.execute(sql, params)
+    columns = [d[0] for d in cur.description]
+    try:
+        return _WRITERS[fmt](cur, columns, out, progress)
+    finally:
+        cur.close()
+
+
+def export_file_name(name: str, fmt: str, raw: bool = False) -> str:
+    return f"{name}{'' if raw else '_view'}.{fmt}"
+
+
+def export_to_file(conn: sqlite3.Connection, name: str, fmt: str, path: str, raw: bool = False,
+                   progress: Optional[Progress] = None, include_archive: bool = False) -> int:
+    """
+    Export one view or raw table to `path`. A failed export leaves no partial file.
+    """
+    sql = export_sql(conn, name, raw, include_archive)
+    partial = path + ".part"
+    try:
+        with open(partial, "wb") as f:
+            count = export_query(conn, sql, fmt, f, progress=progress)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export views or raw tables as CSV, JSONL or Parquet.")
+    parser.add_argument("names", nargs="*", help="views/tables to export (default: all)")
+    parser.add_argument("--raw", action="store_true", help="export raw tables instead of the joined views")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--output-dir", default=EXPORT_DIR)
+    parser.add_argument("--include-archive", action="store_true", help="add archived check-ins and payments")
+    args = parser.parse_args()
+
+    export_conn = open_connection(args.database)
+    try:
+        names = args.names or (list_raw_tables(export_conn) if args.raw else VIEW_NAMES)
+        os.makedirs(args.output_dir, exist_ok=True)
+        with attach_archive(export_conn) if args.include_archive else contextlib.nullcontext():
+            for export_name in names:
+                target = os.path.join(args.output_dir, export_file_name(export_name, args.format, args.raw))
+                started = time.perf_counter()
+                exported = export_to_file(export_conn, export_name, args.format, target, args.raw,
+                                          include_archive=args.include_archive)
+                print(f"{export_name:<24}{exported:>12,} rows -> {target} ({time.perf_counter() - started:.2f}s)")
+    finally:
+        export_conn.close()
@@ -0,0 +1,33 @@
+import functools
+from typing import Callable
+import sqlite3
+import streamlit as st
+from database import connection
+from tracing import trace_scope
+
+# ============================================
+# Form Fragments
+# ============================================
+# Every form on the Insertion, Update and Delete pages runs as an st.fragment:
+# typing in a search box or pressing a form button reruns that form only,
+# not app.py, the sidebar and the rest of the page. A fragment rerun has no
+# page around it, so each fragment leases its own pooled connection and
+# reads its option lists through options.get_options, which stays cached
+# until PRAGMA data_version says the database changed.
+
+FormFunction = Callable[[sqlite3.Cursor, sqlite3.Connection], None]
+
+
+def form_fragment(scope: str) -> Callable[[FormFunction], Callable[[], None]]:
+    """
+    Turn a form function `fn(cur, conn)` into a no-argument st.fragment that
+    leases a connection and records each (re)run under `scope` on the
+    Diagnostics page.
+    """
+    def decorate(fn: FormFunction) -> Callable[[], None]:
+        @functools.wraps(fn)
+        def run() -> None:
+            with connection() as conn, trace_scope(scope):
+                fn(conn.cursor(), conn)
+        return st.fragment(run)
+    return decorate
@@ -0,0 +1,345 @@
+import argparse
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+from connection import open_connection
+from database import create_schema
+from timestamps import TIME_FORMAT
+
+# ============================================
+# Synthetic Data Generator
+# ============================================
+# Fills the full schema with production-sized, realistic data for load tests
+# and benchmarks. Output is a pure function of (scale, seed, anchor date), and
+# rows are streamed in fixed-size executemany batches, so memory stays bounded
+# no matter how many check-ins are generated.
+
+BATCH_SIZE: int = 10000
+
+# Fixed "today" so the same seed always produces the same database
+DEFAULT_ANCHOR: date = date(2025, 12, 1)
+
+FIRST_NAMES: List[str] = [
+    "Ali", "Zeynep", "Kemal", "Emir", "Ece", "Mert", "Seda", "Kerem", "Leyla", "Baran",
+    "Pınar", "Volkan", "Aslı", "Serkan", "Derya", "Tolga", "Yasemin", "Ozan", "Berna", "Koray",
+    "Elif", "Can", "Deniz", "Burak", "Selin", "Emre", "Merve", "Cem", "Gizem", "Hakan",
+]
+LAST_NAMES: List[str] = [
+    "Yıldız", "Arslan", "Demir", "Salaman", "Aksoy", "Öztürk", "Kaya", "Şahin", "Çelik", "Koç",
+    "Tekin", "Yılmaz", "Güneş", "Bulut", "Tunç", "Erkin", "Kurt", "Acar", "Polat", "Avcı",
+]
+# (city, relative weight)
+CITIES: List[Tuple[str, int]] = [
+    ("Istanbul", 40), ("Ankara", 15), ("Izmir", 12), ("Bursa", 7), ("Antalya", 6),
+    ("Adana", 5), ("Konya", 4), ("Gaziantep", 4), ("Kayseri", 3), ("Eskişehir", 4),
+]
+# (name, price, length in days, relative weight)
+MEMBERSHIP_PLANS: List[Tuple[str, float, int, int]] = [
+    ("Monthly Standard", 500.0, 30, 35), ("Yearly Gold", 5000.0, 365, 10),
+    ("Student Monthly", 350.0, 30, 15), ("Weekly Pass", 150.0, 7, 5),
+    ("Daily Drop-in", 50.0, 1, 5), ("VIP Platinum", 10000.0, 365, 2),
+    ("Corporate Plan", 4500.0, 365, 8), ("Off-Peak Access", 300.0, 30, 10),
+    ("Senior Citizen", 250.0, 30, 5), ("Family Bundle", 8000.0, 365, 5),
+]
+MEMBER_STATUSES: List[Tuple[str, int]] = [("active", 70), ("inactive", 20), ("pending", 7), ("banned", 3)]
+TRAINER_STATUSES: List[Tuple[str, int]] = [("active", 85), ("on_leave", 10), ("terminated", 5)]
+PAYMENT_METHODS: List[Tuple[str, int]] = [("credit_card", 60), ("cash", 25), ("transfer", 15)]
+SPECIALIZATIONS: List[str] = [
+    "Yoga", "Pilates", "HIIT", "Boxing", "Swimming", "BodyBuilding", "Zumba", "CrossFit", "Spinning", "Kickboxing",
+]
+CLASS_LEVELS: List[str] = ["Intro", "Basics", "Flow", "Power", "Advanced", "Express"]
+# Class start hours, weighted towards mornings and after work
+SESSION_HOURS: List[Tuple[int, int]] = [
+    (7, 8), (8, 8), (9, 6), (10, 4), (11, 3), (12, 5), (13, 3), (14, 2),
+    (15, 2), (16, 3), (17, 7), (18, 10), (19, 10), (20, 6), (21, 3),
+]
+
+ROOMS: List[str] = ["Studio A", "Studio B", "Studio C", "Spin Room", "Pool", "Boxing Ring"]
+
+PAYMENT_SQL: str = "INSERT INTO Payment (member_id, payment_date, method, amount) VALUES (?, ?, ?, ?)"
+
+
+@dataclass
+class Scale:
+    members: int = 100000
+    trainers: int = 500
+    classes: int = 60
+    sessions: int = 50000
+    checkins: int = 2000000
+    years: int = 3
+
+    @classmethod
+    def proportional(cls, checkins: int) -> "Scale":
+        """
+        A balanced dataset sized by its largest table (Check_in).
+        """
+        members = max(100, checkins // 20)
+        return cls(members=members, trainers=max(5, members // 200), classes=60,
+                   sessions=max(50, checkins // 40), checkins=checkins)
+
+
+def _weighted(rng: random.Random, pairs: List[Tuple]) -> object:
+    return rng.choices([p[0] for p in pairs], weights=[p[-1] for p in pairs])[0]
+
+
+def _next_id(cur: sqlite3.Cursor, table: str, column: str) -> int:
+    cur.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return cur.fetchone()[0] + 1
+
+
+def _insert_batches(conn: sqlite3.Connection, sql: str, rows: Iterable[tuple]) -> int:
+    """
+    Stream rows into the database BATCH_SIZE at a time, committing each batch.
+    """
+    cur = conn.cursor()
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return total
+        cur.executemany(sql, batch)
+        conn.commit()
+        total += len(batch)
+
+
+def _people(rng: random.Random, first_id: int, count: int, anchor: date) -> Iterator[tuple]:
+    cities = [c for c, _ in CITIES]
+    city_weights = [w for _, w in CITIES]
+    for pid in range(first_id, first_id + count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        age_days = int(min(70, max(16, rng.gauss(33, 10))) * 365.25)
+        birth = anchor - timedelta(days=age_days + rng.randrange(365))
+        yield (pid, first, last, birth.isoformat(),
+               f"{first.lower()}.{last.lower()}{pid}@example.com",
+               f"+90{rng.randrange(500, 560)}{rng.randrange(10 ** 7):07d}",
+               rng.choices(cities, weights=city_weights)[0],
+               f"{rng.choice(LAST_NAMES)} Sk. No:{rng.randrange(1, 200)}",
+               f"{rng.randrange(1, 82):02d}{rng.randrange(1000):03d}")
+
+
+def _contacts(rng: random.Random, first_id: int, count: int) -> Iterator[tuple]:
+    for pid in range(first_id, first_id + count):
+        yield (pid, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+               rng.choice(["family", "spouse", "friend", "parent", "sibling"]),
+               f"+90{rng.randrange(500, 560)}{rng.randrange(10 ** 7):07d}")
+
+
+def _memberships_and_payments(rng: random.Random, first_member: int, count: int, plans: List[tuple],
+                              anchor: date, years: int) -> Iterator[Tuple[tuple, tuple]]:
+    """
+    Yield (membership row, payment row) pairs: each member joins at a random
+    point in the window and renews back-to-back plans with some gaps and churn.
+    """
+    plan_weights = [p[3] for p in plans]
+    window = years * 365
+    for member_id in range(first_member, first_member + count):
+        start = anchor - timedelta(days=rng.randrange(window))
+        for _ in range(24):
+            plan_id, price, days, _weight = rng.choices(plans, weights=plan_weights)[0]
+            end = start + timedelta(days=days)
+            yield ((member_id, plan_id, 1 if end >= anchor else 0, start.isoformat(), end.isoformat()),
+                   (member_id, start.isoformat(), _weighted(rng, PAYMENT_METHODS), price))
+
+            # Most members renew, some after a short break
+            if rng.random() > 0.75:
+                break
+            start = end + timedelta(days=rng.choice([0, 0, 0, 1, 3, 14, 45]))
+            if start > anchor:
+                break
+
+
+def _sessions(rng: random.Random, count: int, first_class: int, classes: int,
+              anchor: date, years: int) -> List[Tuple[datetime, int, int, int]]:
+    """
+    Return (start, duration, capacity, class_id) for every session in time order.
+    Sized by the session count, not the check-in count, so it stays small.
+    """
+    hours = [h for h, _ in SESSION_HOURS]
+    hour_weights = [w for _, w in SESSION_HOURS]
+    first_day = anchor - timedelta(days=years * 365)
+    span = years * 365 + 28  # include the next four weeks of the timetable
+
+    sessions = []
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(span))
+        start = datetime(day.year, day.month, day.day,
+                         rng.choices(hours, weights=hour_weights)[0], rng.choice([0, 15, 30, 45]))
+        sessions.append((start, rng.choice([45, 60, 60, 90]), rng.randrange(8, 31),
+                         rng.randrange(first_class, first_class + classes)))
+    sessions.sort()
+    return sessions
+
+
+def _checkins(rng: random.Random, sessions: List[tuple], first_session: int, past: int,
+              total: int, first_member: int, members: int) -> Iterator[tuple]:
+    """
+    Spread `total` check-ins over past sessions in time order. A few regulars
+    visit far more often than everyone else (Pareto-distributed activity).
+    """
+    member_ids = range(first_member, first_member + members)
+    cumulative = []
+    running = 0.0
+    for _ in member_ids:
+        running += rng.paretovariate(1.5)
+        cumulative.append(running)
+
+    for i in range(past):
+        n = (i + 1) * total // past - i * total // past
+        if not n:
+            continue
+        start, duration, _capacity, _class_id = sessions[i]
+        end = start + timedelta(minutes=duration)
+        for member_id in rng.choices(member_ids, cum_weights=cumulative, k=n):
+            yield (member_id, first_session + i,
+                   (start - timedelta(minutes=rng.randrange(16))).strftime(TIME_FORMAT),
+                   (end + timedelta(minutes=rng.randrange(21))).strftime(TIME_FORMAT))
+
+
+def generate(conn: sqlite3.Connection, scale: Scale, seed: int = 42,
+             anchor: date = DEFAULT_ANCHOR, log=print) -> None:
+    """
+    Append a synthetic dataset of the given scale to an existing schema.
+    """
+    rng = random.Random(seed)
+    cur = conn.cursor()
+
+    def step(name: str, sql: str, rows: Iterable[tuple]) -> None:
+        started = time.perf_counter()
+        count = _insert_batches(conn, sql, rows)
+        log(f"{name:<24}{count:>12,} rows  {time.perf_counter() - started:7.2f}s")
+
+    # Reference data
+    if _next_id(cur, "Membership_Type", "membership_type_id") == 1:
+        cur.executemany("INSERT INTO Membership_Type (name, price) VALUES (?, ?)",
+                        [(name, price) for name, price, _, _ in MEMBERSHIP_PLANS])
+    days_by_name = {name: (days, weight) for name, _, days, weight in MEMBERSHIP_PLANS}
+    plans = [(type_id, price) + days_by_name.get(name, (30, 1))
+             for type_id, name, price in cur.execute("SELECT membership_type_id, name, price FROM Membership_Type")]
+
+    cur.executemany("INSERT OR IGNORE INTO Specialization (name) VALUES (?)", [(s,) for s in SPECIALIZATIONS])
+    spec_ids = [row[0] for row in cur.execute("SELECT specialization_id FROM Specialization")]
+    conn.commit()
+
+    # People: members first, then trainers
+    first_person = _next_id(cur, "Person", "id")
+    people = scale.members + scale.trainers
+    step("Person", '''INSERT INTO Person (id, first_name, last_name, birth_date, email, phone, city, street, zip)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', _people(rng, first_person, people, anchor))
+    step("Contact", "INSERT INTO Contact (person_id, contact_name, relationship, phone) VALUES (?, ?, ?, ?)",
+         _contacts(rng, first_person, people))
+
+    first_member = _next_id(cur, "Member", "member_id")
+    step("Member", "INSERT INTO Member (member_id, person_id, member_status) VALUES (?, ?, ?)",
+         ((first_member + i, first_person + i, _weighted(rng, MEMBER_STATUSES)) for i in range(scale.members)))
+
+    first_trainer = _next_id(cur, "Trainer", "trainer_id")
+    step("Trainer", '''INSERT INTO Trainer (trainer_id, person_id, specialization, hire_date, trainer_status)
+                       VALUES (?, ?, ?, ?, ?)''',
+         ((first_trainer + i, first_person + scale.members + i, rng.choice(SPECIALIZATIONS),
+           (anchor - timedelta(days=rng.randrange(scale.years * 365 * 2))).isoformat(),
+           _weighted(rng, TRAINER_STATUSES)) for i in range(scale.trainers)))
+    step("Trainer_Specialization", "INSERT OR IGNORE INTO Trainer_Specialization VALUES (?, ?)",
+         ((first_trainer + i, spec) for i in range(scale.trainers)
+          for spec in rng.sample(spec_ids, min(len(spec_ids), rng.randint(1, 3)))))
+
+    # Memberships and their payments come from one stream; split it in lockstep
+    pairs = _memberships_and_payments(rng, first_member, scale.members, plans, anchor, scale.years)
+    payments: List[tuple] = []
+    payment_count = 0
+
+    def flush_payments() -> None:
+        nonlocal payment_count
+        payment_count += _insert_batches(conn, PAYMENT_SQL, payments)
+        payments.clear()
+
+    def memberships() -> Iterator[tuple]:
+        for membership, payment in pairs:
+            payments.append(payment)
+            yield membership
+            if len(payments) >= BATCH_SIZE:
+                flush_payments()
+
+    step("Membership", '''INSERT INTO Membership (member_id, membership_type_id, is_active, start_date, end_date)
+                          VALUES (?, ?, ?, ?, ?)''', memberships())
+    flush_payments()
+    log(f"{'Payment':<24}{payment_count:>12,} rows")
+
+    # Timetable
+    first_class = _next_id(cur, "Class", "class_id")
+    step("Class", "INSERT INTO Class (class_id, class_name, description) VALUES (?, ?, ?)",
+         ((first_class + i, f"{SPECIALIZATIONS[i % len(SPECIALIZATIONS)]} "
+                            f"{CLASS_LEVELS[i // len(SPECIALIZATIONS) % len(CLASS_LEVELS)]} {i + 1}",
+           f"{SPECIALIZATIONS[i % len(SPECIALIZATIONS)]} class") for i in range(scale.classes)))
+
+    sessions = _sessions(rng, scale.sessions, first_class, scale.classes, anchor, scale.years)
+    first_session = _next_id(cur, "Class_Session", "class_session_id")
+    # Rooms are assigned round-robin, so the random draws (and the data for a
+    # given seed) stay the same as before rooms existed
+    step("Class_Session", '''INSERT INTO Class_Session (class_session_id, class_id, start_time, end_time, capacity,
+                                                       duration, start_ts, end_ts, room)
+                             VALUES (?1, ?2, ?3, ?4, ?5, ?6, CAST(strftime('%s', ?3) AS INTEGER),
+                                     CAST(strftime('%s', ?4) AS INTEGER), ?7)''',
+         ((first_session + i, class_id, start.strftime(TIME_FORMAT),
+           (start + timedelta(minutes=duration)).strftime(TIME_FORMAT), capacity, duration,
+           ROOMS[(first_session + i) % len(ROOMS)])
+          for i, (start, duration, capacity, class_id) in enumerate(sessions)))
+
+    step("Teaches", "INSERT OR IGNORE INTO Teaches (trainer_id, class_session_id) VALUES (?, ?)",
+         ((trainer_id, first_session + i) for i in range(len(sessions))
+          for trainer_id in rng.sample(range(first_trainer, first_trainer + scale.trainers),
+                                       min(scale.trainers, 2 if rng.random() < 0.15 else 1))))
+
+    anchor_dt = datetime(anchor.year, anchor.month, anchor.day)
+    past = sum(1 for s in sessions if s[0] < anchor_dt)
+    step("Attends", "INSERT OR IGNORE INTO Attends (member_id, class_session_id) VALUES (?, ?)",
+         ((member_id, first_session + i) for i, (_, _, capacity, _) in enumerate(sessions)
+          for member_id in rng.sample(range(first_member, first_member + scale.members),
+                                      min(scale.members, int(capacity * rng.betavariate(2, 2))))))
+
+    step("Check_in", '''INSERT INTO Check_in (member_id, class_session_id, checkin_time, checkout_time,
+                                             checkin_ts, checkout_ts)
+                        VALUES (?1, ?2, ?3, ?4, CAST(strftime('%s', ?3) AS INTEGER),
+                                CAST(strftime('%s', ?4) AS INTEGER))''',
+         _checkins(rng, sessions, first_session, past, scale.checkins if past else 0,
+                   first_member, scale.members))
+
+    cur.execute("ANALYZE")
+
+
+def build_database(path: str, scale: Scale, seed: int = 42, anchor: date = DEFAULT_ANCHOR,
+                   log=print) -> None:
+    """
+    Create (or extend) the database file at `path` with a synthetic dataset.
+    """
+    conn = open_connection(path)
+    try:
+        create_schema(conn)
+        generate(conn, scale, seed, anchor, log)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a production-sized synthetic gym database.")
+    parser.add_argument("--database", default="gym_load.db", help="output SQLite file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=DEFAULT_ANCHOR,
+                        help="the 'today' of the dataset (YYYY-MM-DD)")
+    parser.add_argument("--scale", type=int, help="size everything proportionally to this many check-ins")
+    defaults = Scale()
+    for name in ("members", "trainers", "classes", "sessions", "checkins", "years"):
+        parser.add_argument(f"--{name}", type=int, default=getattr(defaults, name))
+    args = parser.parse_args()
+
+    chosen = Scale.proportional(args.scale) if args.scale else Scale(
+        args.members, args.trainers, args.classes, args.sessions, args.checkins, args.years)
+
+    started = time.perf_counter()
+    build_database(args.database, chosen, args.seed, args.anchor)
+    print(f"Done: {args.database} in {time.perf_counter() - started:.1f}s")
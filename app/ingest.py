@@ -0,0 +1,349 @@
+import argparse
+import json
+import logging
+import queue
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from connection import DATABASE_NAME, is_busy_error, open_connection
+from timestamps import TIME_FORMAT
+from validation import parse_id
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# Turnstile Check-in Ingestion
+# ============================================
+# Turnstiles POST check-ins to a small HTTP endpoint. Requests only enqueue;
+# one writer thread owns the database connection and commits the queue in
+# batches, so a burst at opening time becomes a few short transactions
+# instead of hundreds of writers competing for the lock. When the queue is
+# full the endpoint answers 503 with Retry-After instead of blocking.
+
+QUEUE_SIZE: int = 10000
+BATCH_SIZE: int = 500
+# Longest a check-in waits in the queue before its batch is committed
+MAX_LATENCY_SECONDS: float = 0.2
+# Backoff while the database is locked or busy (doubling up to the maximum)
+RETRY_DELAY_SECONDS: float = 0.05
+MAX_RETRY_DELAY_SECONDS: float = 2.0
+# Attempts per write before a still-locked database counts the rows as failed
+MAX_WRITE_ATTEMPTS: int = 8
+
+CHECKIN_SQL: str = '''
+    INSERT INTO Check_in (member_id, class_session_id, checkin_time, checkin_ts)
+    VALUES (?1, ?2, ?3, CAST(strftime('%s', ?3) AS INTEGER))
+'''
+
+Checkin = Tuple[int, Optional[int], str]
+
+
+@dataclass
+class IngestMetrics:
+    accepted: int = 0
+    rejected: int = 0
+    written: int = 0
+    failed: int = 0
+    # Writes repeated because the database was locked or busy
+    retries: int = 0
+    batches: int = 0
+    last_batch_size: int = 0
+    max_batch_ms: float = 0.0
+    # Time from enqueue to commit of the oldest row in the last batch
+    last_latency_ms: float = 0.0
+    started_at: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.time() - self.started_at
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+
+def parse_checkin(payload: Dict) -> Checkin:
+    """
+    Validate one check-in from a turnstile. Raises ValueError on bad input.
+    """
+    if "member_id" not in payload:
+        raise ValueError("member_id is required and must be an integer")
+    member_id = parse_id(payload["member_id"], "member_id")
+
+    session_id = payload.get("class_session_id")
+    if session_id is not None:
+        session_id = parse_id(session_id, "class_session_id")
+
+    checkin_time = payload.get("checkin_time")
+    if checkin_time is None:
+        checkin_time = datetime.now().strftime(TIME_FORMAT)
+    else:
+        try:
+            datetime.strptime(str(checkin_time), TIME_FORMAT)
+        except ValueError:
+            raise ValueError(f"checkin_time must look like {datetime(2025, 1, 31, 7, 5).strftime(TIME_FORMAT)}")
+    return member_id, session_id, str(checkin_time)
+
+
+class CheckinWriter:
+    """
+    Bounded queue plus the single thread that writes it to Check_in.
+    """
+
+    def __init__(self, path: str = DATABASE_NAME, queue_size: int = QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE, max_latency: float = MAX_LATENCY_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.metrics = IngestMetrics()
+        self._queue: "queue.Queue[Tuple[float, Checkin]]" = queue.Queue(maxsize=queue_size)
+        self._metrics_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkin-writer", daemon=True)
+
+    def start(self) -> "CheckinWriter":
+        self.metrics.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop accepting work and wait until everything queued is committed.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def submit(self, checkins: List[Checkin]) -> bool:
+        """
+        Enqueue check-ins without blocking. Returns False (and queues nothing)
+        when there is not enough room: the caller should retry later.
+        """
+        now = time.perf_counter()
+        with self._metrics_lock:
+            if self._stop.is_set() or self._queue.maxsize - self._queue.qsize() < len(checkins):
+                self.metrics.rejected += len(checkins)
+                return False
+            for checkin in checkins:
+                self._queue.put_nowait((now, checkin))
+            self.metrics.accepted += len(checkins)
+        return True
+
+    def snapshot(self) -> Dict:
+        with self._metrics_lock:
+            data = {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(self.metrics).items()}
+        data["rows_per_second"] = round(self.metrics.rows_per_second, 1)
+        data["queue_depth"] = self._queue.qsize()
+        data["queue_capacity"] = self._queue.maxsize
+        return data
+
+    def _next_batch(self) -> List[Tuple[float, Checkin]]:
+        # Block for the first row, then collect until the batch is full or the
+        # first row has waited max_latency
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = batch[0][0] + self.max_latency
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn: sqlite3.Connection, rows: List[Checkin]) -> None:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            cur.executemany(CHECKIN_SQL, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _write_retrying(self, conn: sqlite3.Connection, rows: List[Checkin]) -> None:
+        # "database is locked" / busy is transient: wait and write the same
+        # rows again rather than drop them. While this blocks, the queue fills
+        # and the endpoint answers 503, which makes the turnstiles back off.
+        # Anything else (no such table, read-only, disk full) will not clear
+        # by waiting and is raised straight away.
+        delay = RETRY_DELAY_SECONDS
+        for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+            try:
+                self._write(conn, rows)
+                return
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt == MAX_WRITE_ATTEMPTS:
+                    raise
+                logger.warning("Check-in write of %d rows failed, retrying in %gs: %s", len(rows), delay, e)
+                with self._metrics_lock:
+                    self.metrics.retries += 1
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+    def _flush(self, conn: sqlite3.Connection, batch: List[Tuple[float, Checkin]]) -> None:
+        started = time.perf_counter()
+        rows = [checkin for _, checkin in batch]
+        written = failed = 0
+        try:
+            self._write_retrying(conn, rows)
+            written = len(rows)
+        except (sqlite3.IntegrityError, OverflowError):
+            # One bad row (e.g. unknown member) must not drop the whole batch
+            for position, row in enumerate(rows):
+                try:
+                    self._write_retrying(conn, [row])
+                    written += 1
+                except (sqlite3.IntegrityError, OverflowError):
+                    failed += 1
+                except sqlite3.Error:
+                    # Still locked, or broken for every row: do not wait it out row by row
+                    logger.warning("Check-in write failed, dropping %d rows", len(rows) - position, exc_info=True)
+                    failed += len(rows) - position
+                    break
+        except sqlite3.Error:
+            # Locked after every retry, or a fault no row can get past
+            # (no such table, read-only, disk full): fail the batch once
+            logger.warning("Check-in batch of %d rows failed", len(rows), exc_info=True)
+            failed = len(rows)
+
+        finished = time.perf_counter()
+        with self._metrics_lock:
+            m = self.metrics
+            m.written += written
+            m.failed += failed
+            m.batches += 1
+            m.last_batch_size = len(rows)
+            m.max_batch_ms = max(m.max_batch_ms, (finished - started) * 1000)
+            m.last_latency_ms = (finished - batch[0][0]) * 1000
+
+    def _run(self) -> None:
+        conn = open_connection(self.path)
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    self._flush(conn, batch)
+                except Exception:
+                    # The writer must outlive any one batch: if it died, the
+                    # endpoint would keep accepting rows that are never written
+                    logger.exception("Check-in batch of %d rows failed", len(batch))
+                    with self._metrics_lock:
+                        self.metrics.failed += len(batch)
+        finally:
+            conn.close()
+
+
+# ============================================
+# HTTP Endpoint
+# ============================================
+
+def make_handler(writer: CheckinWriter):
+    class CheckinHandler(BaseHTTPRequestHandler):
+        """
+        POST /checkins   one check-in object or a list of them -> 202 / 400 / 503
+        GET  /metrics    writer and queue metrics as JSON
+        """
+
+        def _reply(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._reply(200, writer.snapshot())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/checkins":
+                self._reply(404, {"error": "not found"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+                items = payload if isinstance(payload, list) else [payload]
+                checkins = [parse_checkin(item) for item in items if isinstance(item, dict)]
+                if len(checkins) != len(items) or not checkins:
+                    raise ValueError("expected a check-in object or a non-empty list of them")
+            except ValueError as e:
+                self._reply(400, {"error": str(e)})
+                return
+
+            if writer.submit(checkins):
+                self._reply(202, {"accepted": len(checkins)})
+            else:
+                self._reply(503, {"error": "ingestion queue is full"}, {"Retry-After": "1"})
+
+        def log_message(self, format, *args):
+            # Access logs for every turnstile ping would drown everything else
+            pass
+
+    return CheckinHandler
+
+
+def serve(host: str, port: int, writer: CheckinWriter) -> None:
+    server = ThreadingHTTPServer((host, port), make_handler(writer))
+    print(f"Accepting check-ins on http://{host}:{port}/checkins (metrics at /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        writer.stop()
+        print(json.dumps(writer.snapshot(), indent=2))
+
+
+def simulate(writer: CheckinWriter, count: int, path: str) -> None:
+    """
+    Push `count` check-ins for random existing members as fast as the queue
+    accepts them, then report throughput.
+    """
+    conn = sqlite3.connect(path)
+    member_ids = [row[0] for row in conn.execute("SELECT member_id FROM Member")]
+    conn.close()
+    if not member_ids:
+        raise SystemExit("No members in the database; seed or generate data first.")
+
+    rng = random.Random(42)
+    now = datetime.now().strftime(TIME_FORMAT)
+    started = time.perf_counter()
+    sent = 0
+    while sent < count:
+        if writer.submit([(rng.choice(member_ids), None, now)]):
+            sent += 1
+        else:
+            time.sleep(0.001)  # back off like a turnstile honouring Retry-After
+    writer.stop()
+    elapsed = time.perf_counter() - started
+    print(f"{count:,} check-ins committed in {elapsed:.2f}s ({count / elapsed:,.0f}/s)")
+    print(json.dumps(writer.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turnstile check-in ingestion service.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-latency", type=float, default=MAX_LATENCY_SECONDS, help="seconds")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--simulate", type=int, metavar="N", help="ingest N synthetic check-ins and exit")
+    args = parser.parse_args()
+
+    checkin_writer = CheckinWriter(args.database, args.queue_size, args.batch_size, args.max_latency).start()
+    if args.simulate:
+        simulate(checkin_writer, args.simulate, args.database)
+    else:
+        serve(args.host, args.port, checkin_writer)
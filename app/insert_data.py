@@ -1,5 +1,5 @@
 import sqlite3
-from database import DATABASE_NAME
+from database import connection
 
 def insert_sample_data():
     """
@@ -7,11 +7,17 @@ def insert_sample_data():
     Includes 20 Persons (10 Members, 10 Trainers) and related entities.
     Updated to handle single-value Phone numbers directly in Person and Contact tables.
     """
-    conn = sqlite3.connect(DATABASE_NAME)
-    cur = conn.cursor()
+    with connection() as conn:
+        insert_sample_rows(conn)
+        conn.commit()
 
-    # Enable foreign key constraints
-    cur.execute("PRAGMA foreign_keys = ON;")
+
+def insert_sample_rows(conn: sqlite3.Connection) -> None:
+    """
+    Insert the sample rows on an existing connection without committing,
+    so the caller can make seeding part of a larger transaction.
+    """
+    cur = conn.cursor()
 
     # ==========================================
     # PERSON
@@ -175,20 +181,20 @@ def insert_sample_data():
     # CLASS_SESSIONS
     # ==========================================
     sessions = [
-        (1, "2025-12-10 09:00", "2025-12-10 10:00", 15, 60),
-        (2, "2025-12-10 10:30", "2025-12-10 11:30", 10, 60),
-        (3, "2025-12-10 12:00", "2025-12-10 13:00", 20, 60),
-        (4, "2025-12-11 09:00", "2025-12-11 10:00", 8, 60),
-        (5, "2025-12-11 14:00", "2025-12-11 15:00", 12, 60),
-        (6, "2025-12-12 18:00", "2025-12-12 19:00", 25, 60),
-        (7, "2025-12-13 19:00", "2025-12-13 20:00", 30, 60),
-        (8, "2025-12-14 08:00", "2025-12-14 09:00", 10, 60),
-        (9, "2025-12-14 10:00", "2025-12-14 11:00", 15, 60),
-        (10, "2025-12-15 17:00", "2025-12-15 18:00", 12, 60)
+        (1, "2025-12-10 09:00", "2025-12-10 10:00", 15, 60, "Studio A"),
+        (2, "2025-12-10 10:30", "2025-12-10 11:30", 10, 60, "Studio A"),
+        (3, "2025-12-10 12:00", "2025-12-10 13:00", 20, 60, "Studio B"),
+        (4, "2025-12-11 09:00", "2025-12-11 10:00", 8, 60, "Pool"),
+        (5, "2025-12-11 14:00", "2025-12-11 15:00", 12, 60, "Studio B"),
+        (6, "2025-12-12 18:00", "2025-12-12 19:00", 25, 60, "Studio A"),
+        (7, "2025-12-13 19:00", "2025-12-13 20:00", 30, 60, "Studio B"),
+        (8, "2025-12-14 08:00", "2025-12-14 09:00", 10, 60, "Spin Room"),
+        (9, "2025-12-14 10:00", "2025-12-14 11:00", 15, 60, "Studio A"),
+        (10, "2025-12-15 17:00", "2025-12-15 18:00", 12, 60, "Boxing Ring")
     ]
     cur.executemany('''
-        INSERT OR IGNORE INTO Class_Session (class_id, start_time, end_time, capacity, duration)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT OR IGNORE INTO Class_Session (class_id, start_time, end_time, capacity, duration, room)
+        VALUES (?, ?, ?, ?, ?, ?)
     ''', sessions)
 
     # ==========================================
@@ -218,6 +224,3 @@ def insert_sample_data():
         INSERT OR IGNORE INTO Check_in (member_id, class_session_id, checkin_time, checkout_time)
         VALUES (?, ?, ?, ?)
     ''', checkins)
-
-    conn.commit()
-    conn.close()
\ No newline at end of file
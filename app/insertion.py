@@ -1,23 +1,19 @@
 import streamlit as st
 import sqlite3
-from database import DATABASE_NAME
-from datetime import datetime
-
-# === HELPER FUNCTIONS ===
-
-def get_options(query):
-    """
-    Execute a query and return results as a dictionary mapping display names to IDs.
-    """
-    conn = sqlite3.connect(DATABASE_NAME)
-    cur = conn.cursor()
-    cur.execute(query)
-    data = cur.fetchall()
-    conn.close()
-    return {row[0]: row[1] for row in data} if data else {}
+from booking import BOOKED, BOOKING_MESSAGES, book_session
+from bulk_import import DEFAULT_CHUNK_SIZE, MEMBER_IMPORT_COLUMNS, import_members, read_rows
+from conflicts import ScheduleConflict
+from datetime import datetime, timedelta
+from fragments import form_fragment
+from options import get_options
+from pickers import member_picker, trainer_picker
+import services
+from statements import execute, sql
+from validation import MEMBER_STATUS_OPTIONS
 
 # === FORM FUNCTIONS ===
 
+@form_fragment("Insertion / New Member Registration")
 def insert_new_member(cur, conn):
     st.subheader("Member Details")
     with st.form("add_member_full"):
@@ -36,7 +32,7 @@ def insert_new_member(cur, conn):
         zip_code = st.text_input("Zip Code *")
 
         st.markdown("##### Membership Status")
-        status = st.selectbox("Member Status", ["active", "inactive", "pending"])
+        status = st.selectbox("Member Status", MEMBER_STATUS_OPTIONS)
 
         st.markdown("##### Emergency Contact")
         ec_col1, ec_col2 = st.columns(2)
@@ -47,35 +43,23 @@ def insert_new_member(cur, conn):
         submitted = st.form_submit_button("Register Member")
 
         if submitted:
-            # Check for required fields
-            required_fields = [f_name, l_name, email, phone, city, street, zip_code,
-                               contact_name, relationship, contact_phone]
-
-            if all(required_fields):
-                try:
-                    # 1. Insert Person (Now includes 'phone')
-                    cur.execute('''INSERT INTO Person (first_name, last_name, birth_date, email, phone, city, street, zip)
-                                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                                (f_name, l_name, str(birth_date), email, phone, city, street, zip_code))
-                    new_person_id = cur.lastrowid
-
-                    # 2. Insert Member
-                    cur.execute('''INSERT INTO Member (person_id, member_status) VALUES (?, ?)''',
-                                (new_person_id, status))
-
-                    # 3. Insert Contact (Now includes 'phone')
-                    cur.execute('''INSERT INTO Contact (person_id, contact_name, relationship, phone)
-                                   VALUES (?, ?, ?, ?)''', (new_person_id, contact_name, relationship, contact_phone))
-
-                    conn.commit()
-                    st.success(f"Member {f_name} {l_name} added successfully!")
-                except Exception as e:
-                    conn.rollback()
-                    st.error(f"Database Error: {e}")
-            else:
-                st.error("Registration Failed: All fields marked with * are required.")
-
-
+            # Same rules as the bulk importer and the API
+            try:
+                services.register_member(conn, {
+                    "first_name": f_name, "last_name": l_name, "email": email,
+                    "birth_date": str(birth_date), "phone": phone, "city": city,
+                    "street": street, "zip": zip_code, "member_status": status,
+                    "contact_name": contact_name, "relationship": relationship,
+                    "contact_phone": contact_phone,
+                })
+                st.success(f"Member {f_name} {l_name} added successfully!")
+            except ValueError as e:
+                st.error(f"Registration Failed: {e}")
+            except Exception as e:
+                st.error(f"Database Error: {e}")
+
+
+@form_fragment("Insertion / New Trainer Registration")
 def insert_new_trainer(cur: sqlite3.Cursor, conn: sqlite3.Connection):
     """
     Renders the Trainer Registration form and handles database insertion
@@ -141,24 +125,16 @@ def insert_new_trainer(cur: sqlite3.Cursor, conn: sqlite3.Connection):
             else:
                 try:
                     # 1. Insert Person (Includes phone)
-                    cur.execute('''
-                        INSERT INTO Person (first_name, last_name, birth_date, email, phone, city, street, zip)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (f_name, l_name, str(birth_date), email, phone, city, street, zip_code))
+                    execute(cur, "insert_person",
+                            (f_name, l_name, str(birth_date), email, phone, city, street, zip_code))
                     
                     new_person_id = cur.lastrowid
 
                     # 2. Insert Trainer
-                    cur.execute('''
-                        INSERT INTO Trainer (person_id, specialization, hire_date, trainer_status)
-                        VALUES (?, ?, ?, ?)
-                    ''', (new_person_id, specialization, str(hire_date), t_status))
+                    execute(cur, "insert_trainer", (new_person_id, specialization, str(hire_date), t_status))
                     
                     # 3. Insert Contact (Includes phone)
-                    cur.execute('''
-                        INSERT INTO Contact (person_id, contact_name, relationship, phone)
-                        VALUES (?, ?, ?, ?)
-                    ''', (new_person_id, contact_name, relationship, contact_phone))
+                    execute(cur, "insert_contact", (new_person_id, contact_name, relationship, contact_phone))
 
                     conn.commit()
                     st.success(f"Trainer {f_name} {l_name} has been successfully registered!")
@@ -168,6 +144,7 @@ def insert_new_trainer(cur: sqlite3.Cursor, conn: sqlite3.Connection):
                     st.error(f"Database Error: {e}")
 
 
+@form_fragment("Insertion / Create New Class")
 def create_new_class(cur, conn):
     st.subheader("Define a New Class Type")
     with st.form("add_class_simple"):
@@ -178,7 +155,7 @@ def create_new_class(cur, conn):
         if submitted:
             if c_name and desc:
                 try:
-                    cur.execute("INSERT INTO Class (class_name, description) VALUES (?, ?)", (c_name, desc))
+                    execute(cur, "insert_class", (c_name, desc))
                     conn.commit()
                     st.success(f"Class '{c_name}' created!")
                 except Exception as e:
@@ -187,16 +164,23 @@ def create_new_class(cur, conn):
                 st.error("Both Class Name and Description are required.")
 
 
+@form_fragment("Insertion / Schedule Class Session")
 def schedule_class_session(cur, conn):
     st.subheader("Schedule a Session")
-    st.info("Assign a specific time and capacity to a Class Type.")
+    st.info("Assign a specific time and capacity to a Class Type. "
+            "The room and trainer must be free for the whole session.")
 
-    class_map = get_options("SELECT class_name, class_id FROM Class")
+    class_map = get_options(sql("class_options"))
 
     if not class_map:
         st.error("No classes defined yet! Please create a class first.")
         return
 
+    # The trainer typeahead cannot live inside the form
+    trainer = None
+    if st.checkbox("Assign a trainer", key="schedule_session_assign_trainer"):
+        trainer = trainer_picker("Trainer", key="schedule_session_trainer")
+
     with st.form("schedule_session"):
         selected_class_name = st.selectbox("Select Class Type", list(class_map.keys()))
         col1, col2 = st.columns(2)
@@ -205,132 +189,183 @@ def schedule_class_session(cur, conn):
         col3, col4 = st.columns(2)
         duration = col3.number_input("Duration (minutes)", min_value=30, value=60)
         capacity = col4.number_input("Capacity", min_value=1, value=15)
+        room = st.text_input("Room (optional)")
 
         submitted = st.form_submit_button("Schedule Session")
 
         if submitted:
             if duration > 0 and capacity > 0:
-                start_datetime = f"{date} {time_start}"
+                start_dt = datetime.combine(date, time_start).replace(second=0, microsecond=0)
+                end_dt = start_dt + timedelta(minutes=duration)
                 class_id = class_map[selected_class_name]
                 try:
-                    cur.execute('''INSERT INTO Class_Session (class_id, start_time, end_time, capacity, duration)
-                                   VALUES (?, ?, ?, ?, ?)''',
-                                (class_id, start_datetime, "Calculated based on duration", capacity, duration))
-                    conn.commit()
+                    services.schedule_session(conn, class_id, start_dt, end_dt, capacity, room,
+                                              trainer[1] if trainer else None)
                     st.success("Class Session Scheduled Successfully!")
+                except ScheduleConflict as e:
+                    for conflict in e.conflicts:
+                        st.error(conflict.describe())
                 except Exception as e:
                     st.error(f"Database Error: {e}")
             else:
                 st.error("Invalid Capacity or Duration.")
 
 
+@form_fragment("Insertion / Assign Membership")
 def assign_membership(cur, conn):
     st.subheader("Assign Membership Package")
-    member_query = """
-        SELECT p.first_name || ' ' || p.last_name || ' (ID: ' || m.member_id || ')', m.member_id
-        FROM Member m JOIN Person p ON m.person_id = p.id
-    """
-    member_map = get_options(member_query)
-    type_map = get_options("SELECT name || ' - ' || price || ' TL', membership_type_id FROM Membership_Type")
+    type_map = get_options(sql("membership_type_options"))
 
-    if not member_map:
-        st.error("No members found. Register a member first.")
-    elif not type_map:
+    if not type_map:
         st.error("No membership types found. Add them to DB first.")
-    else:
-        with st.form("assign_membership"):
-            selected_member = st.selectbox("Select Member", list(member_map.keys()))
-            selected_type = st.selectbox("Membership Type", list(type_map.keys()))
-            col1, col2 = st.columns(2)
-            start_d = col1.date_input("Start Date", value=datetime.today())
-            end_d = col2.date_input("End Date", value=datetime.today())
-            is_active = st.checkbox("Set as Active Immediately", value=True)
+        return
 
-            submitted = st.form_submit_button("Assign Membership")
+    member = member_picker("Select Member", key="assign_membership_member",
+                           empty_message="No members found. Register a member first.")
+    if member is None:
+        return
 
-            if submitted:
-                if end_d < start_d:
-                    st.error("Error: End date cannot be before start date!")
+    selected_member, m_id = member
+    with st.form("assign_membership"):
+        st.info(f"Member: {selected_member}")
+        selected_type = st.selectbox("Membership Type", list(type_map.keys()))
+        col1, col2 = st.columns(2)
+        start_d = col1.date_input("Start Date", value=datetime.today())
+        end_d = col2.date_input("End Date", value=datetime.today())
+        is_active = st.checkbox("Set as Active Immediately", value=True)
+
+        submitted = st.form_submit_button("Assign Membership")
+
+        if submitted:
+            try:
+                services.assign_membership(conn, m_id, type_map[selected_type], start_d, end_d, is_active)
+                st.success("Membership assigned successfully!")
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+
+@form_fragment("Insertion / Book Class Session")
+def book_class_session(cur, conn):
+    st.subheader("Book a Class Session")
+    st.info("Seats are reserved atomically; a full session cannot be overbooked.")
+
+    session_map = get_options(sql("bookable_session_options"))
+
+    if not session_map:
+        st.error("No class sessions scheduled yet.")
+        return
+
+    member = member_picker("Select Member", key="book_session_member",
+                           empty_message="No members found. Register a member first.")
+    if member is None:
+        return
+
+    selected_member, m_id = member
+    with st.form("book_session"):
+        st.info(f"Member: {selected_member}")
+        selected_session = st.selectbox("Class Session", list(session_map.keys()))
+
+        submitted = st.form_submit_button("Book Seat")
+
+        if submitted:
+            try:
+                result = book_session(m_id, session_map[selected_session])
+                if result == BOOKED:
+                    st.success(BOOKING_MESSAGES[result])
                 else:
-                    m_id = member_map[selected_member]
-                    mt_id = type_map[selected_type]
-                    try:
-                        cur.execute('''INSERT INTO Membership 
-                        (member_id, membership_type_id, is_active, start_date, end_date)
-                                       VALUES (?, ?, ?, ?, ?)''',
-                                    (m_id, mt_id, 1 if is_active else 0, str(start_d), str(end_d)))
-                        conn.commit()
-                        st.success("Membership assigned successfully!")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+                    st.error(BOOKING_MESSAGES[result])
+            except Exception as e:
+                st.error(f"Database Error: {e}")
 
 
+@form_fragment("Insertion / Record Payment")
 def record_payment(cur, conn):
     st.subheader("Process Payment")
-    member_query = """
-        SELECT p.first_name || ' ' || p.last_name, m.member_id
-        FROM Member m JOIN Person p ON m.person_id = p.id
-    """
-    member_map = get_options(member_query)
+    member = member_picker("Payer (Member)", key="record_payment_member",
+                           empty_message="No members available to receive payment from.")
 
-    if member_map:
+    if member:
+        selected_member, m_id = member
         with st.form("pay_form"):
-            selected_member = st.selectbox("Payer (Member)", list(member_map.keys()))
+            st.info(f"Payer: {selected_member}")
             amount = st.number_input("Amount (TL)", min_value=0.0, step=10.0)
-            method = st.selectbox("Payment Method", ["Credit Card", "Cash", "Bank Transfer"])
+            method = st.selectbox("Payment Method", services.PAYMENT_METHODS)
             p_date = st.date_input("Payment Date")
 
             submitted = st.form_submit_button("Record Payment")
 
             if submitted:
-                if amount > 0:
-                    m_id = member_map[selected_member]
-                    try:
-                        cur.execute('''INSERT INTO Payment (member_id, payment_date, method, amount)
-                                       VALUES (?, ?, ?, ?)''', (m_id, str(p_date), method, amount))
-                        conn.commit()
-                        st.success(f"Payment of {amount} TL recorded!")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-                else:
-                    st.error("Payment amount must be greater than 0.")
-    else:
-        st.warning("No members available to receive payment from.")
+                try:
+                    services.record_payment(conn, m_id, amount, method, p_date)
+                    st.success(f"Payment of {amount} TL recorded!")
+                except Exception as e:
+                    st.error(f"Error: {e}")
 
 
+@form_fragment("Insertion / Assign Trainer Specialization")
 def assign_trainer_specialization(cur, conn):
     st.subheader("Assign Specialization to Trainer")
-    trainer_query = """
-        SELECT p.first_name || ' ' || p.last_name, t.trainer_id
-        FROM Trainer t JOIN Person p ON t.person_id = p.id
-    """
-    trainer_map = get_options(trainer_query)
-    spec_map = get_options("SELECT name, specialization_id FROM Specialization")
+    spec_map = get_options(sql("specialization_options"))
 
-    if not trainer_map:
-        st.warning("No trainers found.")
-    elif not spec_map:
+    if not spec_map:
         st.warning("No specializations defined in database.")
-    else:
-        with st.form("spec_form"):
-            t_name = st.selectbox("Trainer", list(trainer_map.keys()))
-            s_name = st.selectbox("Specialization Area", list(spec_map.keys()))
+        return
+
+    trainer = trainer_picker("Trainer", key="assign_spec_trainer")
+    if trainer is None:
+        return
 
-            submitted = st.form_submit_button("Assign")
+    t_name, t_id = trainer
+    with st.form("spec_form"):
+        st.info(f"Trainer: {t_name}")
+        s_name = st.selectbox("Specialization Area", list(spec_map.keys()))
+
+        submitted = st.form_submit_button("Assign")
+
+        if submitted:
+            if s_name:
+                s_id = spec_map[s_name]
+                try:
+                    execute(cur, "insert_trainer_specialization", (t_id, s_id))
+                    conn.commit()
+                    st.success(f"Assigned {s_name} to {t_name}")
+                except sqlite3.IntegrityError:
+                    st.error("This trainer already has this specialization.")
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+@form_fragment("Insertion / Bulk Member Import")
+def bulk_member_import(cur, conn):
+    st.subheader("Bulk Member Import")
+    st.info(f"Upload a CSV or Excel file with the columns: {', '.join(MEMBER_IMPORT_COLUMNS)}. "
+            "Rows are checked with the same rules as the registration form.")
+
+    uploaded = st.file_uploader("Member file", type=["csv", "xlsx"])
+    chunk_size = st.number_input("Rows per transaction", min_value=100, value=DEFAULT_CHUNK_SIZE, step=500)
+
+    if uploaded is not None and st.button("Start Import"):
+        bar = st.progress(0.0)
+        status = st.empty()
+
+        def show_progress(report):
+            # Upload size is known, row count is not; show rows as they land
+            status.write(f"{report.imported:,} imported, {len(report.errors):,} rejected "
+                         f"({report.rows_per_second:,.0f} rows/s)")
+            bar.progress(min(1.0, uploaded.tell() / max(uploaded.size, 1)))
+
+        try:
+            report = import_members(read_rows(uploaded.name, uploaded), int(chunk_size), progress=show_progress)
+        except Exception as e:
+            st.error(f"Import Failed: {e}")
+            return
+
+        bar.progress(1.0)
+        st.success(f"Imported {report.imported:,} of {report.total:,} rows in {report.seconds:.2f}s "
+                   f"({report.rows_per_second:,.0f} rows/s)")
+        if report.errors:
+            st.error(f"{len(report.errors):,} rows were rejected:")
+            st.dataframe([{"Row": n, "Error": msg} for n, msg in report.errors], use_container_width=True)
 
-            if submitted:
-                if t_name and s_name:
-                    t_id = trainer_map[t_name]
-                    s_id = spec_map[s_name]
-                    try:
-                        cur.execute("INSERT INTO Trainer_Specialization (trainer_id, specialization_id) VALUES (?, ?)",
-                                    (t_id, s_id))
-                        conn.commit()
-                        st.success(f"Assigned {s_name} to {t_name}")
-                    except sqlite3.IntegrityError:
-                        st.error("This trainer already has this specialization.")
-                    except Exception as e:
-                        st.error(f"Error: {e}")
 
 # === MAIN DISPATCHER FUNCTION ===
 
@@ -347,30 +382,30 @@ def render_insert_page():
         "Create New Class",
         "Schedule Class Session",
         "Assign Membership",
+        "Book Class Session",
         "Record Payment",
-        "Assign Trainer Specialization"
+        "Assign Trainer Specialization",
+        "Bulk Member Import"
     ]
 
     choice = st.selectbox("Select Registration Type", menu_options)
 
-    conn = sqlite3.connect(DATABASE_NAME)
-    cur = conn.cursor()
-    cur.execute("PRAGMA foreign_keys = ON;")
-
-    # Logic Dispatcher
+    # Each form is a fragment with its own connection; see fragments.py
     if choice == "New Member Registration":
-        insert_new_member(cur, conn)
+        insert_new_member()
     elif choice == "New Trainer Registration":
-        insert_new_trainer(cur, conn)
+        insert_new_trainer()
     elif choice == "Create New Class":
-        create_new_class(cur, conn)
+        create_new_class()
     elif choice == "Schedule Class Session":
-        schedule_class_session(cur, conn)
+        schedule_class_session()
     elif choice == "Assign Membership":
-        assign_membership(cur, conn)
+        assign_membership()
+    elif choice == "Book Class Session":
+        book_class_session()
     elif choice == "Record Payment":
-        record_payment(cur, conn)
+        record_payment()
     elif choice == "Assign Trainer Specialization":
-        assign_trainer_specialization(cur, conn)
-
-    conn.close()
\ No newline at end of file
+        assign_trainer_specialization()
+    elif choice == "Bulk Member Import":
+        bulk_member_import()
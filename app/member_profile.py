@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from archive import ARCHIVE_PATH, attach_archive, is_attached
+from connection import DATABASE_NAME, database_file, open_connection
+from statements import fetch_one
+
+# ============================================
+# Member Profile
+# ============================================
+# Everything the front desk wants to know about one member (active plan,
+# lifetime spend, visits, memberships, payments, check-ins and classes) is
+# read by a single statement whose subqueries all seek member_id indexes.
+#
+# Profiles are cached per member. Triggers bump the member's row in
+# Member_Revision on every change to their Member, Person, Membership,
+# Payment, Check_in or Attends rows, and the profile query returns the
+# revision it read, so a cached profile is reused while that one-row
+# lookup still returns the same number. The recent visit count depends on the
+# date as well, so the cache key includes the day the profile was read.
+#
+# When the archive database exists it is attached for the read, so lifetime
+# spend and visit counts include the rows archive.py has moved there, as the
+# revenue rollups do. Archiving deletes those rows from the hot tables, which
+# bumps the members' revisions.
+
+# Profiles kept in memory per process
+CACHE_SIZE: int = int(os.environ.get("GYM_PROFILE_CACHE", 256))
+# Rows per history list (payments, check-ins)
+RECENT_ROWS: int = 20
+# Window for the recent visit count
+FREQUENCY_DAYS: int = 30
+
+
+@dataclass
+class MemberProfile:
+    member_id: int
+    name: str
+    email: Optional[str]
+    phone: Optional[str]
+    city: Optional[str]
+    member_status: Optional[str]
+    revision: int
+    plan: Optional[str]
+    plan_end: Optional[str]
+    lifetime_spend: float
+    payments: int
+    first_visit: Optional[str]
+    last_visit: Optional[str]
+    visits: int
+    recent_visits: int
+    # (membership_id, type, start_date, end_date, is_active), latest end first
+    memberships: List[Tuple]
+    # (payment_date, method, amount), newest first
+    recent_payments: List[Tuple]
+    # (checkin_time, checkout_time, class_name), newest first
+    recent_checkins: List[Tuple]
+    # (class_name, sessions attended, last session start), most attended first
+    classes: List[Tuple]
+
+    def visits_per_week(self, today: Optional[date] = None) -> float:
+        """
+        Average weekly check-ins since the first one.
+        """
+        if not self.first_visit:
+            return 0.0
+        first = datetime.strptime(self.first_visit[:10], "%Y-%m-%d").date()
+        weeks = max(((today or date.today()) - first).days / 7, 1)
+        return self.visits / weeks
+
+
+def load_profile(conn: sqlite3.Connection, member_id: int, today: Optional[date] = None) -> Optional[MemberProfile]:
+    """
+    Read one profile, including archived rows if the archive is attached to `conn`.
+    """
+    since = ((today or date.today()) - timedelta(days=FREQUENCY_DAYS)).isoformat()
+    statement = "member_profile_archived" if is_attached(conn) else "member_profile"
+    row = fetch_one(conn, statement, (member_id, since, RECENT_ROWS))
+    if row is None:
+        return None
+    return MemberProfile(
+        row.member_id, row.name, row.email, row.phone, row.city, row.member_status, row.revision,
+        row.plan, row.plan_end, row.lifetime_spend, row.payments, row.first_visit, row.last_visit,
+        row.visits, row.recent_visits,
+        *[[tuple(item) for item in json.loads(column)]
+          for column in (row.memberships, row.recent_payments, row.recent_checkins, row.classes)],
+    )
+
+
+_cache: "OrderedDict[Tuple[str, int, date], MemberProfile]" = OrderedDict()
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def get_profile(conn: sqlite3.Connection, member_id: int,
+                archive_path: Optional[str] = ARCHIVE_PATH) -> Tuple[Optional[MemberProfile], bool]:
+    """
+    The member's profile, and whether it came from the cache: reused on the
+    same day while the member's revision is unchanged, otherwise read again (with the
+    archive at `archive_path`, if that file exists).
+    """
+    # No revision bump covers the days passing, so yesterday's recent_visits
+    # window is a different entry
+    today = date.today()
+    key = (database_file(conn), member_id, today)
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        row = fetch_one(conn, "member_revision", (member_id,))
+        if (row.revision if row else 0) == cached.revision:
+            with _lock:
+                _cache.move_to_end(key)
+                _stats["hits"] += 1
+            return cached, True
+
+    if archive_path and os.path.exists(archive_path):
+        with attach_archive(conn, archive_path):
+            profile = load_profile(conn, member_id, today)
+    else:
+        profile = load_profile(conn, member_id, today)
+    with _lock:
+        _stats["misses"] += 1
+        if profile is None:
+            _cache.pop(key, None)
+        else:
+            _cache[key] = profile
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return profile, False
+
+
+def cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "profiles": len(_cache), "size": CACHE_SIZE}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time member profile lookups, uncached and cached.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help="archive database, included if it exists")
+    parser.add_argument("--members", type=int, default=200, help="members to look up")
+    args = parser.parse_args()
+
+    lookup_conn = open_connection(args.database)
+    try:
+        ids = [r[0] for r in lookup_conn.execute("SELECT member_id FROM Member ORDER BY random() LIMIT ?",
+                                                 (args.members,))]
+        for label in ("uncached", "cached"):
+            timings = []
+            for lookup_id in ids:
+                started = time.perf_counter()
+                get_profile(lookup_conn, lookup_id, args.archive)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            if timings:
+                print(f"{label:<10} p50 {timings[len(timings) // 2]:.3f} ms   max {timings[-1]:.3f} ms")
+        print(cache_stats())
+    finally:
+        lookup_conn.close()
@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+from connection import BUSY_TIMEOUT_SECONDS, DATABASE_NAME, connection
+
+# ============================================
+# Dropdown Option Cache
+# ============================================
+# Forms rerun on every keystroke, but the member/trainer/session lists only
+# change when somebody commits a write. Results are cached per process and
+# tagged with PRAGMA data_version, which changes whenever ANY other
+# connection (in this process or another one) commits to gym.db.
+
+_cache: Dict[str, Tuple[int, Dict]] = {}
+_lock = threading.Lock()
+_watcher: Optional[sqlite3.Connection] = None
+
+
+def _data_version() -> int:
+    """
+    Read PRAGMA data_version from a dedicated connection that never writes,
+    so every commit made through the pool is visible as a change.
+    """
+    global _watcher
+    with _lock:
+        if _watcher is None:
+            _watcher = sqlite3.connect(DATABASE_NAME, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        return _watcher.execute("PRAGMA data_version;").fetchone()[0]
+
+
+def get_options(query):
+    """
+    Execute a query and return results as a dictionary mapping display names to IDs.
+    The result is shared between reruns until the database changes, so callers
+    must treat it as read-only.
+    """
+    version = _data_version()
+
+    cached = _cache.get(query)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with connection() as conn:
+        data = conn.execute(query).fetchall()
+    options = {row[0]: row[1] for row in data} if data else {}
+
+    # Tag with the version read BEFORE the query, so a concurrent write
+    # makes the next call reload instead of serving a stale list
+    _cache[query] = (version, options)
+    return options
+
+
+def clear_options_cache() -> None:
+    """
+    Drop every cached option list (e.g. after restoring a backup file).
+    """
+    _cache.clear()
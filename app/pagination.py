@@ -0,0 +1,51 @@
+import sqlite3
+from typing import List, Optional, Tuple
+from archive import ARCHIVE_RULES, ARCHIVE_SCHEMA
+from queries import PAGE_KEYS, get_page_query
+
+DEFAULT_PAGE_SIZE: int = 100
+PAGE_SIZE_OPTIONS: List[int] = [25, 50, 100, 250, 500]
+
+
+def fetch_page(conn: sqlite3.Connection, table_name: str, after_key: Optional[tuple] = None,
+               page_size: int = DEFAULT_PAGE_SIZE,
+               include_archive: bool = False) -> Tuple[List[str], List[tuple], Optional[tuple]]:
+    """
+    Fetch one page of a View Tables query by seeking past after_key.
+    Returns (column names, rows without the seek key, key to pass for the next page).
+    The next key is None when this is the last page. include_archive needs
+    the archive attached.
+    """
+    key_count = len(PAGE_KEYS[table_name][0])
+    params = tuple(after_key or ()) + (page_size + 1,)
+
+    cur = conn.execute(get_page_query(table_name, after_key is not None, include_archive), params)
+    columns = [d[0] for d in cur.description][key_count:]
+    rows = cur.fetchall()
+
+    # One extra row tells us whether another page exists without a COUNT(*)
+    next_key = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_key = tuple(rows[-1][:key_count])
+
+    return columns, [row[key_count:] for row in rows], next_key
+
+
+def estimate_row_count(conn: sqlite3.Connection, table_name: str, include_archive: bool = False) -> int:
+    """
+    Cheap row-count estimate from the rowid range (two index seeks, no scan).
+    Exact for append-only tables; an upper bound once rows have been deleted.
+    """
+    if table_name not in PAGE_KEYS:
+        raise ValueError(f"Unknown table: {table_name}")
+
+    schemas = ["main"] + ([ARCHIVE_SCHEMA] if include_archive and table_name in ARCHIVE_RULES else [])
+    total = 0
+    for schema in schemas:
+        # Separate subqueries: MIN and MAX together in one SELECT would scan the table
+        low, high = conn.execute(
+            f"SELECT (SELECT MIN(rowid) FROM {schema}.{table_name}), (SELECT MAX(rowid) FROM {schema}.{table_name})"
+        ).fetchone()
+        total += 0 if high is None else high - low + 1
+    return total
@@ -0,0 +1,40 @@
+import streamlit as st
+from typing import Callable, Dict, Optional, Tuple
+from search import search_members, search_trainers
+
+# === TYPEAHEAD PICKERS ===
+# A search box plus a short selectbox of the best matches. The search box must
+# live OUTSIDE st.form, otherwise typing would not refresh the matches.
+
+
+def _picker(label: str, key: str, noun: str, empty_message: str,
+            search: Callable[[str], Dict[str, int]]) -> Optional[Tuple[str, int]]:
+    term = st.text_input(f"Search {noun}s", key=f"{key}_search",
+                         placeholder="Type a name, email or phone number")
+    matches = search(term)
+
+    if not matches:
+        if term.strip():
+            st.info(f"No {noun}s match '{term}'.")
+        else:
+            st.warning(empty_message)
+        return None
+
+    selected = st.selectbox(label, list(matches.keys()), key=f"{key}_select")
+    return selected, matches[selected]
+
+
+def member_picker(label: str, key: str,
+                  empty_message: str = "No members found.") -> Optional[Tuple[str, int]]:
+    """
+    Render a member typeahead and return (display label, member_id) or None.
+    """
+    return _picker(label, key, "member", empty_message, search_members)
+
+
+def trainer_picker(label: str, key: str,
+                   empty_message: str = "No trainers found.") -> Optional[Tuple[str, int]]:
+    """
+    Render a trainer typeahead and return (display label, trainer_id) or None.
+    """
+    return _picker(label, key, "trainer", empty_message, search_trainers)
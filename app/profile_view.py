@@ -0,0 +1,65 @@
+import streamlit as st
+import pandas as pd
+from database import connection
+from member_profile import FREQUENCY_DAYS, RECENT_ROWS, cache_stats, get_profile
+from pickers import member_picker
+from tracing import trace_scope
+
+
+# ============================================
+# Member Profile
+# ============================================
+
+@st.fragment
+def _render_profile() -> None:
+    # Searching and switching members reruns this fragment only
+    member = member_picker("Select Member", key="profile_member")
+    if member is None:
+        return
+
+    with connection() as conn, trace_scope("Member Profile"):
+        profile, cached = get_profile(conn, member[1])
+    if profile is None:
+        st.error("This member no longer exists.")
+        return
+
+    st.subheader(profile.name)
+    contact = " · ".join(part for part in (profile.email, profile.phone, profile.city) if part)
+    st.caption(f"Member {profile.member_id} · {profile.member_status or 'no status'}"
+               f"{' · ' + contact if contact else ''}")
+
+    kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+    kpi1.metric("Active Plan", profile.plan or "None",
+                f"until {profile.plan_end}" if profile.plan_end else None, delta_color="off")
+    kpi2.metric("Lifetime Spend", f"{profile.lifetime_spend:,.2f} TL", f"{profile.payments} payments",
+                delta_color="off")
+    kpi3.metric("Last Visit", profile.last_visit or "Never", f"{profile.visits} visits", delta_color="off")
+    kpi4.metric("Visits / Week", f"{profile.visits_per_week():.1f}",
+                f"{profile.recent_visits} in the last {FREQUENCY_DAYS} days", delta_color="off")
+
+    tab_memberships, tab_payments, tab_checkins, tab_classes = st.tabs(
+        ["Memberships", "Payments", "Check-ins", "Classes"])
+    tab_memberships.dataframe(pd.DataFrame(profile.memberships,
+                                           columns=["membership_id", "type", "start_date", "end_date", "is_active"]),
+                              use_container_width=True, hide_index=True)
+    tab_payments.caption(f"Latest {RECENT_ROWS}")
+    tab_payments.dataframe(pd.DataFrame(profile.recent_payments, columns=["payment_date", "method", "amount"]),
+                           use_container_width=True, hide_index=True)
+    tab_checkins.caption(f"Latest {RECENT_ROWS}")
+    tab_checkins.dataframe(pd.DataFrame(profile.recent_checkins, columns=["checkin_time", "checkout_time", "class"]),
+                           use_container_width=True, hide_index=True)
+    tab_classes.dataframe(pd.DataFrame(profile.classes, columns=["class", "sessions", "last_session"]),
+                          use_container_width=True, hide_index=True)
+
+    stats = cache_stats()
+    st.caption(f"{'Served from the cache' if cached else 'Read from the database'} at revision "
+               f"{profile.revision} ({stats['profiles']}/{stats['size']} profiles cached, "
+               f"{stats['hits']} hits, {stats['misses']} misses).")
+
+
+def render_profile_page():
+    """
+    One member's plan, spending, visits and history on a single page.
+    """
+    st.header("🪪 Member Profile")
+    _render_profile()
@@ -1,10 +1,34 @@
-def get_custom_query(table_name):
+import re
+from typing import Dict, Tuple
+from archive import ARCHIVE_RULES, ARCHIVE_SCHEMA
+from statements import PERSON_NAME
+
+
+def archive_source(table_name):
+    """
+    Hot and archived rows of an archived table as one row source.
+    The archive must be attached (archive.attach_archive).
+    """
+    return f"(SELECT * FROM main.{table_name} UNION ALL SELECT * FROM {ARCHIVE_SCHEMA}.{table_name})"
+
+
+def get_custom_query(table_name, include_archive=False):
     """
     Return a formatted SQL query for displaying a specific table.
+    With include_archive, archived Check_in/Payment rows are included too.
+    """
+    query = _view_query(table_name)
+    if include_archive and table_name in ARCHIVE_RULES:
+        query = re.sub(rf"\bFROM {table_name}\b", f"FROM {archive_source(table_name)}", query, count=1)
+    return query
+
+
+def _view_query(table_name):
+    """
     Joins related tables to show comprehensive information for each entity.
     Updated to reflect single-value 'phone' columns in Person and Contact tables.
     """
-    
+
     # MEMBER Table - Display member information including Phone Number
     if table_name == "Member":
         return ("""
@@ -21,10 +45,10 @@ def get_custom_query(table_name):
 
     # TRAINER Table - Display trainer details including Phone Number
     elif table_name == "Trainer":
-        return ("""
+        return (f"""
         SELECT 
             t.trainer_id, 
-            p.first_name || ' ' || p.last_name as Trainer_Name,
+            {PERSON_NAME} as Trainer_Name,
             p.phone, -- Direct access to phone column
             t.specialization,
             t.hire_date, 
@@ -35,10 +59,10 @@ def get_custom_query(table_name):
 
     # MEMBERSHIP Table
     elif table_name == "Membership":
-        return ("""
+        return (f"""
         SELECT 
             ms.membership_id,
-            p.first_name || ' ' || p.last_name as Member_Name, 
+            {PERSON_NAME} as Member_Name, 
             mt.name as Membership_Type, 
             mt.price,
             ms.is_active,
@@ -59,17 +83,18 @@ def get_custom_query(table_name):
             c.description,
             cs.start_time,
             cs.end_time,
-            cs.capacity
+            cs.capacity,
+            cs.room
         FROM Class_Session cs
         JOIN Class c ON cs.class_id = c.class_id
         """)
         
     # PAYMENT Table
     elif table_name == "Payment":
-        return ("""
+        return (f"""
         SELECT
             pay.payment_id,
-            p.first_name || ' ' || p.last_name as Member_Name,
+            {PERSON_NAME} as Member_Name,
             pay.amount,
             pay.method,
             pay.payment_date
@@ -80,9 +105,9 @@ def get_custom_query(table_name):
 
     # TRAINER_SPECIALIZATION Table
     elif table_name == "Trainer_Specialization":
-        return ("""
+        return (f"""
         SELECT 
-            p.first_name || ' ' || p.last_name as Trainer_Name, 
+            {PERSON_NAME} as Trainer_Name, 
             s.name as Specialization_Area 
         FROM Trainer_Specialization ts
         JOIN Trainer t ON ts.trainer_id = t.trainer_id
@@ -92,10 +117,10 @@ def get_custom_query(table_name):
 
     # CONTACT Table
     elif table_name == "Contact":
-        return ("""
+        return (f"""
         SELECT 
             c.contact_id,
-            p.first_name || ' ' || p.last_name as Member_Name,
+            {PERSON_NAME} as Member_Name,
             c.contact_name as Emergency_Contact,
             c.relationship,
             c.phone as Contact_Phone -- Direct access to phone column
@@ -105,9 +130,9 @@ def get_custom_query(table_name):
 
     # ATTENDS Table
     elif table_name == "Attends":
-        return ("""
+        return (f"""
         SELECT 
-            p.first_name || ' ' || p.last_name as Member_Name,
+            {PERSON_NAME} as Member_Name,
             c.class_name as Class, 
             cs.start_time as Session_Time, 
             cs.duration || ' min' as Duration 
@@ -120,9 +145,9 @@ def get_custom_query(table_name):
 
     # TEACHES Table
     elif table_name == "Teaches":
-        return ("""
+        return (f"""
         SELECT 
-            p.first_name || ' ' || p.last_name as Trainer_Name, 
+            {PERSON_NAME} as Trainer_Name, 
             c.class_name as Class, 
             cs.start_time as Session_Time, 
             cs.duration || ' min' as Duration 
@@ -135,10 +160,10 @@ def get_custom_query(table_name):
         
     # CHECK_IN Table
     elif table_name == "Check_in":
-        return ("""
+        return (f"""
         SELECT
                 ci.checkin_id,
-                p.first_name || ' ' || p.last_name as Member_Name,
+                {PERSON_NAME} as Member_Name,
                 c.class_name as Class,
                 cs.start_time as Session_Scheduled,
                 ci.checkin_time,
@@ -146,11 +171,61 @@ def get_custom_query(table_name):
         FROM Check_in ci
         JOIN Member m ON ci.member_id = m.member_id
         JOIN Person p ON m.person_id = p.id
-        JOIN Class_Session cs ON ci.class_session_id = cs.class_session_id
-        JOIN Class c ON cs.class_id = c.class_id
+        -- Turnstile check-ins (ingest.py) have no class session
+        LEFT JOIN Class_Session cs ON ci.class_session_id = cs.class_session_id
+        LEFT JOIN Class c ON cs.class_id = c.class_id
         ORDER BY ci.checkin_time DESC
         """)
 
     else:
         # Fallback for any other table
-        return (f"SELECT * FROM {table_name}")
\ No newline at end of file
+        return (f"SELECT * FROM {table_name}")
+
+
+# ============================================
+# Keyset Pagination
+# ============================================
+# Seek key for every view: (key columns, newest first?). The key columns must
+# be unique together and backed by an index so each page is a range scan.
+PAGE_KEYS: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "Person": (("id",), False),
+    "Member": (("m.member_id",), False),
+    "Trainer": (("t.trainer_id",), False),
+    "Specialization": (("specialization_id",), False),
+    "Trainer_Specialization": (("ts.trainer_id", "ts.specialization_id"), False),
+    "Contact": (("c.contact_id",), False),
+    "Class": (("class_id",), False),
+    "Class_Session": (("cs.class_session_id",), False),
+    "Membership_Type": (("membership_type_id",), False),
+    "Membership": (("ms.membership_id",), False),
+    "Payment": (("pay.payment_id",), False),
+    "Check_in": (("ci.checkin_time", "ci.checkin_id"), True),
+    "Attends": (("a.member_id", "a.class_session_id"), False),
+    "Teaches": (("t.trainer_id", "t.class_session_id"), False),
+}
+
+KEY_COLUMN_PREFIX: str = "_key"
+
+
+def get_page_query(table_name, after_key=False, include_archive=False):
+    """
+    Return a keyset-paginated version of get_custom_query(table_name).
+    The first len(keys) columns are the seek key (named _key0, _key1, ...);
+    pass them back as parameters, followed by the page size, to get the next page.
+    """
+    keys, descending = PAGE_KEYS[table_name]
+
+    # The seek key decides the order, so drop the view's own ORDER BY
+    view = get_custom_query(table_name, include_archive).strip()
+    base = re.sub(r"\s+ORDER BY[^()]*$", "", view, flags=re.IGNORECASE)
+
+    key_columns = ", ".join(f"{key} AS {KEY_COLUMN_PREFIX}{i}" for i, key in enumerate(keys))
+    query = re.sub(r"^\s*SELECT", f"SELECT {key_columns},", base, count=1, flags=re.IGNORECASE)
+
+    if after_key:
+        placeholders = ", ".join("?" for _ in keys)
+        query += f"\n        WHERE ({', '.join(keys)}) {'<' if descending else '>'} ({placeholders})"
+
+    direction = " DESC" if descending else ""
+    query += f"\n        ORDER BY {', '.join(key + direction for key in keys)}\n        LIMIT ?"
+    return query
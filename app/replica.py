@@ -0,0 +1,191 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from connection import (BUSY_TIMEOUT_SECONDS, CACHE_SIZE, DATABASE_NAME, MMAP_SIZE, POOL_SIZE, STATEMENT_CACHE_SIZE,
+                        connection)
+from tracing import TracedConnection
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# Read Replica
+# ============================================
+# A snapshot of gym.db taken with the online backup API and swapped into
+# place atomically. Reports and View Tables read from it, so long analytical
+# queries never hold up front-desk writes on the primary. The snapshot's
+# file modification time is its "data as of" timestamp.
+
+REPLICA_PATH: str = os.environ.get("GYM_REPLICA_PATH", "gym_replica.db")
+# Seconds between background refreshes (0 disables the replica; reads go to gym.db)
+REFRESH_SECONDS: float = float(os.environ.get("GYM_REPLICA_REFRESH", 60))
+
+# (inode, mtime) of the snapshot a pooled connection was opened on
+Generation = Tuple[int, int]
+
+_pool: List[Tuple[Generation, sqlite3.Connection]] = []
+_pool_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def refresh_replica(source: str = DATABASE_NAME, target: str = REPLICA_PATH) -> float:
+    """
+    Copy `source` into a new snapshot and atomically replace `target` with it.
+    Returns the seconds taken. Readers still using the old snapshot keep
+    their file until they are done with it.
+    """
+    started = time.perf_counter()
+    partial = f"{target}.{os.getpid()}.tmp"
+    with _refresh_lock:
+        if os.path.exists(partial):
+            os.remove(partial)
+        src = sqlite3.connect(source, timeout=BUSY_TIMEOUT_SECONDS)
+        dst = sqlite3.connect(partial)
+        try:
+            # One step: a single WAL read transaction, which never blocks writers
+            src.backup(dst)
+            # The copy must not need -wal/-shm files to be opened read-only
+            dst.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            dst.close()
+            src.close()
+        os.replace(partial, target)
+    return time.perf_counter() - started
+
+
+def _generation(path: str = REPLICA_PATH) -> Optional[Generation]:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_ino, info.st_mtime_ns
+
+
+def replica_refreshed_at() -> Optional[datetime]:
+    """
+    When the current snapshot was taken, or None when reads go to the primary.
+    """
+    generation = _generation() if REFRESH_SECONDS > 0 else None
+    return datetime.fromtimestamp(generation[1] / 1e9) if generation else None
+
+
+def describe_staleness() -> str:
+    refreshed_at = replica_refreshed_at()
+    if refreshed_at is None:
+        return "Showing live data."
+    age = (datetime.now() - refreshed_at).total_seconds()
+    return f"Showing a snapshot from {refreshed_at:%Y-%m-%d %H:%M:%S} ({age:,.0f} s ago)."
+
+
+def _open_replica() -> sqlite3.Connection:
+    uri = f"file:{quote(os.path.abspath(REPLICA_PATH))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False, factory=TracedConnection,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE:d};")
+    conn.execute(f"PRAGMA cache_size = {CACHE_SIZE:d};")
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    return conn
+
+
+def _acquire(generation: Generation) -> sqlite3.Connection:
+    stale = []
+    conn = None
+    with _pool_lock:
+        while _pool:
+            pooled_generation, pooled = _pool.pop()
+            if pooled_generation == generation:
+                conn = pooled
+                break
+            stale.append(pooled)
+    for old in stale:
+        old.close()
+    return conn or _open_replica()
+
+
+def _release(generation: Generation, conn: sqlite3.Connection) -> None:
+    with _pool_lock:
+        if len(_pool) < POOL_SIZE and generation == _generation():
+            _pool.append((generation, conn))
+            return
+    conn.close()
+
+
+@contextmanager
+def replica_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Read-only connection to the newest snapshot. Falls back to the primary
+    (a regular pooled connection) while the replica is disabled or missing.
+    """
+    generation = _generation() if REFRESH_SECONDS > 0 else None
+    if generation is None:
+        with connection() as conn:
+            yield conn
+        return
+
+    conn = _acquire(generation)
+    try:
+        yield conn
+    finally:
+        _release(generation, conn)
+
+
+def _loop(interval: float) -> None:
+    while not _stop.is_set():
+        try:
+            refresh_replica()
+        except (sqlite3.Error, OSError):
+            # Keep serving the previous snapshot; try again next tick
+            logger.warning("Replica refresh failed", exc_info=True)
+        _stop.wait(interval)
+
+
+def start_background_refresher(interval: float = REFRESH_SECONDS) -> Optional[threading.Thread]:
+    """
+    Start the daemon thread that refreshes the snapshot now and then every
+    `interval` seconds. Safe to call repeatedly; one thread per process.
+    """
+    global _thread
+    if interval <= 0:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _stop.clear()
+            _thread = threading.Thread(target=_loop, args=(interval,), name="replica-refresher", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def stop_background_refresher() -> None:
+    global _thread
+    with _thread_lock:
+        if _thread is not None:
+            _stop.set()
+            _thread.join()
+            _thread = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the read-only replica of gym.db.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--replica", default=REPLICA_PATH)
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="keep refreshing at this interval")
+    args = parser.parse_args()
+
+    try:
+        while True:
+            seconds = refresh_replica(args.database, args.replica)
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} refreshed {args.replica} in {seconds:.2f}s")
+            if not args.every:
+                break
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
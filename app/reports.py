@@ -0,0 +1,51 @@
+import sqlite3
+from typing import List, Tuple
+
+# ============================================
+# Revenue Reports
+# ============================================
+# Everything here reads the Revenue_Daily / Revenue_Monthly rollups, which
+# Payment triggers keep current. Their size grows with days x methods x
+# membership types, not with the number of payments.
+
+NO_MEMBERSHIP_LABEL: str = "No membership"
+REVENUE_COLUMNS: List[str] = ["method", "membership_type", "amount", "payments"]
+
+MONTHLY_SQL: str = '''
+    SELECT r.month, r.method, COALESCE(mt.name, ?) AS membership_type, r.amount, r.payments
+    FROM Revenue_Monthly r
+    LEFT JOIN Membership_Type mt ON r.membership_type_id = mt.membership_type_id
+    WHERE r.month BETWEEN ? AND ?
+'''
+
+DAILY_SQL: str = '''
+    SELECT r.day, r.method, COALESCE(mt.name, ?) AS membership_type, r.amount, r.payments
+    FROM Revenue_Daily r
+    LEFT JOIN Membership_Type mt ON r.membership_type_id = mt.membership_type_id
+    WHERE r.day BETWEEN ? AND ?
+'''
+
+YEARS_SQL: str = '''
+    SELECT DISTINCT substr(month, 1, 4) FROM Revenue_Monthly
+    WHERE month <> '' ORDER BY 1
+'''
+
+
+def get_revenue_years(conn: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in conn.execute(YEARS_SQL).fetchall()]
+
+
+def get_monthly_revenue(conn: sqlite3.Connection, first_month: str, last_month: str) -> List[Tuple]:
+    """
+    (month, method, membership type, amount, payments) rows for months in
+    [first_month, last_month], both 'YYYY-MM'.
+    """
+    return conn.execute(MONTHLY_SQL, (NO_MEMBERSHIP_LABEL, first_month, last_month)).fetchall()
+
+
+def get_daily_revenue(conn: sqlite3.Connection, first_day: str, last_day: str) -> List[Tuple]:
+    """
+    (day, method, membership type, amount, payments) rows for days in
+    [first_day, last_day], both 'YYYY-MM-DD'.
+    """
+    return conn.execute(DAILY_SQL, (NO_MEMBERSHIP_LABEL, first_day, last_day)).fetchall()
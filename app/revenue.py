@@ -0,0 +1,75 @@
+import streamlit as st
+import pandas as pd
+from replica import describe_staleness, replica_connection
+from reports import REVENUE_COLUMNS, get_daily_revenue, get_monthly_revenue, get_revenue_years
+from tracing import trace_scope
+
+BREAKDOWNS = {"Payment Method": "method", "Membership Type": "membership_type"}
+
+
+# ============================================
+# Revenue Dashboard
+# ============================================
+
+def render_revenue_page():
+    """
+    Dashboard for revenue by month, payment method and membership type.
+    """
+    st.header("💰 Revenue")
+
+    with replica_connection() as conn, trace_scope("Revenue"):
+        st.caption(describe_staleness())
+        years = get_revenue_years(conn)
+        if not years:
+            st.info("No payments recorded yet.")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        first_year = col1.selectbox("From year", years, index=0)
+        last_year = col2.selectbox("To year", years, index=len(years) - 1)
+        breakdown = col3.radio("Break down by", list(BREAKDOWNS), horizontal=True)
+        dimension = BREAKDOWNS[breakdown]
+
+        if first_year > last_year:
+            st.error("'From year' must not be after 'To year'.")
+            return
+
+        monthly = pd.DataFrame(get_monthly_revenue(conn, f"{first_year}-01", f"{last_year}-12"),
+                               columns=["month"] + REVENUE_COLUMNS)
+        if monthly.empty:
+            st.info("No payments in the selected years.")
+            return
+
+        # ==========================================
+        # TOTALS
+        # ==========================================
+        total = monthly["amount"].sum()
+        payments = int(monthly["payments"].sum())
+        kpi1, kpi2, kpi3 = st.columns(3)
+        kpi1.metric("Total Revenue", f"{total:,.2f} TL")
+        kpi2.metric("Payments", f"{payments:,}")
+        kpi3.metric("Average Payment", f"{total / payments:,.2f} TL" if payments else "-")
+
+        # ==========================================
+        # MONTHLY REVENUE
+        # ==========================================
+        st.subheader(f"Monthly Revenue by {breakdown}")
+        by_month = monthly.pivot_table(index="month", columns=dimension, values="amount",
+                                       aggfunc="sum", fill_value=0)
+        st.bar_chart(by_month)
+
+        summary = monthly.groupby(dimension).agg(revenue=("amount", "sum"), payments=("payments", "sum"))
+        summary["share_%"] = summary["revenue"] / total * 100 if total else 0
+        st.dataframe(summary.sort_values("revenue", ascending=False).round(2), use_container_width=True)
+
+        # ==========================================
+        # DAILY REVENUE FOR ONE MONTH
+        # ==========================================
+        st.subheader("Daily Revenue")
+        months = sorted(monthly["month"].unique(), reverse=True)
+        month = st.selectbox("Month", months)
+
+        daily = pd.DataFrame(get_daily_revenue(conn, f"{month}-01", f"{month}-31"),
+                             columns=["day"] + REVENUE_COLUMNS)
+        by_day = daily.pivot_table(index="day", columns=dimension, values="amount", aggfunc="sum", fill_value=0)
+        st.bar_chart(by_day)
@@ -0,0 +1,44 @@
+import re
+from typing import Dict
+from database import connection
+from statements import fetch_all
+
+# Number of matches offered by a typeahead picker
+SEARCH_LIMIT: int = 20
+
+
+def build_match_query(term: str) -> str:
+    """
+    Turn free user input into a safe FTS5 prefix query.
+    'ali yil' becomes '"ali"* "yil"*' (every word must prefix-match a column).
+    """
+    words = re.findall(r"\w+", term)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _search(statement: str, recent_statement: str, id_field: str, term: str, limit: int) -> Dict[str, int]:
+    match = build_match_query(term)
+
+    with connection() as conn:
+        if match:
+            rows = fetch_all(conn, statement, (match, limit))
+        else:
+            # Empty box: offer the most recently registered people
+            rows = fetch_all(conn, recent_statement, (limit,))
+
+    return {row.label: getattr(row, id_field) for row in rows}
+
+
+def search_members(term: str, limit: int = SEARCH_LIMIT) -> Dict[str, int]:
+    """
+    Return up to `limit` members whose name, email or phone starts with the
+    typed words, best matches first, as {display label: member_id}.
+    """
+    return _search("member_search", "member_recent", "member_id", term, limit)
+
+
+def search_trainers(term: str, limit: int = SEARCH_LIMIT) -> Dict[str, int]:
+    """
+    Return up to `limit` trainers matching the typed words as {display label: trainer_id}.
+    """
+    return _search("trainer_search", "trainer_recent", "trainer_id", term, limit)
@@ -0,0 +1,189 @@
+import math
+import sqlite3
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from conflicts import ROOM, TRAINER, ScheduleConflict, TimetableChange, apply_change, get_timetable, read_change
+from statements import execute, fetch_all, fetch_one
+from timestamps import SESSION_COLUMNS, format_timestamp, sessions_between
+from validation import MEMBER_STATUS_OPTIONS, validate_member
+
+# ============================================
+# Gym Operations
+# ============================================
+# The writes behind the Insertion/Update forms, without any Streamlit code, so
+# the forms and the JSON API (api.py) run exactly the same SQL and rules.
+# Every function takes a connection and commits its own IMMEDIATE
+# transaction. Bad input raises ValueError and a missing row raises
+# LookupError; the caller decides how to show them.
+
+PAYMENT_METHODS: List[str] = ["Credit Card", "Cash", "Bank Transfer"]
+
+
+def _write(conn: sqlite3.Connection, work) -> object:
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        result = work(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return result
+
+
+def _require(cur: sqlite3.Cursor, statement: str, value: int, label: str) -> None:
+    if fetch_one(cur, statement, (value,)) is None:
+        raise LookupError(f"{label} {value} does not exist")
+
+
+def register_member(conn: sqlite3.Connection, record: Dict[str, str]) -> int:
+    """
+    Insert the person, member and emergency contact of one registration.
+    `record` uses the MEMBER_REQUIRED_FIELDS keys plus birth_date and
+    member_status. Returns the new member_id.
+    """
+    errors = validate_member(record)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    def work(cur: sqlite3.Cursor) -> int:
+        execute(cur, "insert_person",
+                (record["first_name"], record["last_name"], str(record.get("birth_date") or ""),
+                 record["email"], record["phone"], record["city"], record["street"], record["zip"]))
+        person_id = cur.lastrowid
+        execute(cur, "insert_member", (person_id, record.get("member_status") or MEMBER_STATUS_OPTIONS[0]))
+        member_id = cur.lastrowid
+        execute(cur, "insert_contact",
+                (person_id, record["contact_name"], record["relationship"], record["contact_phone"]))
+        return member_id
+
+    return _write(conn, work)
+
+
+def record_payment(conn: sqlite3.Connection, member_id: int, amount: float, method: str,
+                   payment_date: date) -> int:
+    """
+    Record a payment and return its payment_id. The revenue rollups are
+    updated by the Payment triggers.
+    """
+    # NaN and infinity both pass `amount <= 0`; inf would stick in the revenue rollups
+    if not math.isfinite(amount):
+        raise ValueError("Payment amount must be a finite number.")
+    if amount <= 0:
+        raise ValueError("Payment amount must be greater than 0.")
+    if method not in PAYMENT_METHODS:
+        raise ValueError(f"Unknown payment method '{method}' (expected one of {', '.join(PAYMENT_METHODS)})")
+
+    def work(cur: sqlite3.Cursor) -> int:
+        _require(cur, "member_exists", member_id, "Member")
+        execute(cur, "insert_payment", (member_id, payment_date.isoformat(), method, amount))
+        return cur.lastrowid
+
+    return _write(conn, work)
+
+
+def assign_membership(conn: sqlite3.Connection, member_id: int, membership_type_id: int, start_date: date,
+                      end_date: date, is_active: bool = True) -> int:
+    """
+    Give a member a membership package and return its membership_id.
+    """
+    if end_date < start_date:
+        raise ValueError("End date cannot be before start date.")
+
+    def work(cur: sqlite3.Cursor) -> int:
+        _require(cur, "member_exists", member_id, "Member")
+        _require(cur, "membership_type_exists", membership_type_id, "Membership type")
+        execute(cur, "insert_membership",
+                (member_id, membership_type_id, 1 if is_active else 0, start_date.isoformat(), end_date.isoformat()))
+        return cur.lastrowid
+
+    return _write(conn, work)
+
+
+def _check_timetable(cur: sqlite3.Cursor, start: datetime, end: datetime, room: Optional[str],
+                     trainer_ids: List[int], session_id: Optional[int] = None) -> int:
+    # Returns the Timetable_Revision checked against, for read_change()
+    timetable = get_timetable(cur.connection)
+    conflicts = timetable.conflicts(start, end, room, trainer_ids, session_id)
+    if conflicts:
+        raise ScheduleConflict(conflicts)
+    return timetable.revision
+
+
+def _room(room: Optional[str]) -> Optional[str]:
+    return (room or "").strip() or None
+
+
+def schedule_session(conn: sqlite3.Connection, class_id: int, start: datetime, end: datetime, capacity: int,
+                     room: Optional[str] = None, trainer_id: Optional[int] = None) -> int:
+    """
+    Schedule a session of a class, optionally in a room and taught by a
+    trainer, and return its class_session_id. Raises ScheduleConflict if the
+    room or trainer is already booked at that time.
+    """
+    if end <= start:
+        raise ValueError("End time must be later than start time.")
+    if capacity < 1:
+        raise ValueError("Capacity must be at least 1.")
+    room = _room(room)
+
+    def work(cur: sqlite3.Cursor) -> Tuple[int, TimetableChange]:
+        _require(cur, "class_exists", class_id, "Class")
+        revision = _check_timetable(cur, start, end, room, [trainer_id] if trainer_id is not None else [])
+        execute(cur, "insert_class_session", (class_id, format_timestamp(start), format_timestamp(end), capacity,
+                                              int((end - start).total_seconds()) // 60, room))
+        session_id = cur.lastrowid
+        if trainer_id is not None:
+            execute(cur, "insert_teaches", (trainer_id, session_id))
+        return session_id, read_change(cur.connection, revision, session_id)
+
+    session_id, change = _write(conn, work)
+    apply_change(change)
+    return session_id
+
+
+def reschedule_session(conn: sqlite3.Connection, session_id: int, start: datetime, end: datetime,
+                       capacity: Optional[int] = None, room: Optional[str] = None) -> None:
+    """
+    Move a class session (and optionally change its capacity or room; an
+    empty room clears it). The duration follows from the new times; the
+    epoch columns from the update trigger. Raises ScheduleConflict if one of
+    its trainers or the room is already booked at the new time.
+    """
+    if end <= start:
+        raise ValueError("End time must be later than start time.")
+    if capacity is not None and capacity < 1:
+        raise ValueError("Capacity must be at least 1.")
+
+    def work(cur: sqlite3.Cursor) -> TimetableChange:
+        current = fetch_one(cur, "session_schedule", (session_id,))
+        if current is None:
+            raise LookupError(f"Class session {session_id} does not exist")
+        new_room = current.room if room is None else _room(room)
+        trainer_ids = [row.trainer_id for row in fetch_all(cur, "session_trainers", (session_id,))]
+        revision = _check_timetable(cur, start, end, new_room, trainer_ids, session_id)
+        execute(cur, "reschedule_session",
+                (format_timestamp(start), format_timestamp(end), capacity,
+                 int((end - start).total_seconds()) // 60, new_room, session_id))
+        old_keys = [(TRAINER, trainer_id) for trainer_id in trainer_ids]
+        if current.room:
+            old_keys.append((ROOM, current.room))
+        return read_change(cur.connection, revision, session_id, old_keys)
+
+    apply_change(_write(conn, work))
+
+
+# ============================================
+# Lookups
+# ============================================
+
+def get_member(conn: sqlite3.Connection, member_id: int) -> Dict:
+    row = fetch_one(conn, "member_detail", (member_id,))
+    if row is None:
+        raise LookupError(f"Member {member_id} does not exist")
+    return asdict(row)
+
+
+def list_sessions(conn: sqlite3.Connection, start: datetime, end: datetime) -> List[Dict]:
+    return [dict(zip(SESSION_COLUMNS, row)) for row in sessions_between(conn, start, end)]
@@ -0,0 +1,415 @@
+import argparse
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, make_dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from archive import ARCHIVE_SCHEMA, is_attached
+from connection import DATABASE_NAME, STATEMENT_CACHE_SIZE, open_connection
+
+# ============================================
+# Statement Registry
+# ============================================
+# Every fixed statement behind the forms, the services layer and the member /
+# trainer search lives here under a name, so each one is written once and can
+# be explained and timed from one place (python statements.py --explain).
+# Statements always reach SQLite as the same text, so a pooled connection,
+# whose statement cache holds STATEMENT_CACHE_SIZE entries, prepares each one
+# once and reuses it on every rerun afterwards.
+#
+# A read statement names its result columns; its rows come back as small
+# __slots__ records (row.member_id instead of row[1]).
+#
+# View Tables queries stay in queries.py, where pagination and the archive
+# rewrite them, but use the same name expressions.
+
+Executor = Union[sqlite3.Connection, sqlite3.Cursor]
+
+# "First Last" of the Person joined as p
+PERSON_NAME: str = "p.first_name || ' ' || p.last_name"
+MEMBER_LABEL: str = f"{PERSON_NAME} || ' (ID: ' || m.member_id || ')'"
+TRAINER_LABEL: str = f"{PERSON_NAME} || ' (ID: ' || t.trainer_id || ')'"
+MEMBERSHIP_LABEL: str = f"{PERSON_NAME} || ' - ' || mt.name || ' (End: ' || ms.end_date || ')'"
+SESSION_LABEL: str = "c.class_name || ' (' || cs.start_time || ')'"
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    # __slots__ record class for the rows of a read statement, None for writes
+    record: Optional[type] = None
+
+
+STATEMENTS: Dict[str, Statement] = {}
+
+
+def _record_name(name: str) -> str:
+    return "".join(part.title() for part in name.split("_")) + "Row"
+
+
+def _register(name: str, sql: str, fields: Sequence[str] = ()) -> None:
+    record = make_dataclass(_record_name(name), list(fields), slots=True) if fields else None
+    STATEMENTS[name] = Statement(name, sql, record)
+
+
+# ============================================
+# Reads
+# ============================================
+
+# Typeahead pickers (search.py)
+_register("member_search", f"""
+    SELECT {MEMBER_LABEL}, m.member_id
+    FROM Person_fts f
+    JOIN Member m ON m.person_id = f.rowid
+    JOIN Person p ON p.id = f.rowid
+    WHERE Person_fts MATCH ?
+    ORDER BY f.rank
+    LIMIT ?
+""", ("label", "member_id"))
+_register("member_recent", f"""
+    SELECT {MEMBER_LABEL}, m.member_id
+    FROM Member m JOIN Person p ON m.person_id = p.id
+    ORDER BY m.member_id DESC
+    LIMIT ?
+""", ("label", "member_id"))
+_register("trainer_search", f"""
+    SELECT {TRAINER_LABEL}, t.trainer_id
+    FROM Person_fts f
+    JOIN Trainer t ON t.person_id = f.rowid
+    JOIN Person p ON p.id = f.rowid
+    WHERE Person_fts MATCH ?
+    ORDER BY f.rank
+    LIMIT ?
+""", ("label", "trainer_id"))
+_register("trainer_recent", f"""
+    SELECT {TRAINER_LABEL}, t.trainer_id
+    FROM Trainer t JOIN Person p ON t.person_id = p.id
+    ORDER BY t.trainer_id DESC
+    LIMIT ?
+""", ("label", "trainer_id"))
+
+# Dropdown options (options.get_options): display label, id
+_register("class_options", "SELECT class_name, class_id FROM Class", ("label", "class_id"))
+_register("session_options", f"""
+    SELECT {SESSION_LABEL}, cs.class_session_id
+    FROM Class_Session cs
+    JOIN Class c ON cs.class_id = c.class_id
+    ORDER BY cs.start_time DESC
+""", ("label", "class_session_id"))
+_register("bookable_session_options", f"""
+    SELECT {SESSION_LABEL} || ' - ' || cs.booked_count || '/' ||
+           COALESCE(cs.capacity, '∞') || ' booked', cs.class_session_id
+    FROM Class_Session cs
+    JOIN Class c ON cs.class_id = c.class_id
+    ORDER BY cs.start_time DESC
+""", ("label", "class_session_id"))
+_register("membership_type_options", "SELECT name || ' - ' || price || ' TL', membership_type_id FROM Membership_Type",
+          ("label", "membership_type_id"))
+_register("membership_options", f"""
+    SELECT {MEMBERSHIP_LABEL}, ms.membership_id
+    FROM Membership ms
+    JOIN Member m ON ms.member_id = m.member_id
+    JOIN Person p ON m.person_id = p.id
+    JOIN Membership_Type mt ON ms.membership_type_id = mt.membership_type_id
+""", ("label", "membership_id"))
+_register("specialization_options", "SELECT name, specialization_id FROM Specialization",
+          ("label", "specialization_id"))
+
+# Single-record lookups
+_register("member_detail", """
+    SELECT m.member_id, p.first_name, p.last_name, p.email, p.phone, m.member_status
+    FROM Member m
+    JOIN Person p ON m.person_id = p.id
+    WHERE m.member_id = ?
+""", ("member_id", "first_name", "last_name", "email", "phone", "member_status"))
+_register("member_address", """
+    SELECT p.email, p.city, p.street, p.zip, m.member_status, p.id
+    FROM Member m
+    JOIN Person p ON m.person_id = p.id
+    WHERE m.member_id = ?
+""", ("email", "city", "street", "zip", "member_status", "person_id"))
+_register("trainer_profile", """
+    SELECT t.specialization, t.trainer_status, p.email
+    FROM Trainer t JOIN Person p ON t.person_id = p.id
+    WHERE t.trainer_id = ?
+""", ("specialization", "trainer_status", "email"))
+_register("session_schedule",
+          "SELECT start_time, end_time, capacity, start_ts, end_ts, room FROM Class_Session WHERE class_session_id = ?",
+          ("start_time", "end_time", "capacity", "start_ts", "end_ts", "room"))
+_register("session_trainers", "SELECT trainer_id FROM Teaches WHERE class_session_id = ?", ("trainer_id",))
+_register("membership_validity", "SELECT start_date, end_date, is_active FROM Membership WHERE membership_id = ?",
+          ("start_date", "end_date", "is_active"))
+_register("class_exists", "SELECT 1 FROM Class WHERE class_id = ?", ("found",))
+_register("member_exists", "SELECT 1 FROM Member WHERE member_id = ?", ("found",))
+_register("membership_type_exists", "SELECT 1 FROM Membership_Type WHERE membership_type_id = ?", ("found",))
+
+# Conflict detection (conflicts.py): every session of every trainer and room, in start order
+_register("timetable_revision", "SELECT revision FROM Timetable_Revision", ("revision",))
+_register("timetable", """
+    SELECT 'trainer', t.trainer_id, cs.class_session_id, cs.start_ts, cs.end_ts
+    FROM Teaches t
+    JOIN Class_Session cs ON cs.class_session_id = t.class_session_id
+    WHERE cs.start_ts IS NOT NULL AND cs.end_ts IS NOT NULL
+    UNION ALL
+    SELECT 'room', cs.room, cs.class_session_id, cs.start_ts, cs.end_ts
+    FROM Class_Session cs
+    WHERE cs.room IS NOT NULL AND cs.start_ts IS NOT NULL AND cs.end_ts IS NOT NULL
+    ORDER BY 4, 3
+""", ("kind", "resource", "class_session_id", "start_ts", "end_ts"))
+# ... and the trainers and room of one session, to update the cached index after a write
+_register("timetable_session", """
+    SELECT 'trainer', t.trainer_id, cs.class_session_id, cs.start_ts, cs.end_ts
+    FROM Teaches t
+    JOIN Class_Session cs ON cs.class_session_id = t.class_session_id
+    WHERE cs.class_session_id = ?1 AND cs.start_ts IS NOT NULL AND cs.end_ts IS NOT NULL
+    UNION ALL
+    SELECT 'room', cs.room, cs.class_session_id, cs.start_ts, cs.end_ts
+    FROM Class_Session cs
+    WHERE cs.class_session_id = ?1 AND cs.room IS NOT NULL AND cs.start_ts IS NOT NULL AND cs.end_ts IS NOT NULL
+""", ("kind", "resource", "class_session_id", "start_ts", "end_ts"))
+
+# Calendar (timetable.py): the sessions starting in [start, end), by idx_class_session_start_ts
+_register("calendar_sessions", f"""
+    SELECT cs.class_session_id, c.class_name, cs.start_ts, cs.end_ts, cs.room, cs.capacity,
+           (SELECT group_concat({PERSON_NAME}, ', ')
+            FROM Teaches t
+            JOIN Trainer tr ON t.trainer_id = tr.trainer_id
+            JOIN Person p ON tr.person_id = p.id
+            WHERE t.class_session_id = cs.class_session_id)
+    FROM Class_Session cs
+    JOIN Class c ON cs.class_id = c.class_id
+    WHERE cs.start_ts >= ? AND cs.start_ts < ?
+    ORDER BY cs.start_ts
+""", ("class_session_id", "class_name", "start_ts", "end_ts", "room", "capacity", "trainers"))
+
+# Member profile (member_profile.py): everything about one member in a
+# single statement, ?1 = member_id, ?2 = start of the visit-frequency
+# window, ?3 = rows per history list. Histories come back as JSON arrays.
+# "member_profile_archived" also counts the rows archive.py has moved to the
+# attached archive, so lifetime figures agree with the revenue rollups.
+ARCHIVED_PAYMENTS: str = f"""(
+    SELECT member_id, payment_date, method, amount FROM main.Payment
+    UNION ALL
+    SELECT member_id, payment_date, method, amount FROM {ARCHIVE_SCHEMA}.Payment)"""
+ARCHIVED_CHECKINS: str = f"""(
+    SELECT member_id, class_session_id, checkin_time, checkout_time FROM main.Check_in
+    UNION ALL
+    SELECT member_id, class_session_id, checkin_time, checkout_time FROM {ARCHIVE_SCHEMA}.Check_in)"""
+
+
+def _member_profile_sql(payments: str, checkins: str) -> str:
+    return f"""
+    SELECT m.member_id, {PERSON_NAME}, p.email, p.phone, p.city, m.member_status,
+           (SELECT COALESCE(MAX(revision), 0) FROM Member_Revision WHERE member_id = ?1),
+           plan_type.name, plan.end_date,
+           (SELECT COALESCE(SUM(amount), 0) FROM {payments} WHERE member_id = ?1),
+           (SELECT COUNT(*) FROM {payments} WHERE member_id = ?1),
+           (SELECT MIN(checkin_time) FROM {checkins} WHERE member_id = ?1),
+           (SELECT MAX(checkin_time) FROM {checkins} WHERE member_id = ?1),
+           (SELECT COUNT(*) FROM {checkins} WHERE member_id = ?1),
+           (SELECT COUNT(*) FROM {checkins} WHERE member_id = ?1 AND checkin_time >= ?2),
+           (SELECT json_group_array(json_array(membership_id, name, start_date, end_date, is_active)) FROM (
+                SELECT ms.membership_id, mt.name, ms.start_date, ms.end_date, ms.is_active
+                FROM Membership ms
+                LEFT JOIN Membership_Type mt ON ms.membership_type_id = mt.membership_type_id
+                WHERE ms.member_id = ?1
+                ORDER BY ms.end_date DESC)),
+           (SELECT json_group_array(json_array(payment_date, method, amount)) FROM (
+                SELECT payment_date, method, amount
+                FROM {payments}
+                WHERE member_id = ?1
+                ORDER BY payment_date DESC
+                LIMIT ?3)),
+           (SELECT json_group_array(json_array(checkin_time, checkout_time, class_name)) FROM (
+                SELECT ci.checkin_time, ci.checkout_time, c.class_name
+                FROM {checkins} ci
+                LEFT JOIN Class_Session cs ON ci.class_session_id = cs.class_session_id
+                LEFT JOIN Class c ON cs.class_id = c.class_id
+                WHERE ci.member_id = ?1
+                ORDER BY ci.checkin_time DESC
+                LIMIT ?3)),
+           (SELECT json_group_array(json_array(class_name, sessions, last_session)) FROM (
+                SELECT c.class_name, COUNT(*) AS sessions, MAX(cs.start_time) AS last_session
+                FROM Attends a
+                JOIN Class_Session cs ON a.class_session_id = cs.class_session_id
+                JOIN Class c ON cs.class_id = c.class_id
+                WHERE a.member_id = ?1
+                GROUP BY c.class_id
+                ORDER BY sessions DESC))
+    FROM Member m
+    JOIN Person p ON m.person_id = p.id
+    -- Active plan: the one that runs the longest
+    LEFT JOIN Membership plan ON plan.membership_id = (
+        SELECT membership_id FROM Membership
+        WHERE member_id = m.member_id AND is_active = 1
+        ORDER BY end_date DESC
+        LIMIT 1)
+    LEFT JOIN Membership_Type plan_type ON plan.membership_type_id = plan_type.membership_type_id
+    WHERE m.member_id = ?1
+"""
+
+
+PROFILE_FIELDS: Tuple[str, ...] = (
+    "member_id", "name", "email", "phone", "city", "member_status", "revision", "plan", "plan_end",
+    "lifetime_spend", "payments", "first_visit", "last_visit", "visits", "recent_visits",
+    "memberships", "recent_payments", "recent_checkins", "classes")
+_register("member_profile", _member_profile_sql("Payment", "Check_in"), PROFILE_FIELDS)
+_register("member_profile_archived", _member_profile_sql(ARCHIVED_PAYMENTS, ARCHIVED_CHECKINS), PROFILE_FIELDS)
+_register("member_revision", "SELECT revision FROM Member_Revision WHERE member_id = ?", ("revision",))
+
+
+# ============================================
+# Writes
+# ============================================
+
+_register("insert_person", """
+    INSERT INTO Person (first_name, last_name, birth_date, email, phone, city, street, zip)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+""")
+_register("insert_member", "INSERT INTO Member (person_id, member_status) VALUES (?, ?)")
+_register("insert_trainer", """
+    INSERT INTO Trainer (person_id, specialization, hire_date, trainer_status)
+    VALUES (?, ?, ?, ?)
+""")
+_register("insert_contact", "INSERT INTO Contact (person_id, contact_name, relationship, phone) VALUES (?, ?, ?, ?)")
+_register("insert_class", "INSERT INTO Class (class_name, description) VALUES (?, ?)")
+_register("insert_class_session", """
+    INSERT INTO Class_Session (class_id, start_time, end_time, capacity, duration, room)
+    VALUES (?, ?, ?, ?, ?, ?)
+""")
+_register("insert_membership", """
+    INSERT INTO Membership (member_id, membership_type_id, is_active, start_date, end_date)
+    VALUES (?, ?, ?, ?, ?)
+""")
+_register("insert_payment", "INSERT INTO Payment (member_id, payment_date, method, amount) VALUES (?, ?, ?, ?)")
+_register("insert_teaches", "INSERT INTO Teaches (trainer_id, class_session_id) VALUES (?, ?)")
+_register("insert_trainer_specialization",
+          "INSERT INTO Trainer_Specialization (trainer_id, specialization_id) VALUES (?, ?)")
+
+_register("update_person_address", "UPDATE Person SET email = ?, city = ?, street = ?, zip = ? WHERE id = ?")
+_register("update_member_status", "UPDATE Member SET member_status = ? WHERE member_id = ?")
+_register("update_trainer", "UPDATE Trainer SET specialization = ?, trainer_status = ? WHERE trainer_id = ?")
+_register("update_membership_validity", "UPDATE Membership SET end_date = ?, is_active = ? WHERE membership_id = ?")
+_register("reschedule_session", """
+    UPDATE Class_Session
+    SET start_time = ?, end_time = ?, capacity = COALESCE(?, capacity), duration = ?, room = ?
+    WHERE class_session_id = ?
+""")
+
+# Children follow via ON DELETE CASCADE
+_register("delete_member", "DELETE FROM Member WHERE member_id = ?")
+_register("delete_trainer", "DELETE FROM Trainer WHERE trainer_id = ?")
+_register("delete_class_session", "DELETE FROM Class_Session WHERE class_session_id = ?")
+_register("delete_membership", "DELETE FROM Membership WHERE membership_id = ?")
+
+
+# ============================================
+# Running Statements
+# ============================================
+
+def sql(name: str) -> str:
+    return STATEMENTS[name].sql
+
+
+def execute(executor: Executor, name: str, params: Sequence = ()) -> sqlite3.Cursor:
+    """
+    Run a registered statement, typically a write; use cursor.lastrowid /
+    rowcount on the result.
+    """
+    return executor.execute(STATEMENTS[name].sql, params)
+
+
+def fetch_all(executor: Executor, name: str, params: Sequence = ()) -> List:
+    """
+    Run a registered read and return its rows as records.
+    """
+    statement = STATEMENTS[name]
+    record = statement.record
+    return [record(*row) for row in executor.execute(statement.sql, params)]
+
+
+def fetch_one(executor: Executor, name: str, params: Sequence = ()) -> Optional[object]:
+    statement = STATEMENTS[name]
+    row = executor.execute(statement.sql, params).fetchone()
+    return None if row is None else statement.record(*row)
+
+
+# ============================================
+# Query Plans and Prepare Cost
+# ============================================
+
+def _sample_params(statement: Statement) -> Tuple:
+    # Valid for every parameter (ids, LIMIT and the FTS MATCH); plans and
+    # parse/prepare cost do not depend on the values. Numbered parameters
+    # (?1, ?2) are bound once however often they appear.
+    numbered = [int(n) for n in re.findall(r"\?(\d+)", statement.sql)]
+    return (1,) * (max(numbered) if numbered else statement.sql.count("?"))
+
+
+def _reads_archive(statement: Statement) -> bool:
+    return f"{ARCHIVE_SCHEMA}." in statement.sql
+
+
+def explain(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """
+    EXPLAIN QUERY PLAN of every registered statement, for index tuning.
+    Statements over the archive are included only while it is attached.
+    """
+    attached = is_attached(conn)
+    return {
+        name: [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement.sql}", _sample_params(statement))]
+        for name, statement in STATEMENTS.items()
+        if attached or not _reads_archive(statement)
+    }
+
+
+def time_reads(path: str, runs: int) -> List[Tuple[str, float, float]]:
+    """
+    Microseconds per execution of every read, once with a connection that
+    prepares the statement on every call and once with a warmed statement cache.
+    Parameters are the same sample values, so the difference is the parse/prepare cost.
+    """
+    reads = [s for s in STATEMENTS.values() if s.record is not None and not _reads_archive(s)]
+    uncached = sqlite3.connect(path, cached_statements=0)
+    cached = open_connection(path)
+    try:
+        results = []
+        for statement in reads:
+            params = _sample_params(statement)
+            timings = []
+            for conn in (uncached, cached):
+                conn.execute(statement.sql, params).fetchall()
+                started = time.perf_counter()
+                for _ in range(runs):
+                    conn.execute(statement.sql, params).fetchall()
+                timings.append((time.perf_counter() - started) / runs * 1e6)
+            results.append((statement.name, timings[0], timings[1]))
+        return results
+    finally:
+        uncached.close()
+        cached.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show query plans and prepare cost of the registered statements.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--explain", action="store_true", help="print EXPLAIN QUERY PLAN for every statement")
+    parser.add_argument("--runs", type=int, default=2000, help="executions per read when timing")
+    args = parser.parse_args()
+
+    if args.explain:
+        plan_conn = open_connection(args.database)
+        try:
+            for statement_name, plan in explain(plan_conn).items():
+                print(f"{statement_name}:")
+                for step in plan:
+                    print(f"    {step}")
+        finally:
+            plan_conn.close()
+    else:
+        print(f"{len(STATEMENTS)} statements, statement cache size {STATEMENT_CACHE_SIZE}")
+        print(f"{'statement':<28}{'prepared each call':>20}{'cached':>10}{'saved':>8}")
+        for statement_name, uncached_us, cached_us in time_reads(args.database, args.runs):
+            print(f"{statement_name:<28}{uncached_us:>17.1f} µs{cached_us:>7.1f} µs"
+                  f"{(1 - cached_us / uncached_us) * 100 if uncached_us else 0:>7.0f}%")
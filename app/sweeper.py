@@ -0,0 +1,123 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from connection import DATABASE_NAME, open_connection
+from database import connection
+
+logger = logging.getLogger(__name__)
+
+# ============================================
+# Membership Expiry Sweeper
+# ============================================
+# Deactivates every membership whose end_date has passed with a single
+# UPDATE. The WHERE clause matches the partial index idx_membership_active_end
+# (end_date of active rows only), so a run touches the expired rows and
+# nothing else. Every run is logged in Membership_Sweep.
+
+# Seconds between background sweeps (0 disables the background thread)
+SWEEP_INTERVAL_SECONDS: float = float(os.environ.get("GYM_SWEEP_INTERVAL", 3600))
+
+SWEEP_SQL: str = "UPDATE Membership SET is_active = 0 WHERE is_active = 1 AND end_date < ?"
+
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_stop = threading.Event()
+
+
+def sweep_expired(conn: sqlite3.Connection, today: Optional[date] = None) -> int:
+    """
+    Deactivate memberships that ended before `today` and log the run.
+    Returns the number of memberships deactivated.
+    """
+    cutoff = (today or date.today()).isoformat()
+    cur = conn.cursor()
+    started = time.perf_counter()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(SWEEP_SQL, (cutoff,))
+        deactivated = cur.rowcount
+        cur.execute('''INSERT INTO Membership_Sweep (run_at, cutoff_date, deactivated, duration_ms)
+                       VALUES (?, ?, ?, ?)''',
+                    (datetime.now().isoformat(timespec="seconds"), cutoff, deactivated,
+                     round((time.perf_counter() - started) * 1000, 3)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return deactivated
+
+
+def run_sweep(today: Optional[date] = None) -> int:
+    with connection() as conn:
+        return sweep_expired(conn, today)
+
+
+def recent_sweeps(limit: int = 20) -> List[Dict]:
+    with connection() as conn:
+        cur = conn.execute('''SELECT run_at, cutoff_date, deactivated, duration_ms FROM Membership_Sweep
+                              ORDER BY sweep_id DESC LIMIT ?''', (limit,))
+        columns = [d[0] for d in cur.description]
+        return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def _loop(interval: float) -> None:
+    while not _stop.is_set():
+        try:
+            run_sweep()
+        except sqlite3.Error:
+            # A busy database is retried on the next tick
+            logger.warning("Membership sweep failed", exc_info=True)
+        _stop.wait(interval)
+
+
+def start_background_sweeper(interval: float = SWEEP_INTERVAL_SECONDS) -> Optional[threading.Thread]:
+    """
+    Start the daemon thread that sweeps now and then every `interval` seconds.
+    Safe to call repeatedly; only one thread is started per process.
+    """
+    global _thread
+    if interval <= 0:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _stop.clear()
+            _thread = threading.Thread(target=_loop, args=(interval,), name="membership-sweeper", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def stop_background_sweeper() -> None:
+    global _thread
+    with _thread_lock:
+        if _thread is not None:
+            _stop.set()
+            _thread.join()
+            _thread = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deactivate expired memberships.")
+    parser.add_argument("--database", default=DATABASE_NAME)
+    parser.add_argument("--date", type=date.fromisoformat, help="treat this day (YYYY-MM-DD) as today")
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="keep sweeping at this interval")
+    args = parser.parse_args()
+
+    sweep_conn = open_connection(args.database)
+    try:
+        while True:
+            started = time.perf_counter()
+            count = sweep_expired(sweep_conn, args.date)
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} deactivated {count:,} memberships "
+                  f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            if not args.every:
+                break
+            time.sleep(args.every)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sweep_conn.close()
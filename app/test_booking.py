@@ -0,0 +1,24 @@
+import sqlite3
+
+from booking import stress_test
+
+
+def test_concurrent_bookings_never_overbook(tmp_path):
+    path = str(tmp_path / "booking.db")
+    assert stress_test(members=30, capacity=10, rounds=3, path=path)
+
+    conn = sqlite3.connect(path)
+    try:
+        sessions = conn.execute('''
+            SELECT cs.booked_count, cs.capacity,
+                   (SELECT COUNT(*) FROM Attends a WHERE a.class_session_id = cs.class_session_id)
+            FROM Class_Session cs
+        ''').fetchall()
+    finally:
+        conn.close()
+
+    assert len(sessions) == 3
+    for booked_count, capacity, attends in sessions:
+        assert booked_count == attends
+        assert booked_count <= capacity
+        assert booked_count == capacity
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+from ingest import CheckinWriter, parse_checkin
+
+
+def test_rows_fail_instead_of_retrying_when_check_in_table_is_missing(tmp_path):
+    path = str(tmp_path / "empty.db")
+    sqlite3.connect(path).close()
+
+    writer = CheckinWriter(path, max_latency=0.01).start()
+    assert writer.submit([(1, None, "2025-01-31 07:05"), (2, None, "2025-01-31 07:06")])
+    writer.stop()
+
+    metrics = writer.snapshot()
+    assert metrics["written"] == 0
+    assert metrics["failed"] == 2
+    assert metrics["retries"] == 0
+
+
+def test_locked_batch_fails_once_instead_of_row_by_row(tmp_path, monkeypatch):
+    import connection
+    import ingest
+
+    monkeypatch.setattr(connection, "BUSY_TIMEOUT_SECONDS", 0.01)
+    monkeypatch.setattr(ingest, "MAX_WRITE_ATTEMPTS", 2)
+    monkeypatch.setattr(ingest, "RETRY_DELAY_SECONDS", 0.01)
+    path = str(tmp_path / "locked.db")
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("PRAGMA journal_mode = WAL")
+    holder.execute("CREATE TABLE Check_in (member_id, class_session_id, checkin_time, checkin_ts)")
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        writer = CheckinWriter(path, max_latency=0.01).start()
+        assert writer.submit([(member_id, None, "2025-01-31 07:05") for member_id in range(1, 51)])
+        writer.stop()
+    finally:
+        holder.rollback()
+        holder.close()
+
+    metrics = writer.snapshot()
+    assert metrics["written"] == 0
+    assert metrics["failed"] == 50
+    # One retry for the batch, none per row
+    assert metrics["retries"] == 1
+
+
+@pytest.mark.parametrize("member_id", [True, 3.9, "  7 ", "7a", 2 ** 63, None])
+def test_parse_checkin_rejects_ids_int_would_coerce(member_id):
+    with pytest.raises(ValueError):
+        parse_checkin({"member_id": member_id})
+
+
+def test_parse_checkin_accepts_integral_ids():
+    assert parse_checkin({"member_id": "7", "class_session_id": 3.0, "checkin_time": "2025-01-31 07:05"}) == \
+        (7, 3, "2025-01-31 07:05")
@@ -0,0 +1,111 @@
+import calendar
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+# ============================================
+# Timestamps
+# ============================================
+# Session and check-in times are stored twice: as 'YYYY-MM-DD HH:MM' text for
+# display and as integer seconds (start_ts, end_ts, checkin_ts, checkout_ts)
+# for indexed range queries. Both are wall-clock times without a time zone;
+# to_epoch matches SQLite's strftime('%s', ...) so Python and the triggers
+# always agree.
+
+TIME_FORMAT: str = "%Y-%m-%d %H:%M"
+
+# Formats found in stored data, most common first
+_PARSE_FORMATS: Tuple[str, ...] = (TIME_FORMAT, "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S")
+
+
+def parse_timestamp(text: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a stored session/check-in time. Returns None for anything else.
+    """
+    if not text:
+        return None
+    for fmt in _PARSE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def format_timestamp(value: datetime) -> str:
+    return value.strftime(TIME_FORMAT)
+
+
+def to_epoch(value: datetime) -> int:
+    return calendar.timegm(value.timetuple())
+
+
+def from_epoch(seconds: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=seconds)
+
+
+def week_bounds(day: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """
+    Monday 00:00 of the week containing `day` and Monday 00:00 of the next week.
+    """
+    day = day or date.today()
+    monday = datetime(day.year, day.month, day.day) - timedelta(days=day.weekday())
+    return monday, monday + timedelta(days=7)
+
+
+def month_bounds(day: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """
+    00:00 on the first of the month containing `day` and on the first of the next month.
+    """
+    day = day or date.today()
+    first = datetime(day.year, day.month, 1)
+    return first, (first + timedelta(days=32)).replace(day=1)
+
+
+# ============================================
+# Range Queries
+# ============================================
+# Half-open [start, end) ranges on the integer columns, served by
+# idx_class_session_start_ts and idx_check_in_ts.
+
+SESSION_COLUMNS: List[str] = ["class_session_id", "class_name", "start_time", "end_time", "capacity", "booked_count",
+                               "room"]
+CHECKIN_COLUMNS: List[str] = ["checkin_id", "member_id", "class_session_id", "checkin_time", "checkout_time"]
+
+SESSIONS_BETWEEN_SQL: str = '''
+    SELECT cs.class_session_id, c.class_name, cs.start_time, cs.end_time, cs.capacity, cs.booked_count, cs.room
+    FROM Class_Session cs
+    JOIN Class c ON cs.class_id = c.class_id
+    WHERE cs.start_ts >= ? AND cs.start_ts < ?
+    ORDER BY cs.start_ts
+'''
+
+CHECKINS_BETWEEN_SQL: str = '''
+    SELECT checkin_id, member_id, class_session_id, checkin_time, checkout_time
+    FROM Check_in
+    WHERE checkin_ts >= ? AND checkin_ts < ?
+    ORDER BY checkin_ts
+    LIMIT ?
+'''
+
+COUNT_CHECKINS_SQL: str = "SELECT COUNT(*) FROM Check_in WHERE checkin_ts >= ? AND checkin_ts < ?"
+
+
+def sessions_between(conn: sqlite3.Connection, start: datetime, end: datetime) -> List[Tuple]:
+    return conn.execute(SESSIONS_BETWEEN_SQL, (to_epoch(start), to_epoch(end))).fetchall()
+
+
+def sessions_this_week(conn: sqlite3.Connection, day: Optional[date] = None) -> List[Tuple]:
+    return sessions_between(conn, *week_bounds(day))
+
+
+def checkins_between(conn: sqlite3.Connection, start: datetime, end: datetime, limit: int = -1) -> List[Tuple]:
+    """
+    Check-ins from `start` (inclusive) to `end` (exclusive), oldest first.
+    A negative limit returns them all.
+    """
+    return conn.execute(CHECKINS_BETWEEN_SQL, (to_epoch(start), to_epoch(end), limit)).fetchall()
+
+
+def count_checkins_between(conn: sqlite3.Connection, start: datetime, end: datetime) -> int:
+    return conn.execute(COUNT_CHECKINS_SQL, (to_epoch(start), to_epoch(end))).fetchone()[0]
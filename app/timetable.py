@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from connection import database_file
+from database import connection
+from statements import fetch_all, fetch_one
+from timestamps import month_bounds, to_epoch, week_bounds
+
+# ============================================
+# Calendar Ranges
+# ============================================
+# The calendar page shows one week or one month of sessions, read with a
+# range query on idx_class_session_start_ts, so a page costs the same with
+# one month or ten years of timetable. Loaded ranges are kept in a small LRU
+# cache, and the ranges before and after the visible one are loaded into it
+# by a background thread, so paging to the next or previous week is served
+# from memory. Cached ranges are only valid for the Timetable_Revision they
+# were read at; any change to the timetable (conflicts.py) empties the cache.
+# Like the conflict indexes, there is one cache per database file.
+
+VIEWS: List[str] = ["Week", "Month"]
+
+# Ranges kept in memory (a month view counts as one range)
+CACHE_SIZE: int = int(os.environ.get("GYM_CALENDAR_CACHE", 12))
+# Ranges prefetched on each side of the visible one
+PREFETCH_RANGES: int = 1
+
+Bounds = Tuple[datetime, datetime]
+
+
+def view_bounds(view: str, day: date) -> Bounds:
+    """
+    The range a view of `day` shows: its Monday-to-Monday week, or the whole
+    weeks that cover its month (so the month grid has no empty cells).
+    """
+    if view == "Week":
+        return week_bounds(day)
+    first, after = month_bounds(day)
+    return week_bounds(first.date())[0], week_bounds((after - timedelta(days=1)).date())[1]
+
+
+def shift(view: str, day: date, steps: int) -> date:
+    """
+    `day` moved by `steps` weeks or months (to the first of that month).
+    """
+    if view == "Week":
+        return day + timedelta(days=7 * steps)
+    month = day.year * 12 + day.month - 1 + steps
+    return date(month // 12, month % 12 + 1, 1)
+
+
+class RangeCache:
+    """
+    Least recently used session lists by range, all read at one timetable revision.
+    """
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Bounds, List]" = OrderedDict()
+        self._revision: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _sync(self, revision: int) -> bool:
+        # Newer timetable: everything cached is out of date
+        if self._revision is None or revision > self._revision:
+            self._entries.clear()
+            self._revision = revision
+        return revision == self._revision
+
+    def get(self, bounds: Bounds, revision: int) -> Optional[List]:
+        with self._lock:
+            rows = self._entries.get(bounds) if self._sync(revision) else None
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(bounds)
+            self.hits += 1
+            return rows
+
+    def put(self, bounds: Bounds, revision: int, rows: List) -> None:
+        with self._lock:
+            # A slow read of an older revision must not replace newer data
+            if not self._sync(revision):
+                return
+            self._entries[bounds] = rows
+            self._entries.move_to_end(bounds)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, bounds: Bounds) -> bool:
+        with self._lock:
+            return bounds in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revision = None
+
+
+_caches: Dict[str, RangeCache] = {}
+_caches_lock = threading.Lock()
+_prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calendar-prefetch")
+_pending: Set[Bounds] = set()
+_pending_lock = threading.Lock()
+
+
+def _cache_for(conn: sqlite3.Connection) -> RangeCache:
+    path = database_file(conn)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = RangeCache()
+        return cache
+
+
+def _load(conn: sqlite3.Connection, bounds: Bounds, cache: RangeCache) -> List:
+    # Revision first: data read after it is at least as new, never older
+    revision = fetch_one(conn, "timetable_revision").revision
+    rows = fetch_all(conn, "calendar_sessions", (to_epoch(bounds[0]), to_epoch(bounds[1])))
+    cache.put(bounds, revision, rows)
+    return rows
+
+
+def _prefetch_one(bounds: Bounds) -> None:
+    try:
+        # Prefetching is for the app's own database, so its pool
+        with connection() as conn:
+            _load(conn, bounds, _cache_for(conn))
+    finally:
+        with _pending_lock:
+            _pending.discard(bounds)
+
+
+def prefetch(cache: RangeCache, view: str, day: date) -> None:
+    """
+    Queue the ranges around the view of `day` that are not in `cache` yet.
+    """
+    for steps in range(-PREFETCH_RANGES, PREFETCH_RANGES + 1):
+        bounds = view_bounds(view, shift(view, day, steps))
+        if steps == 0 or bounds in cache:
+            continue
+        with _pending_lock:
+            if bounds in _pending:
+                continue
+            _pending.add(bounds)
+        _prefetcher.submit(_prefetch_one, bounds)
+
+
+def sessions_in_view(conn: sqlite3.Connection, view: str, day: date, prefetch_adjacent: bool = True) -> Tuple[List, bool]:
+    """
+    The sessions of the week or month view containing `day`, in start order,
+    and whether they came from the cache.
+    """
+    cache = _cache_for(conn)
+    bounds = view_bounds(view, day)
+    rows = cache.get(bounds, fetch_one(conn, "timetable_revision").revision)
+    cached = rows is not None
+    if rows is None:
+        rows = _load(conn, bounds, cache)
+    if prefetch_adjacent:
+        prefetch(cache, view, day)
+    return rows, cached
+
+
+def cache_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    cache = _cache_for(conn)
+    return {"hits": cache.hits, "misses": cache.misses, "ranges": len(cache), "size": cache.size}
@@ -0,0 +1,204 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+
+# ============================================
+# SQL Tracing
+# ============================================
+# Pooled connections are opened with TracedConnection. When tracing is on,
+# every statement records its text, duration, row count and the page/form
+# (scope) that issued it; set_trace_callback additionally counts the trigger
+# sub-statements SQLite runs on its behalf. When tracing is off, connections
+# hand out plain sqlite3 cursors, so fetching rows runs no Python at all, and
+# the callback is removed, since SQLite would otherwise call back into Python
+# for every trigger statement.
+
+TRACE_LIMIT: int = 2000
+PAGE_LIMIT: int = 500
+SLOW_QUERY_MS: float = 50.0
+
+_enabled: bool = os.environ.get("GYM_SQL_TRACE", "0") == "1"
+_statements: Deque["StatementRecord"] = deque(maxlen=TRACE_LIMIT)
+_pages: Deque[Dict] = deque(maxlen=PAGE_LIMIT)
+_local = threading.local()
+
+
+class StatementRecord:
+    __slots__ = ("started_at", "scope", "sql", "duration_ms", "rows", "statements", "thread")
+
+    def __init__(self, sql: str):
+        self.started_at = time.time()
+        self.scope = current_scope()
+        self.sql = " ".join(sql.split())
+        self.duration_ms = 0.0
+        self.rows = 0
+        self.statements = 0
+        self.thread = threading.current_thread().name
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def clear() -> None:
+    _statements.clear()
+    _pages.clear()
+
+
+def current_scope() -> str:
+    return " / ".join(getattr(_local, "scopes", ()))
+
+
+@contextmanager
+def trace_scope(name: str) -> Iterator[None]:
+    """
+    Label every statement issued inside the block with `name` (scopes nest,
+    e.g. "Insertion / Record Payment") and record how long the block took,
+    in wall time and in CPU time of the calling thread.
+    """
+    if getattr(_local, "scopes", None) is None:
+        _local.scopes, _local.totals = [], []
+    totals = [0.0, 0]  # SQL milliseconds, statement count
+    _local.scopes.append(name)
+    _local.totals.append(totals)
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    finally:
+        if _enabled:
+            _pages.append({
+                "started_at": time.time(),
+                "scope": current_scope(),
+                "duration_ms": (time.perf_counter() - started) * 1000,
+                "cpu_ms": (time.thread_time() - cpu_started) * 1000,
+                "sql_ms": totals[0],
+                "statements": totals[1],
+            })
+        _local.scopes.pop()
+        _local.totals.pop()
+
+
+def _account(ms: float, statements: int) -> None:
+    # Charge SQL time to every open scope of this thread
+    for totals in getattr(_local, "totals", ()):
+        totals[0] += ms
+        totals[1] += statements
+
+
+def statements() -> List[Dict]:
+    return [r.as_dict() for r in list(_statements)]
+
+
+def page_timings() -> List[Dict]:
+    return list(_pages)
+
+
+def _on_statement(sql: str) -> None:
+    # Called by SQLite for each statement and trigger sub-program it starts
+    record = getattr(_local, "active", None)
+    if record is not None:
+        record.statements += 1
+
+
+class TracedCursor(sqlite3.Cursor):
+    _record: Optional[StatementRecord] = None
+
+    def _run(self, method, sql, parameters):
+        if not _enabled:
+            self._record = None
+            return method(sql, parameters)
+
+        record = self._record = StatementRecord(sql)
+        _local.active = record
+        started = time.perf_counter()
+        try:
+            return method(sql, parameters)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            record.duration_ms += elapsed
+            _account(elapsed, 1)
+            if self.rowcount > 0:
+                record.rows = self.rowcount
+            _local.active = None
+            _statements.append(record)
+
+    def _fetched(self, started: float, count: int) -> None:
+        elapsed = (time.perf_counter() - started) * 1000
+        self._record.duration_ms += elapsed
+        self._record.rows += count
+        _account(elapsed, 0)
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    # A cursor made while tracing was on only times statements it traced
+    def fetchone(self):
+        if self._record is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        if self._record is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        if self._record is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def __next__(self):
+        if self._record is None:
+            return super().__next__()
+        started = time.perf_counter()
+        row = super().__next__()
+        self._fetched(started, 1)
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection whose cursors (including conn.execute) are traced
+    while tracing is enabled.
+    """
+
+    _traced: bool = False
+
+    def cursor(self, factory=None):
+        # Follow set_enabled() lazily, the next time this connection is used
+        if self._traced != _enabled:
+            self.set_trace_callback(_on_statement if _enabled else None)
+            self._traced = _enabled
+        return super().cursor(factory or (TracedCursor if _enabled else sqlite3.Cursor))
+
+    # Connection.execute builds its cursor internally, bypassing cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+import tracing
+
+# ============================================
+# UI Rerun Benchmark
+# ============================================
+# Drives app.py with Streamlit's AppTest and types into the search box of a
+# few forms, one keystroke-sized change per interaction. For each one it
+# records what a full script rerun costs (every interaction before the
+# forms became fragments) next to what the form's own fragment costs (all a
+# fragment-scoped rerun executes), taken from the trace_scope timings.
+# AppTest always reruns the whole script, so the fragment figures are
+# measured inside that run.
+
+APP_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# (menu page, form, search box key)
+SCENARIOS: List[Tuple[str, str, str]] = [
+    ("Insertion", "Record Payment", "record_payment_member_search"),
+    ("Update", "Update Member Profile", "update_member_search"),
+    ("Delete", "Delete Member", "delete_member_search"),
+]
+SEARCH_TERMS: List[str] = ["a", "e", "ay", "el", "z", "ka", "mer", "an"]
+WARMUP_INTERACTIONS: int = 2
+
+
+def _median(values: List[float]) -> float:
+    return statistics.median(values) if values else 0.0
+
+
+def run_scenario(at, page: str, form: str, search_key: str, interactions: int) -> Dict:
+    at.sidebar.radio[0].set_value(page).run()
+    at.selectbox[0].set_value(form).run()
+
+    scope = f"{page} / {form}"
+    full_ms, full_cpu_ms, fragment_ms, fragment_cpu_ms = [], [], [], []
+    for n in range(WARMUP_INTERACTIONS + interactions):
+        tracing.clear()
+        started, cpu_started = time.perf_counter(), time.process_time()
+        at.text_input(key=search_key).input(SEARCH_TERMS[n % len(SEARCH_TERMS)]).run()
+        if at.exception:
+            raise RuntimeError(f"{scope}: {at.exception[0].message}")
+        if n < WARMUP_INTERACTIONS:
+            continue
+        full_ms.append((time.perf_counter() - started) * 1000)
+        full_cpu_ms.append((time.process_time() - cpu_started) * 1000)
+        runs = [p for p in tracing.page_timings() if p["scope"] == scope]
+        fragment_ms.append(sum(p["duration_ms"] for p in runs))
+        fragment_cpu_ms.append(sum(p["cpu_ms"] for p in runs))
+
+    return {
+        "scenario": scope,
+        "interactions": interactions,
+        "full_rerun_ms": _median(full_ms),
+        "full_rerun_cpu_ms": _median(full_cpu_ms),
+        "fragment_ms": _median(fragment_ms),
+        "fragment_cpu_ms": _median(fragment_cpu_ms),
+    }
+
+
+def run_ui_benchmark(interactions: int = 20, database: Optional[str] = None,
+                     workdir: Optional[str] = None) -> List[Dict]:
+    """
+    Run every scenario against a copy of `database` (or freshly seeded
+    sample data) in `workdir` (a temporary directory by default).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # No background threads competing for the CPU being measured
+    os.environ["GYM_REPLICA_REFRESH"] = "0"
+    os.environ["GYM_SWEEP_INTERVAL"] = "0"
+
+    owned = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="ui_bench_")
+    if database:
+        shutil.copyfile(database, os.path.join(workdir, "gym.db"))
+    previous_dir = os.getcwd()
+    tracing.set_enabled(True)
+    try:
+        # gym.db is opened relative to the working directory
+        os.chdir(workdir)
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        at.run()
+        return [run_scenario(at, page, form, key, interactions) for page, form, key in SCENARIOS]
+    finally:
+        os.chdir(previous_dir)
+        tracing.set_enabled(False)
+        if owned:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full-script reruns with fragment reruns per form interaction.")
+    parser.add_argument("--interactions", type=int, default=20, help="measured interactions per form")
+    parser.add_argument("--database", help="benchmark a copy of this database instead of the sample data")
+    parser.add_argument("--workdir", help="keep the database copy here instead of a temporary directory")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = run_ui_benchmark(args.interactions, args.database, args.workdir)
+    print(f"{'interaction':<42}{'full ms':>10}{'cpu ms':>10}{'fragment ms':>13}{'cpu ms':>10}{'speed-up':>10}")
+    for row in results:
+        speedup = row["full_rerun_ms"] / row["fragment_ms"] if row["fragment_ms"] else float("inf")
+        print(f"{row['scenario']:<42}{row['full_rerun_ms']:>10.2f}{row['full_rerun_cpu_ms']:>10.2f}"
+              f"{row['fragment_ms']:>13.2f}{row['fragment_cpu_ms']:>10.2f}{speedup:>9.1f}x")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
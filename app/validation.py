@@ -0,0 +1,84 @@
+import re
+from datetime import datetime
+from typing import Dict, List
+
+# ============================================
+# Member Registration Rules
+# ============================================
+# Shared by the "New Member Registration" form and the bulk importer so a
+# row accepted by one is accepted by the other.
+
+MEMBER_STATUS_OPTIONS: List[str] = ["active", "inactive", "pending"]
+
+# Column name -> label shown to the user
+MEMBER_REQUIRED_FIELDS: Dict[str, str] = {
+    "first_name": "First Name",
+    "last_name": "Last Name",
+    "email": "Email",
+    "phone": "Phone",
+    "city": "City",
+    "street": "Street",
+    "zip": "Zip Code",
+    "contact_name": "Contact Name",
+    "relationship": "Relationship",
+    "contact_phone": "Contact Phone",
+}
+
+
+def validate_member(record: Dict[str, str]) -> List[str]:
+    """
+    Validate one member registration and return a list of error messages.
+    An empty list means the record can be inserted.
+    """
+    errors = []
+
+    missing = [label for field, label in MEMBER_REQUIRED_FIELDS.items()
+               if not str(record.get(field) or "").strip()]
+    if missing:
+        errors.append(f"Missing required fields: {', '.join(missing)}")
+
+    status = record.get("member_status") or MEMBER_STATUS_OPTIONS[0]
+    if status not in MEMBER_STATUS_OPTIONS:
+        errors.append(f"Invalid member status '{status}' (expected one of {', '.join(MEMBER_STATUS_OPTIONS)})")
+
+    birth_date = str(record.get("birth_date") or "").strip()
+    if birth_date:
+        try:
+            datetime.strptime(birth_date, "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"Invalid birth date '{birth_date}' (expected YYYY-MM-DD)")
+
+    return errors
+
+
+# ============================================
+# Identifiers
+# ============================================
+# Shared by the check-in endpoint and the JSON API. int() would turn True
+# into 1, 3.9 into 3 and " 7 " into 7, quietly picking another row.
+
+# SQLite integers are signed 64-bit
+SQLITE_INT_MIN: int = -2 ** 63
+SQLITE_INT_MAX: int = 2 ** 63 - 1
+
+
+def parse_id(value, name: str) -> int:
+    """
+    An integer id from a JSON number or a string of digits. Raises ValueError
+    for anything else, including bools, fractions and out-of-range numbers.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{name} must be an integer")
+        value = int(value)
+    elif isinstance(value, str):
+        if not re.fullmatch(r"-?[0-9]+", value):
+            raise ValueError(f"{name} must be an integer")
+        value = int(value)
+    elif not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer")
+    if not SQLITE_INT_MIN <= value <= SQLITE_INT_MAX:
+        raise ValueError(f"{name} is out of range")
+    return value